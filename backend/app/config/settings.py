@@ -2,6 +2,7 @@
 
 import os
 from typing import List
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -29,6 +30,7 @@ class Settings(BaseSettings):
     
     # Groq Configuration
     groq_api_key: str = ""
+    groq_max_keepalive_connections: int = 20  # Idle connections kept open in the shared Groq HTTP pool
     
     # Fallback Groq API Keys (for when users don't have their own keys)
     fallback_groq_keys: List[str] = [
@@ -61,12 +63,40 @@ class Settings(BaseSettings):
     # Document Processing Configuration
     groq_model: str = "llama3-70b-8192"
     embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_backend: str = "torch"  # "onnx-int8": dynamically int8-quantized ONNX Runtime model (install requirements/onnx.txt)
+    embedding_onnx_cache_dir: str = "~/.cache/engunity/emb-int8"  # Exported + quantized ONNX models, one subdirectory per model
     chunk_size: int = 400
     chunk_overlap: int = 50
     max_concurrent_processing: int = 3
+    embed_batch_size: int = 32  # Texts per embedding call during ingestion
+    embed_concurrency: int = 4  # Embedding batches in flight at once
+    embedding_model_batch_size: int = 64  # Length-sorted micro-batch size for sentence-transformers encode
+    embed_coalesce_delay_ms: int = 8  # Window for batching concurrent single-text embedding requests
+    embed_coalesce_max_batch: int = 64  # Flush a coalesced batch early once it reaches this size
+    single_embedding_cache_size: int = 10_000  # Recent query embeddings kept in memory
+    simhash_max_distance: int = -1  # Reuse a near-duplicate chunk's embedding (lossy) within this many SimHash bits, e.g. 3; -1 disables
     
     # Vector Store Configuration
     vector_store_path: str = "./vector_store"
+    vector_index: str = "simple"  # "simple" (NumPy store), "flat" or "hnsw" (FAISS)
+    hnsw_m: int = 32  # Graph neighbours per node
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+    hnsw_min_vectors: int = 1000  # Smaller indexes stay flat; HNSW build cost dominates
+    ivfpq_min_vectors: int = 100_000  # With "hnsw", indexes this large use OPQ+IVF+PQ instead
+    pq_m: int = 64  # PQ sub-quantizers (bytes per vector); must divide the embedding dimension
+    ivf_nprobe: int = 16  # IVF lists visited per query
+    shared_corpus_index: bool = False  # FAISS only: index all documents in one IndexIDMap2
+    faiss_omp_threads: int = 0  # OpenMP threads per Faiss call; 0 uses half the CPU cores
+    faiss_index_cache_size: int = 32  # FAISS indices kept open (memory-mapped) per process
+    vector_quantization: str = "none"  # FAISS / simple store / saved embedding encoding: "none" (fp32), "fp16", "sq8", or "pq4fs" (FAISS flat only)
+    binary_rerank_threshold: int = 100_000  # Build a 1-bit shortlist index above this many vectors
+    binary_shortlist_size: int = 200  # Candidates taken from the binary index before fp32 rerank
+    simple_index_cache_size: int = 64  # SimpleVectorStore indices kept loaded (memory-mapped) per process
+    simple_index_compression: str = "none"  # SimpleVectorStore vector files: "none" (memory-mapped) or "zstd"
+    use_gpu: bool = False  # Score large indices on the GPU: SimpleVectorStore via CuPy, FAISS flat indices via faiss-gpu
+    gpu_min_vectors: int = 50_000  # Smaller indices stay on the CPU; transfer cost dominates
+    gpu_index_cache_size: int = 8  # Embedding matrices kept resident on the GPU
     
     # File Upload Configuration
     max_file_size: int = 10485760  # 10MB
@@ -89,6 +119,14 @@ class Settings(BaseSettings):
         case_sensitive = False
         env_file_encoding = 'utf-8'
     
+    @field_validator('simhash_max_distance')
+    @classmethod
+    def check_simhash_max_distance(cls, value: int) -> int:
+        """Keep near-duplicate reuse within what the 4-band SimHash lookup finds exactly."""
+        if value > 3:
+            raise ValueError("simhash_max_distance must be at most 3 (or -1 to disable)")
+        return value
+    
     def get_allowed_extensions(self) -> List[str]:
         """Get allowed extensions as a list."""
         return [ext.strip() for ext in self.allowed_extensions.split(',')]
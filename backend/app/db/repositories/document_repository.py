@@ -348,6 +348,28 @@ class DocumentRepository:
             logger.error(f"Error getting document chunks: {e}")
             raise DatabaseError(f"Failed to get chunks: {str(e)}")
     
+    async def get_chunks_by_ids(self, chunk_ids: List[UUID]) -> List[DocumentChunk]:
+        """
+        Get chunks by ID in a single query.
+        
+        Args:
+            chunk_ids: Chunk IDs to fetch
+            
+        Returns:
+            List of matching chunks (unordered)
+        """
+        try:
+            if not chunk_ids:
+                return []
+            
+            return self.db.query(DocumentChunk).filter(
+                DocumentChunk.id.in_(chunk_ids)
+            ).all()
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting chunks by ID: {e}")
+            raise DatabaseError(f"Failed to get chunks: {str(e)}")
+    
     async def log_qa_interaction(
         self,
         document_id: UUID,
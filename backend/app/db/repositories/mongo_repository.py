@@ -82,6 +82,20 @@ class ChatRepository(MongoRepository):
         except Exception:
             return False
     
+    async def add_messages(self, chat_id: str, messages: List[ChatMessage]) -> bool:
+        """Add several messages to a chat in one update."""
+        try:
+            result = await self.collection.update_one(
+                {"_id": ObjectId(chat_id)},
+                {
+                    "$push": {"messages": {"$each": [message.dict() for message in messages]}},
+                    "$set": {"updated_at": datetime.utcnow()}
+                }
+            )
+            return result.modified_count > 0
+        except Exception:
+            return False
+    
     async def update_chat_title(self, chat_id: str, title: str) -> bool:
         """Update chat title."""
         try:
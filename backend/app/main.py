@@ -10,6 +10,7 @@ from contextlib import asynccontextmanager
 from .config.settings import settings
 from .api.v1 import api_router
 from .config.database import mongo_manager
+from .services.groq_service import close_groq_clients
 
 
 @asynccontextmanager
@@ -20,6 +21,7 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     await mongo_manager.disconnect()
+    await close_groq_clients()
 
 # Create FastAPI app
 app = FastAPI(
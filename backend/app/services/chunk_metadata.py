@@ -0,0 +1,264 @@
+# backend/app/services/chunk_metadata.py
+"""
+Columnar (struct-of-arrays) metadata for document chunks stored alongside
+vector indices.
+"""
+
+import json
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.models.document import DocumentChunk
+
+# Stored in the int32 page_number column for chunks without a page
+_NO_PAGE = -1
+
+# Row keys with a column of their own; any other key goes to the extras column
+_COLUMN_KEYS = frozenset({"document_id", "chunk_id", "chunk_index", "page_number", "token_count", "content"})
+
+
+def _narrow(column: np.ndarray) -> np.ndarray:
+    """Cast an integer column to the smallest dtype that holds all its values."""
+    if len(column) == 0:
+        return column
+    return column.astype(np.result_type(np.min_scalar_type(column.min()), np.min_scalar_type(column.max())))
+
+
+def _json_default(value: Any) -> Any:
+    """Convert numpy scalars and arrays in extra metadata values to plain JSON types."""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode_strings(values: Sequence[Optional[str]]) -> Dict[str, np.ndarray]:
+    """Encode optional strings as one UTF-8 blob plus per-row byte lengths, -1 marking None."""
+    encoded = [None if value is None else value.encode() for value in values]
+    return {
+        "data": np.frombuffer(b"".join(e for e in encoded if e is not None), dtype=np.uint8),
+        "lengths": np.array([-1 if e is None else len(e) for e in encoded], dtype=np.int64),
+    }
+
+
+def _decode_strings(data: np.ndarray, lengths: np.ndarray) -> List[Optional[str]]:
+    """Split a blob written by ``_encode_strings`` back into optional strings."""
+    blob = data.tobytes()
+    ends = np.cumsum(np.maximum(lengths, 0)).tolist()
+    return [
+        None if length < 0 else blob[end - length:end].decode()
+        for length, end in zip(lengths.tolist(), ends)
+    ]
+
+
+class ChunkMetadata:
+    """
+    Chunk metadata held as one array per field instead of one dict per chunk.
+    
+    Chunk content normally is not stored here; it lives in the database and
+    is resolved by chunk_id when search results are returned. Callers that
+    pass metadata rows with a "content" key keep it in a ``contents`` column,
+    and any other keys are kept per row as JSON in an ``extras`` column.
+    
+    Behaves like the list of metadata dicts the vector stores expect: rows
+    are materialized as dicts only when indexed or iterated, and instances
+    concatenate with ``+``. ``embedding_model`` records the identifier of
+    the embedding model whose vectors the rows describe, when known.
+    """
+    
+    def __init__(
+        self,
+        document_id: str,
+        chunk_ids: Sequence[str],
+        chunk_indices: np.ndarray,
+        page_numbers: np.ndarray,
+        token_counts: np.ndarray,
+        contents: Optional[Sequence[Optional[str]]] = None,
+        extras: Optional[Sequence[Optional[str]]] = None,
+        embedding_model: Optional[str] = None
+    ):
+        self.document_id = document_id
+        self.chunk_ids = list(chunk_ids)
+        self.chunk_indices = np.asarray(chunk_indices, dtype=np.int32)
+        self.page_numbers = np.asarray(page_numbers, dtype=np.int32)
+        self.token_counts = np.asarray(token_counts, dtype=np.int32)
+        self.contents = list(contents) if contents is not None else None
+        self.extras = list(extras) if extras is not None else None
+        self.embedding_model = embedding_model
+    
+    @classmethod
+    def from_chunks(cls, document_id: Any, chunks: List[DocumentChunk]) -> "ChunkMetadata":
+        """Build columnar metadata for a document's chunks."""
+        count = len(chunks)
+        return cls(
+            document_id=str(document_id),
+            chunk_ids=[str(chunk.id) for chunk in chunks],
+            chunk_indices=np.fromiter((chunk.chunk_index for chunk in chunks), dtype=np.int32, count=count),
+            page_numbers=np.fromiter(
+                (_NO_PAGE if chunk.page_number is None else chunk.page_number for chunk in chunks),
+                dtype=np.int32,
+                count=count
+            ),
+            token_counts=np.fromiter((chunk.token_count or 0 for chunk in chunks), dtype=np.int32, count=count)
+        )
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict[str, Any]], document_id: Optional[str] = None) -> "ChunkMetadata":
+        """
+        Build columnar metadata from a list of metadata dicts.
+        
+        Args:
+            rows: Metadata dicts, each with at least a "chunk_id"
+            document_id: Document ID for the column (defaults to the first row's);
+                rows with a different one keep theirs in the extras column
+            
+        Returns:
+            Columnar metadata whose rows read back equal to ``rows``
+            
+        Raises:
+            ValueError: If a row has no chunk_id or an extra value is not JSON-serializable
+        """
+        if isinstance(rows, ChunkMetadata) and document_id in (None, rows.document_id):
+            return rows
+        
+        rows = list(rows)
+        if document_id is None:
+            document_id = rows[0].get("document_id", "") if rows else ""
+        document_id = str(document_id)
+        
+        chunk_ids = []
+        extras = []
+        for position, row in enumerate(rows):
+            if row.get("chunk_id") is None:
+                raise ValueError(f"Metadata row {position} has no chunk_id")
+            chunk_ids.append(str(row["chunk_id"]))
+            
+            extra = {key: value for key, value in row.items() if key not in _COLUMN_KEYS}
+            if str(row.get("document_id", document_id)) != document_id:
+                extra["document_id"] = str(row["document_id"])
+            try:
+                extras.append(json.dumps(extra, default=_json_default) if extra else None)
+            except TypeError as e:
+                raise ValueError(f"Metadata row {position} has a value that cannot be stored: {e}")
+        
+        return cls(
+            document_id=document_id,
+            chunk_ids=chunk_ids,
+            chunk_indices=[row.get("chunk_index") or 0 for row in rows],
+            page_numbers=[_NO_PAGE if row.get("page_number") is None else row["page_number"] for row in rows],
+            token_counts=[row.get("token_count") or 0 for row in rows],
+            contents=[row.get("content") for row in rows] if any("content" in row for row in rows) else None,
+            extras=extras if any(extra is not None for extra in extras) else None
+        )
+    
+    @classmethod
+    def load(cls, f: BinaryIO) -> "ChunkMetadata":
+        """Read columnar metadata written by ``save``."""
+        with np.load(f, allow_pickle=False) as columns:
+            chunk_ids = columns["chunk_ids"]
+            if "page_codes" in columns.files:
+                page_numbers = columns["page_values"][columns["page_codes"]]
+            else:
+                page_numbers = columns["page_numbers"]
+            
+            contents = None
+            if "content_lengths" in columns.files:
+                contents = _decode_strings(columns["content_data"], columns["content_lengths"])
+            
+            extras = None
+            if "extra_lengths" in columns.files:
+                extras = _decode_strings(columns["extra_data"], columns["extra_lengths"])
+            
+            return cls(
+                document_id=str(columns["document_id"]),
+                chunk_ids=[c.decode() for c in chunk_ids.tolist()] if chunk_ids.dtype.kind == "S" else chunk_ids.tolist(),
+                chunk_indices=columns["chunk_indices"],
+                page_numbers=page_numbers,
+                token_counts=columns["token_counts"],
+                contents=contents,
+                extras=extras,
+                embedding_model=str(columns["embedding_model"]) if "embedding_model" in columns.files else None
+            )
+    
+    def save(self, f: BinaryIO) -> None:
+        """
+        Write each column as a typed array of an uncompressed ``.npz`` archive.
+        
+        Chunk IDs are stored as UTF-8 bytes, page numbers are dictionary-encoded
+        (a document has far fewer pages than chunks) and integer columns use the
+        narrowest dtype that holds their values; ``load`` widens them back.
+        Contents and extras, when present, are each one UTF-8 blob plus per-row
+        byte lengths.
+        """
+        page_values, page_codes = np.unique(self.page_numbers, return_inverse=True)
+        columns = {}
+        for name, values in (("content", self.contents), ("extra", self.extras)):
+            if values is not None:
+                encoded = _encode_strings(values)
+                columns[f"{name}_data"] = encoded["data"]
+                columns[f"{name}_lengths"] = encoded["lengths"]
+        if self.embedding_model is not None:
+            columns["embedding_model"] = np.array(self.embedding_model)
+        
+        np.savez(
+            f,
+            document_id=np.array(self.document_id),
+            chunk_ids=np.array([chunk_id.encode() for chunk_id in self.chunk_ids], dtype=np.bytes_),
+            chunk_indices=_narrow(self.chunk_indices),
+            page_values=page_values.astype(np.int32),
+            page_codes=_narrow(page_codes),
+            token_counts=_narrow(self.token_counts),
+            **columns
+        )
+    
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+    
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        page_number = int(self.page_numbers[idx])
+        row = {
+            "document_id": self.document_id,
+            "chunk_id": self.chunk_ids[idx],
+            "chunk_index": int(self.chunk_indices[idx]),
+            "page_number": None if page_number == _NO_PAGE else page_number,
+            "token_count": int(self.token_counts[idx])
+        }
+        if self.contents is not None:
+            row["content"] = self.contents[idx]
+        if self.extras is not None and self.extras[idx] is not None:
+            row.update(json.loads(self.extras[idx]))
+        return row
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for idx in range(len(self)):
+            yield self[idx]
+    
+    def __add__(self, other: Union["ChunkMetadata", Sequence[Dict[str, Any]]]) -> "ChunkMetadata":
+        if isinstance(other, ChunkMetadata) and other.document_id in ("", self.document_id):
+            pass
+        elif self.document_id:
+            # Rows from another document keep their document_id in extras
+            other = ChunkMetadata.from_rows(list(other), document_id=self.document_id)
+        else:
+            other = ChunkMetadata.from_rows(other)
+        
+        contents = None
+        if self.contents is not None or other.contents is not None:
+            contents = (self.contents or [None] * len(self)) + (other.contents or [None] * len(other))
+        extras = None
+        if self.extras is not None or other.extras is not None:
+            extras = (self.extras or [None] * len(self)) + (other.extras or [None] * len(other))
+        
+        return ChunkMetadata(
+            document_id=self.document_id or other.document_id,
+            chunk_ids=self.chunk_ids + other.chunk_ids,
+            chunk_indices=np.concatenate([self.chunk_indices, other.chunk_indices]),
+            page_numbers=np.concatenate([self.page_numbers, other.page_numbers]),
+            token_counts=np.concatenate([self.token_counts, other.token_counts]),
+            contents=contents,
+            extras=extras,
+            embedding_model=self.embedding_model or other.embedding_model
+        )
+    
+    def __radd__(self, other: Sequence[Dict[str, Any]]) -> "ChunkMetadata":
+        return ChunkMetadata.from_rows(other) + self
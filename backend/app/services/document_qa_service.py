@@ -17,8 +17,7 @@ from app.core.exceptions import DocumentQAError
 from app.models.document import Document, DocumentQAInteraction
 from app.schemas.document import DocumentQARequest, DocumentQAResponse, ContextSource
 from app.services.embedding_service import EmbeddingService
-from app.services.vector_store import FAISSVectorStore
-from app.services.simple_vector_store import SimpleVectorStore
+from app.services.vector_store import create_vector_store
 from app.services.groq_service import get_groq_service
 from app.db.repositories.document_repository import DocumentRepository
 
@@ -30,9 +29,8 @@ class DocumentQAService:
     
     def __init__(self):
         self.embedding_service = EmbeddingService()
-        # Use simple vector store as default since FAISS has compatibility issues
-        logger.info("Using simple vector store for Q&A")
-        self.vector_store = SimpleVectorStore(self.embedding_service)
+        # Must match the store DocumentService indexes into
+        self.vector_store = create_vector_store(self.embedding_service)
         self.groq_service = get_groq_service()
         
         logger.info("Initialized Document Q&A service")
@@ -90,6 +88,7 @@ class DocumentQAService:
                 k=max_chunks,
                 threshold=0.3  # Minimum relevance threshold
             )
+            search_results = await self._attach_content(repo, search_results)
             
             if not search_results:
                 return DocumentQAResponse(
@@ -155,6 +154,43 @@ class DocumentQAService:
             logger.error(f"Error in document Q&A: {e}")
             raise DocumentQAError(f"Failed to process question: {str(e)}")
     
+    async def _attach_content(
+        self,
+        repo: DocumentRepository,
+        search_results: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Attach chunk content to vector store search results.
+        
+        The vector store only keeps chunk IDs, so content for all hits is
+        fetched from the database in a single query.
+        
+        Args:
+            repo: Document repository
+            search_results: Search results from the vector store
+            
+        Returns:
+            Results with content, in the same order; hits whose chunk no
+            longer exists are dropped
+        """
+        missing_ids = [UUID(result['chunk_id']) for result in search_results if result.get('content') is None]
+        if not missing_ids:
+            return search_results
+        
+        chunks = await repo.get_chunks_by_ids(missing_ids)
+        content_by_id = {str(chunk.id): chunk.content for chunk in chunks}
+        
+        attached = []
+        for result in search_results:
+            if result.get('content') is None:
+                content = content_by_id.get(result['chunk_id'])
+                if content is None:
+                    logger.warning(f"Chunk {result['chunk_id']} not found, skipping search result")
+                    continue
+                result['content'] = content
+            attached.append(result)
+        return attached
+    
     async def _generate_answer(
         self,
         question: str,
@@ -463,6 +499,7 @@ Please answer the following question based ONLY on the context provided above.""
                 k=max_results,
                 threshold=threshold
             )
+            search_results = await self._attach_content(repo, search_results)
             
             # Format results
             passages = []
@@ -5,11 +5,16 @@ and vector embedding generation.
 """
 
 import asyncio
+import hashlib
+import io
 import logging
 import mimetypes
-import tempfile
+import re
 import os
-from typing import List, Dict, Any, Optional, BinaryIO
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, BinaryIO, AsyncIterator, Callable, Tuple
 from uuid import UUID
 from datetime import datetime
 from pathlib import Path
@@ -21,6 +26,11 @@ except ImportError:
         import fitz as PyMuPDF  # Alternative import name
     except ImportError:
         PyMuPDF = None
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
 import docx
 import numpy as np
 import markdown
@@ -33,12 +43,118 @@ from app.schemas.document import DocumentCreate
 from app.db.repositories.document_repository import DocumentRepository
 from app.services.file_service import FileService
 from app.services.embedding_service import EmbeddingService
-from app.services.vector_store import FAISSVectorStore
-from app.services.simple_vector_store import SimpleVectorStore
+from app.services.embedding_cache import EmbeddingCache, simhash64
+from app.services.chunk_metadata import ChunkMetadata
+from app.services.vector_store import create_vector_store
 from app.core.exceptions import DocumentProcessingError, FileStorageError
 
 logger = logging.getLogger(__name__)
 
+# Page separators emitted by _extract_pdf_text
+_PAGE_MARKER_RE = re.compile(r"--- Page (\d+) ---")
+
+# Keep whitespace layout and join words hyphenated across line breaks
+_PDF_TEXT_FLAGS = (
+    PyMuPDF.TEXT_PRESERVE_WHITESPACE | PyMuPDF.TEXT_DEHYPHENATE
+    if PyMuPDF is not None else 0
+)
+
+# PDFs with more pages than this are extracted across worker processes
+_PDF_PARALLEL_PAGE_THRESHOLD = 20
+_PDF_WORKERS = min(8, os.cpu_count() or 1)
+_pdf_process_pool: Optional[ProcessPoolExecutor] = None
+
+# WordprocessingML namespace used by word/document.xml
+_DOCX_NS = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
+# Run content read from a paragraph, as python-docx reads it: text, plus tabs
+# and line breaks, which map to whitespace so words on either side stay apart
+_DOCX_RUN_CONTENT = "|".join(
+    f"./{run}/*[self::w:t or self::w:tab or self::w:br or self::w:cr]"
+    for run in ("w:r", "w:hyperlink/w:r")
+)
+_DOCX_RUN_WHITESPACE = {"tab": "\t", "br": "\n", "cr": "\n"}
+
+# Fallback tag stripper when lxml is not installed
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+# Shared tokenizer; loading the BPE ranks is costly, so do it once per process
+_TOKENIZER = tiktoken.get_encoding("cl100k_base")
+
+# settings.chunk_size/chunk_overlap are in characters; approximate tokens from them
+_CHARS_PER_TOKEN = 4
+
+
+def _snap_to_char_boundary(tokens: List[int], position: int) -> int:
+    """
+    Move a token position forward past tokens that continue a UTF-8 character.
+    
+    cl100k splits some multi-byte characters across tokens, and a window edge
+    between them would decode to U+FFFD on both sides.
+    """
+    while position < len(tokens) and _TOKENIZER.decode_single_token_bytes(tokens[position])[0] & 0xC0 == 0x80:
+        position += 1
+    return position
+
+
+def _token_window(tokens: List[int], start: int, window: int) -> List[int]:
+    """Slice a token window, with both edges moved to whole-character boundaries."""
+    return tokens[_snap_to_char_boundary(tokens, start):_snap_to_char_boundary(tokens, start + window)]
+
+
+def _docx_paragraph_text(paragraph) -> str:
+    """Get the text of a w:p element, with tabs and line breaks as whitespace."""
+    return "".join(
+        _DOCX_RUN_WHITESPACE.get(lxml.etree.QName(node).localname, node.text or "")
+        for node in paragraph.xpath(_DOCX_RUN_CONTENT, namespaces=_DOCX_NS)
+    )
+
+
+def _get_pdf_process_pool() -> ProcessPoolExecutor:
+    """Get or create the process pool used for PDF page extraction."""
+    global _pdf_process_pool
+    
+    if _pdf_process_pool is None:
+        _pdf_process_pool = ProcessPoolExecutor(max_workers=_PDF_WORKERS)
+    
+    return _pdf_process_pool
+
+
+def _extract_pdf_pages(pdf_doc, start: int, end: int) -> List[str]:
+    """Extract marked-up text for pages [start, end) of an open PDF document."""
+    parts = []
+    for page_num in range(start, end):
+        page = pdf_doc.load_page(page_num)
+        page_text = page.get_text("text", flags=_PDF_TEXT_FLAGS)
+        if page_text.strip():
+            parts.append(f"\n--- Page {page_num + 1} ---\n{page_text}\n")
+    return parts
+
+
+def _extract_small_pdf(file_content: bytes) -> Tuple[int, Optional[List[str]]]:
+    """
+    Open a PDF and extract it in-process if it is below the parallel threshold.
+    
+    Returns:
+        Tuple of (page count, page parts), with parts None for large PDFs
+    """
+    pdf_doc = PyMuPDF.open(stream=file_content, filetype="pdf")
+    try:
+        page_count = len(pdf_doc)
+        if page_count <= _PDF_PARALLEL_PAGE_THRESHOLD:
+            return page_count, _extract_pdf_pages(pdf_doc, 0, page_count)
+        return page_count, None
+    finally:
+        pdf_doc.close()
+
+
+def _extract_pdf_page_range(file_content: bytes, start: int, end: int) -> List[str]:
+    """Worker entry point: open the PDF from bytes and extract a page range."""
+    pdf_doc = PyMuPDF.open(stream=file_content, filetype="pdf")
+    try:
+        return _extract_pdf_pages(pdf_doc, start, end)
+    finally:
+        pdf_doc.close()
+
 
 class DocumentService:
     """Service for handling document upload, processing, and management."""
@@ -46,10 +162,12 @@ class DocumentService:
     def __init__(self):
         self.file_service = FileService()
         self.embedding_service = EmbeddingService()
-        # Use simple vector store as default since FAISS has compatibility issues
-        logger.info("Using simple vector store")
-        self.vector_store = SimpleVectorStore(self.embedding_service)
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.embedding_cache = EmbeddingCache()
+        # Simple vector store by default; FAISS flat/HNSW via settings.vector_index
+        self.vector_store = create_vector_store(self.embedding_service)
+        self.tokenizer = _TOKENIZER
+        # Markdown converters keep parser state, so each thread gets its own
+        self._markdown_local = threading.local()
         
         # Ensure vector store directory exists
         os.makedirs(settings.vector_store_path, exist_ok=True)
@@ -124,20 +242,45 @@ class DocumentService:
             # Download file for processing
             file_content = await self.file_service.download_file(document.file_path)
             
-            # Extract text based on file type
-            text_content = await self._extract_text(file_content, document.file_type)
+            # Extract and chunk text as a stream, embedding each batch of
+            # chunks while extraction continues
+            chunks = []
+            batch_texts = []
+            embedding_tasks = []
+            semaphore = asyncio.Semaphore(settings.embed_concurrency)
             
-            if not text_content.strip():
-                raise DocumentProcessingError("No text content extracted from document")
+            async def embed_batch(texts: List[str]) -> np.ndarray:
+                async with semaphore:
+                    return await self._embed_texts_cached(texts)
             
-            # Split text into chunks
-            chunks = await self._create_text_chunks(text_content, document_id)
+            try:
+                async for chunk in self._stream_chunks(file_content, document.file_type, document_id):
+                    chunks.append(chunk)
+                    batch_texts.append(chunk.content)
+                    if len(batch_texts) == settings.embed_batch_size:
+                        embedding_tasks.append(asyncio.create_task(embed_batch(batch_texts)))
+                        batch_texts = []
+                
+                if batch_texts:
+                    embedding_tasks.append(asyncio.create_task(embed_batch(batch_texts)))
+                
+                if not chunks:
+                    raise DocumentProcessingError("No text content extracted from document")
+                
+                embeddings = np.concatenate(await asyncio.gather(*embedding_tasks))
+            finally:
+                # If extraction or any batch failed, stop the batches still running
+                # and wait for them, so none outlives the failed document; the
+                # original exception propagates rather than an ExceptionGroup
+                for task in embedding_tasks:
+                    task.cancel()
+                await asyncio.gather(*embedding_tasks, return_exceptions=True)
             
             # Save chunks to database
             await repo.save_document_chunks(chunks)
             
-            # Generate and save vector embeddings
-            await self._generate_vector_embeddings(document_id, chunks)
+            # Save vector embeddings
+            await self._generate_vector_embeddings(document_id, chunks, embeddings)
             
             # Update document status
             await repo.update_processing_status(
@@ -187,73 +330,136 @@ class DocumentService:
     async def _extract_pdf_text(self, file_content: bytes) -> str:
         """Extract text from PDF file using PyMuPDF."""
         try:
-            if PyMuPDF is None:
-                raise DocumentProcessingError("PyMuPDF is not installed. Please install it to process PDF files.")
-            
-            with tempfile.NamedTemporaryFile() as temp_file:
-                temp_file.write(file_content)
-                temp_file.flush()
-                
-                text_content = ""
-                pdf_doc = PyMuPDF.open(temp_file.name)
-                
-                for page_num in range(len(pdf_doc)):
-                    page = pdf_doc.load_page(page_num)
-                    page_text = page.get_text()
-                    if page_text.strip():
-                        text_content += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
-                
-                pdf_doc.close()
-                return text_content
+            return "".join([part async for part in self._iter_pdf_pages(file_content)])
                 
         except Exception as e:
             logger.error(f"Error extracting PDF text: {e}")
             raise DocumentProcessingError(f"Failed to extract PDF text: {str(e)}")
     
+    async def _iter_pdf_pages(self, file_content: bytes) -> AsyncIterator[str]:
+        """
+        Yield marked-up PDF page text in page order.
+        
+        Large PDFs are split into contiguous page ranges extracted in worker
+        processes; each range is yielded as soon as it and its predecessors finish.
+        """
+        if PyMuPDF is None:
+            raise DocumentProcessingError("PyMuPDF is not installed. Please install it to process PDF files.")
+        
+        page_count, parts = await asyncio.to_thread(_extract_small_pdf, file_content)
+        if parts is not None:
+            for part in parts:
+                yield part
+            return
+        
+        # Large PDFs: split pages into contiguous ranges, one per worker
+        pool = _get_pdf_process_pool()
+        step = -(-page_count // _PDF_WORKERS)
+        loop = asyncio.get_running_loop()
+        
+        page_ranges = [
+            loop.run_in_executor(
+                pool,
+                _extract_pdf_page_range,
+                file_content,
+                start,
+                min(start + step, page_count)
+            )
+            for start in range(0, page_count, step)
+        ]
+        
+        for page_range in page_ranges:
+            for part in await page_range:
+                yield part
+    
     async def _extract_docx_text(self, file_content: bytes) -> str:
         """Extract text from DOCX file."""
         try:
-            with tempfile.NamedTemporaryFile() as temp_file:
-                temp_file.write(file_content)
-                temp_file.flush()
-                
-                doc = docx.Document(temp_file.name)
-                text_content = ""
-                
-                for paragraph in doc.paragraphs:
-                    if paragraph.text.strip():
-                        text_content += paragraph.text + "\n"
-                
-                # Extract text from tables
-                for table in doc.tables:
-                    for row in table.rows:
-                        row_text = []
-                        for cell in row.cells:
-                            if cell.text.strip():
-                                row_text.append(cell.text.strip())
-                        if row_text:
-                            text_content += " | ".join(row_text) + "\n"
-                
-                return text_content
+            if lxml is not None:
+                return await asyncio.to_thread(self._extract_docx_xml_text, file_content)
+            return await asyncio.to_thread(self._extract_docx_text_sync, file_content)
                 
         except Exception as e:
             logger.error(f"Error extracting DOCX text: {e}")
             raise DocumentProcessingError(f"Failed to extract DOCX text: {str(e)}")
     
+    @staticmethod
+    def _extract_docx_text_sync(file_content: bytes) -> str:
+        """Extract DOCX paragraphs and table rows with python-docx."""
+        doc = docx.Document(io.BytesIO(file_content))
+        parts = []
+        
+        for paragraph in doc.paragraphs:
+            if paragraph.text.strip():
+                parts.append(paragraph.text + "\n")
+        
+        # Extract text from tables
+        for table in doc.tables:
+            for row in table.rows:
+                row_text = []
+                for cell in row.cells:
+                    if cell.text.strip():
+                        row_text.append(cell.text.strip())
+                if row_text:
+                    parts.append(" | ".join(row_text) + "\n")
+        
+        return "".join(parts)
+    
+    @staticmethod
+    def _extract_docx_xml_text(file_content: bytes) -> str:
+        """Extract DOCX paragraphs and table rows directly from word/document.xml."""
+        with zipfile.ZipFile(io.BytesIO(file_content)) as archive:
+            root = lxml.etree.fromstring(archive.read("word/document.xml"))
+        
+        parts = []
+        
+        for paragraph in root.xpath("/w:document/w:body/w:p", namespaces=_DOCX_NS):
+            text = _docx_paragraph_text(paragraph)
+            if text.strip():
+                parts.append(text + "\n")
+        
+        # Extract text from top-level tables; like python-docx, cells only read
+        # their own paragraphs, so nested tables are left out
+        for row in root.xpath("/w:document/w:body/w:tbl/w:tr", namespaces=_DOCX_NS):
+            row_text = []
+            for cell in row.xpath("./w:tc", namespaces=_DOCX_NS):
+                cell_text = "\n".join(
+                    _docx_paragraph_text(p)
+                    for p in cell.xpath("./w:p", namespaces=_DOCX_NS)
+                ).strip()
+                if cell_text:
+                    row_text.append(cell_text)
+            if row_text:
+                parts.append(" | ".join(row_text) + "\n")
+        
+        return "".join(parts)
+    
     async def _extract_markdown_text(self, file_content: bytes) -> str:
         """Extract text from Markdown file."""
         try:
-            md_content = file_content.decode('utf-8', errors='ignore')
-            # Convert markdown to plain text
-            html = markdown.markdown(md_content)
-            # Simple HTML tag removal
-            import re
-            clean_text = re.sub(r'<[^>]+>', '', html)
-            return clean_text
+            return await asyncio.to_thread(self._extract_markdown_text_sync, file_content)
         except Exception as e:
             logger.error(f"Error extracting Markdown text: {e}")
             raise DocumentProcessingError(f"Failed to extract Markdown text: {str(e)}")
     
+    def _extract_markdown_text_sync(self, file_content: bytes) -> str:
+        """Convert Markdown to plain text using this thread's converter."""
+        converter = getattr(self._markdown_local, "converter", None)
+        if converter is None:
+            converter = markdown.Markdown(output_format="html")
+            self._markdown_local.converter = converter
+        
+        md_content = file_content.decode('utf-8', errors='ignore')
+        # Convert markdown to plain text
+        html = converter.reset().convert(md_content)
+        if lxml is not None:
+            try:
+                return lxml.html.fromstring(html).text_content()
+            except Exception:
+                # Empty or unparsable documents fall back to tag stripping
+                pass
+        return _HTML_TAG_RE.sub('', html)
+    
     async def _create_text_chunks(
         self, 
         text_content: str, 
@@ -262,6 +468,9 @@ class DocumentService:
         """
         Split text into chunks and create DocumentChunk objects.
         
+        The text is tokenized once and split into fixed-size token windows,
+        so chunk sizes are uniform in tokens and no region is re-tokenized.
+        
         Args:
             text_content: Full text content
             document_id: ID of the parent document
@@ -270,52 +479,152 @@ class DocumentService:
             List of DocumentChunk objects
         """
         try:
-            # Simple text splitting based on chunk size
-            chunk_size = settings.chunk_size
-            chunk_overlap = settings.chunk_overlap
+            chunks = await asyncio.to_thread(self._create_text_chunks_sync, text_content, document_id)
             
-            chunks = []
-            current_page = 1
+            logger.info(f"Created {len(chunks)} chunks for document {document_id}")
+            return chunks
             
-            # Split text into chunks with overlap
-            text_len = len(text_content)
-            for i in range(0, text_len, chunk_size - chunk_overlap):
-                chunk_text = text_content[i:i + chunk_size]
-                
-                if not chunk_text.strip():
-                    continue
-                
-                # Count tokens
-                token_count = len(self.tokenizer.encode(chunk_text))
+        except Exception as e:
+            logger.error(f"Error creating text chunks: {e}")
+            raise DocumentProcessingError(f"Failed to create text chunks: {str(e)}")
+    
+    def _create_text_chunks_sync(self, text_content: str, document_id: UUID) -> List[DocumentChunk]:
+        """Tokenize text once and split it into overlapping token-window chunks."""
+        window, step = self._token_window_sizes()
+        tokens = _TOKENIZER.encode_ordinary(text_content)
+        
+        # Split tokens into windows with overlap
+        windows = [_token_window(tokens, start, window) for start in range(0, len(tokens), step)]
+        chunks, _ = self._build_token_chunks(document_id, windows, 0, 1)
+        return chunks
+    
+    async def _stream_chunks(
+        self,
+        file_content: bytes,
+        file_type: str,
+        document_id: UUID
+    ) -> AsyncIterator[DocumentChunk]:
+        """
+        Yield document chunks as text is extracted.
+        
+        PDF pages are tokenized as they arrive and fed through a rolling token
+        window, so the full document text is never materialized; other file
+        types are extracted whole and split with _create_text_chunks.
+        
+        Args:
+            file_content: Raw file bytes
+            file_type: MIME type of the file
+            document_id: ID of the parent document
+        """
+        if file_type != "application/pdf":
+            text_content = await self._extract_text(file_content, file_type)
+            if text_content.strip():
+                for chunk in await self._create_text_chunks(text_content, document_id):
+                    yield chunk
+            return
+        
+        window, step = self._token_window_sizes()
+        
+        tokens: List[int] = []
+        token_offset = 0  # Position of tokens[0] in the full document token stream
+        next_start = 0
+        current_page = 1
+        chunk_index = 0
+        
+        try:
+            async for part in self._iter_pdf_pages(file_content):
+                tokens.extend(await asyncio.to_thread(_TOKENIZER.encode_ordinary, part))
                 
-                # Estimate page number (simple heuristic)
-                if "--- Page" in chunk_text:
-                    try:
-                        page_marker = chunk_text.split("--- Page")[1].split("---")[0].strip()
-                        current_page = int(page_marker)
-                    except (IndexError, ValueError):
-                        pass
+                # Emit every window that is now complete
+                windows = []
+                while next_start + window <= token_offset + len(tokens):
+                    local_start = next_start - token_offset
+                    windows.append(_token_window(tokens, local_start, window))
+                    next_start += step
                 
-                chunk = DocumentChunk(
-                    document_id=document_id,
-                    chunk_index=len(chunks),
-                    content=chunk_text,
-                    token_count=token_count,
-                    page_number=current_page
+                chunks, current_page = await asyncio.to_thread(
+                    self._build_token_chunks, document_id, windows, chunk_index, current_page
                 )
-                chunks.append(chunk)
+                chunk_index += len(chunks)
+                for chunk in chunks:
+                    yield chunk
+                
+                # Drop tokens no future window can reach
+                del tokens[:next_start - token_offset]
+                token_offset = next_start
+            
+            # Trailing partial windows
+            windows = [
+                _token_window(tokens, local_start, window)
+                for local_start in range(next_start - token_offset, len(tokens), step)
+            ]
+            chunks, current_page = await asyncio.to_thread(
+                self._build_token_chunks, document_id, windows, chunk_index, current_page
+            )
+            chunk_index += len(chunks)
+            for chunk in chunks:
+                yield chunk
             
-            logger.info(f"Created {len(chunks)} chunks for document {document_id}")
-            return chunks
+            logger.info(f"Streamed {chunk_index} chunks for document {document_id}")
             
+        except DocumentProcessingError:
+            raise
         except Exception as e:
-            logger.error(f"Error creating text chunks: {e}")
+            logger.error(f"Error streaming text chunks: {e}")
             raise DocumentProcessingError(f"Failed to create text chunks: {str(e)}")
     
+    @staticmethod
+    def _token_window_sizes() -> Tuple[int, int]:
+        """Get (window, step) in tokens from the character-based chunk settings."""
+        window = max(1, settings.chunk_size // _CHARS_PER_TOKEN)
+        overlap = settings.chunk_overlap // _CHARS_PER_TOKEN
+        return window, max(1, window - overlap)
+    
+    @staticmethod
+    def _build_token_chunks(
+        document_id: UUID,
+        windows: List[List[int]],
+        first_index: int,
+        current_page: int
+    ) -> Tuple[List[DocumentChunk], int]:
+        """
+        Decode token windows into DocumentChunks, skipping whitespace-only windows.
+        
+        All windows are decoded in one multithreaded tiktoken call.
+        
+        Returns:
+            Tuple of (chunks, page number of the last chunk)
+        """
+        chunks = []
+        if not windows:
+            return chunks, current_page
+        
+        chunk_texts = _TOKENIZER.decode_batch(windows, num_threads=os.cpu_count() or 1)
+        
+        for chunk_tokens, chunk_text in zip(windows, chunk_texts):
+            if not chunk_text.strip():
+                continue
+            
+            # A page marker inside this chunk sets the page number
+            marker = _PAGE_MARKER_RE.search(chunk_text)
+            if marker:
+                current_page = int(marker.group(1))
+            
+            chunks.append(DocumentChunk(
+                document_id=document_id,
+                chunk_index=first_index + len(chunks),
+                content=chunk_text,
+                token_count=len(chunk_tokens),
+                page_number=current_page
+            ))
+        
+        return chunks, current_page
+    
     async def _generate_vector_embeddings(
         self, 
         document_id: UUID, 
-        chunks: List[DocumentChunk]
+        chunks: List[DocumentChunk],
+        embeddings: Optional[np.ndarray] = None
     ) -> None:
         """
         Generate vector embeddings for document chunks and save to FAISS.
@@ -323,6 +632,7 @@ class DocumentService:
         Args:
             document_id: ID of the document
             chunks: List of document chunks
+            embeddings: Precomputed embeddings aligned with chunks, if already generated
         """
         try:
             if not chunks:
@@ -334,20 +644,11 @@ class DocumentService:
             
             # Prepare texts and metadata
             texts = [chunk.content for chunk in chunks]
-            metadatas = [
-                {
-                    "document_id": str(document_id),
-                    "chunk_id": str(chunk.id),
-                    "chunk_index": chunk.chunk_index,
-                    "page_number": chunk.page_number,
-                    "token_count": chunk.token_count,
-                    "content": chunk.content
-                }
-                for chunk in chunks
-            ]
+            metadatas = ChunkMetadata.from_chunks(document_id, chunks)
             
-            # Generate embeddings
-            embeddings = await self.embedding_service.generate_embeddings(texts)
+            # Generate embeddings, reusing cached vectors for unchanged content
+            if embeddings is None:
+                embeddings = await self._embed_texts_cached(texts)
             
             # Validate embeddings format
             if not isinstance(embeddings, np.ndarray):
@@ -358,8 +659,18 @@ class DocumentService:
                 logger.error(f"Embeddings must be 2D array, got shape {embeddings.shape}")
                 raise DocumentProcessingError("Invalid embeddings dimensions")
             
-            # Create FAISS index
-            await self.vector_store.create_index(document_id, embeddings, metadatas)
+            if settings.shared_corpus_index and hasattr(self.vector_store, "add_vectors"):
+                # Replace this document's vectors in the shared corpus index
+                ids = np.fromiter(
+                    (self.vector_store.corpus_vector_id(document_id, chunk.chunk_index) for chunk in chunks),
+                    dtype=np.int64,
+                    count=len(chunks)
+                )
+                await self.vector_store.remove_document(document_id)
+                await self.vector_store.add_vectors(ids=ids, vectors=embeddings, metadatas=metadatas)
+            else:
+                # Create per-document index
+                await self.vector_store.create_index(document_id, embeddings, metadatas)
             
             logger.info(f"Generated embeddings for document {document_id}")
             
@@ -367,6 +678,103 @@ class DocumentService:
             logger.error(f"Error generating vector embeddings: {e}")
             raise DocumentProcessingError(f"Failed to generate embeddings: {str(e)}")
     
+    async def _embed_texts_cached(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, only calling the embedding model for content not already cached.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Float32 array of shape (len(texts), embedding_dim)
+        """
+        model = self.embedding_service.get_model_identifier()
+        dim = self.embedding_service.get_embedding_dimension()
+        hashes = [hashlib.sha256(text.encode()).digest() for text in texts]
+        
+        # The cache is SQLite-backed, so its queries run off the event loop
+        cached = await asyncio.to_thread(self.embedding_cache.lookup, hashes, model, dim)
+        uncached_idx = [i for i, content_hash in enumerate(hashes) if content_hash not in cached]
+        
+        embeddings = np.empty((len(texts), dim), dtype=np.float32)
+        for i, content_hash in enumerate(hashes):
+            if content_hash in cached:
+                embeddings[i] = cached[content_hash]
+        
+        # Reuse embeddings of near-duplicate chunks seen before
+        fingerprints: Dict[int, Optional[int]] = {}
+        near_hits = 0
+        if uncached_idx and settings.simhash_max_distance >= 0:
+            fingerprints = dict(zip(
+                uncached_idx,
+                await asyncio.to_thread(lambda: [simhash64(texts[i]) for i in uncached_idx])
+            ))
+            near = await asyncio.to_thread(
+                self.embedding_cache.lookup_near,
+                [fp for fp in fingerprints.values() if fp is not None],
+                model,
+                dim,
+                settings.simhash_max_distance
+            )
+            reused_idx = [i for i in uncached_idx if fingerprints[i] in near]
+            if reused_idx:
+                # Reused vectors are approximations, so they are not stored under
+                # these texts' exact hashes
+                for i in reused_idx:
+                    embeddings[i] = near[fingerprints[i]]
+                near_hits = len(reused_idx)
+                uncached_idx = [i for i in uncached_idx if fingerprints[i] not in near]
+        
+        if uncached_idx:
+            fresh = await self._embed_texts([texts[i] for i in uncached_idx])
+            embeddings[uncached_idx] = fresh
+            await asyncio.to_thread(self.embedding_cache.store, [hashes[i] for i in uncached_idx], model, fresh)
+            
+            fingerprinted = [(n, fingerprints[i]) for n, i in enumerate(uncached_idx) if fingerprints.get(i) is not None]
+            if fingerprinted:
+                await asyncio.to_thread(
+                    self.embedding_cache.store_near,
+                    [fp for _, fp in fingerprinted],
+                    model,
+                    fresh[[n for n, _ in fingerprinted]]
+                )
+        
+        logger.info(
+            f"Embedding cache hits: {len(texts) - len(uncached_idx)}/{len(texts)} "
+            f"({near_hits} near-duplicate)"
+        )
+        return embeddings
+    
+    async def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts in length-sorted micro-batches and restore input order.
+        
+        Sorting by length keeps texts of similar size in the same batch so
+        padding is not dominated by the longest text of the whole document.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Float32 array of shape (len(texts), embedding_dim)
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batch_size = settings.embed_batch_size
+        batches = [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+        semaphore = asyncio.Semaphore(settings.embed_concurrency)
+        
+        async def embed_batch(batch: List[int]) -> np.ndarray:
+            async with semaphore:
+                return await self.embedding_service.generate_embeddings([texts[i] for i in batch])
+        
+        results = await asyncio.gather(*[embed_batch(batch) for batch in batches])
+        
+        embeddings = np.empty((len(texts), results[0].shape[1]), dtype=np.float32)
+        for batch, batch_embeddings in zip(batches, results):
+            embeddings[batch] = batch_embeddings
+        
+        return embeddings
+    
     async def get_document_vector_store(self, document_id: UUID) -> bool:
         """
         Check if FAISS vector store exists for a document.
@@ -384,6 +792,49 @@ class DocumentService:
             logger.error(f"Error checking vector store for document {document_id}: {e}")
             return False
     
+    async def search_document(
+        self,
+        document_id: UUID,
+        query: str,
+        db: Session,
+        k: int = 5,
+        threshold: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Search a document's chunks and attach their content.
+        
+        The vector store only keeps chunk IDs, so content for all hits is
+        fetched from the database in a single query.
+        
+        Args:
+            document_id: ID of the document to search
+            query: Search query text
+            db: Database session
+            k: Number of results to return
+            threshold: Minimum similarity threshold
+            
+        Returns:
+            List of search results with content and scores
+        """
+        try:
+            query_embedding = await self.embedding_service.generate_single_embedding(query)
+            results = await self.vector_store.search(document_id, query_embedding, k, threshold)
+            
+            missing_ids = [UUID(result['chunk_id']) for result in results if result.get('content') is None]
+            if missing_ids:
+                repo = DocumentRepository(db)
+                chunks = await repo.get_chunks_by_ids(missing_ids)
+                content_by_id = {str(chunk.id): chunk.content for chunk in chunks}
+                for result in results:
+                    if result.get('content') is None:
+                        result['content'] = content_by_id.get(result['chunk_id'])
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error searching document {document_id}: {e}")
+            raise DocumentProcessingError(f"Failed to search document: {str(e)}")
+    
     async def delete_document(self, document_id: UUID, db: Session) -> None:
         """
         Delete document and all associated data.
@@ -489,14 +940,19 @@ class DocumentService:
     async def bulk_process_documents(
         self, 
         document_ids: List[UUID], 
-        db: Session
+        db: Session,
+        session_factory: Optional[Callable[[], Session]] = None
     ) -> Dict[str, Any]:
         """
         Process multiple documents in batch.
         
+        A fixed pool of workers pulls document IDs from a queue, so concurrency
+        is bounded by max_concurrent_processing rather than the batch size.
+        
         Args:
             document_ids: List of document IDs to process
             db: Database session
+            session_factory: Optional factory giving each worker its own session
             
         Returns:
             Processing results summary
@@ -508,24 +964,31 @@ class DocumentService:
                 "total": len(document_ids)
             }
             
-            # Process documents concurrently (with limit)
-            semaphore = asyncio.Semaphore(settings.max_concurrent_processing)
-            
-            async def process_single(doc_id):
-                async with semaphore:
-                    try:
-                        await self.process_document_content(doc_id, db)
-                        results["successful"].append(str(doc_id))
-                    except Exception as e:
-                        results["failed"].append({
-                            "document_id": str(doc_id),
-                            "error": str(e)
-                        })
-            
-            # Run all processing tasks
-            await asyncio.gather(*[
-                process_single(doc_id) for doc_id in document_ids
-            ], return_exceptions=True)
+            queue: asyncio.Queue = asyncio.Queue()
+            for doc_id in document_ids:
+                queue.put_nowait(doc_id)
+            
+            async def worker():
+                worker_db = session_factory() if session_factory else db
+                try:
+                    while not queue.empty():
+                        doc_id = queue.get_nowait()
+                        try:
+                            await self.process_document_content(doc_id, worker_db)
+                            results["successful"].append(str(doc_id))
+                        except Exception as e:
+                            results["failed"].append({
+                                "document_id": str(doc_id),
+                                "error": str(e)
+                            })
+                finally:
+                    if session_factory:
+                        worker_db.close()
+            
+            num_workers = min(settings.max_concurrent_processing, len(document_ids))
+            async with asyncio.TaskGroup() as tg:
+                for _ in range(num_workers):
+                    tg.create_task(worker())
             
             logger.info(f"Bulk processing completed: {len(results['successful'])} successful, {len(results['failed'])} failed")
             
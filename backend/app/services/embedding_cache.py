@@ -0,0 +1,229 @@
+# backend/app/services/embedding_cache.py
+"""
+Persistent embedding cache keyed by content hash, so unchanged chunks
+are not re-embedded on reindex or repeat uploads. Near-duplicate chunks
+are matched by SimHash fingerprint.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_BATCH_SIZE = 500
+
+# SimHash fingerprints are built from word 3-gram shingles
+_SHINGLE_SIZE = 3
+_WORD_RE = re.compile(r"\w+")
+
+# Fingerprints are split into 4 x 16-bit bands: any two fingerprints within
+# 3 bits of each other share at least one band exactly
+_SIMHASH_BANDS = 4
+_SIMHASH_BAND_BITS = 16
+
+
+def simhash64(text: str) -> Optional[int]:
+    """
+    Compute a 64-bit SimHash fingerprint of text over word 3-gram shingles.
+    
+    Returns:
+        Unsigned 64-bit fingerprint, or None if the text has no words
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    
+    shingles = [
+        " ".join(words[i:i + _SHINGLE_SIZE])
+        for i in range(max(1, len(words) - _SHINGLE_SIZE + 1))
+    ]
+    digests = b"".join(hashlib.blake2b(shingle.encode(), digest_size=8).digest() for shingle in shingles)
+    
+    # One row of 64 bits per shingle; each bit votes +1 if set, -1 otherwise
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+def _simhash_bands(fingerprint: int) -> List[int]:
+    """Split a fingerprint into its 16-bit bands."""
+    mask = (1 << _SIMHASH_BAND_BITS) - 1
+    return [(fingerprint >> (i * _SIMHASH_BAND_BITS)) & mask for i in range(_SIMHASH_BANDS)]
+
+
+def _to_signed64(value: int) -> int:
+    """Map an unsigned 64-bit value onto SQLite's signed INTEGER range."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed cache mapping (content hash, model, dimension) to an embedding,
+    with a secondary SimHash table for near-duplicate lookups.
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(settings.vector_store_path, "embedding_cache.db")
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                hash BLOB NOT NULL,
+                model TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (hash, model, dim)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_simhash (
+                simhash INTEGER NOT NULL,
+                model TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                band0 INTEGER NOT NULL,
+                band1 INTEGER NOT NULL,
+                band2 INTEGER NOT NULL,
+                band3 INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (simhash, model, dim)
+            )
+            """
+        )
+        for band in range(_SIMHASH_BANDS):
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_embedding_simhash_band{band} "
+                f"ON embedding_simhash (band{band}, model, dim)"
+            )
+        self._conn.commit()
+        
+        logger.info(f"Initialized embedding cache at {self.db_path}")
+    
+    def lookup(self, hashes: List[bytes], model: str, dim: int) -> Dict[bytes, np.ndarray]:
+        """
+        Fetch cached embeddings for the given content hashes.
+        
+        Args:
+            hashes: Content hashes to look up
+            model: Embedding model identifier
+            dim: Embedding dimension
+        
+        Returns:
+            Dictionary mapping each cached hash to its float32 embedding
+        """
+        found = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+        
+        with self._lock:
+            for i in range(0, len(unique_hashes), _LOOKUP_BATCH_SIZE):
+                batch = unique_hashes[i:i + _LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embedding_cache "
+                    f"WHERE model = ? AND dim = ? AND hash IN ({placeholders})",
+                    [model, dim, *batch]
+                ).fetchall()
+                for content_hash, vector in rows:
+                    found[content_hash] = np.frombuffer(vector, dtype=np.float32)
+        
+        return found
+    
+    def store(self, hashes: List[bytes], model: str, embeddings: np.ndarray) -> None:
+        """
+        Store embeddings for the given content hashes.
+        
+        Args:
+            hashes: Content hash for each embedding row
+            model: Embedding model identifier
+            embeddings: Array of shape (len(hashes), dim)
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        dim = embeddings.shape[1]
+        
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (hash, model, dim, vector) VALUES (?, ?, ?, ?)",
+                [(content_hash, model, dim, row.tobytes()) for content_hash, row in zip(hashes, embeddings)]
+            )
+            self._conn.commit()
+    
+    def lookup_near(
+        self,
+        fingerprints: List[int],
+        model: str,
+        dim: int,
+        max_distance: int
+    ) -> Dict[int, np.ndarray]:
+        """
+        Fetch embeddings of previously seen chunks with similar SimHash fingerprints.
+        
+        Candidates sharing at least one band are checked for Hamming distance,
+        which finds every match for max_distance <= 3.
+        
+        Args:
+            fingerprints: SimHash fingerprints to look up
+            model: Embedding model identifier
+            dim: Embedding dimension
+            max_distance: Maximum Hamming distance for a match
+        
+        Returns:
+            Dictionary mapping each matched fingerprint to the closest cached embedding
+        """
+        found = {}
+        
+        with self._lock:
+            for fingerprint in dict.fromkeys(fingerprints):
+                rows = self._conn.execute(
+                    "SELECT simhash, vector FROM embedding_simhash WHERE model = ? AND dim = ? "
+                    "AND (band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?)",
+                    [model, dim, *_simhash_bands(fingerprint)]
+                ).fetchall()
+                
+                best_distance, best_vector = max_distance + 1, None
+                for stored, vector in rows:
+                    distance = bin((stored & 0xFFFFFFFFFFFFFFFF) ^ fingerprint).count("1")
+                    if distance < best_distance:
+                        best_distance, best_vector = distance, vector
+                
+                if best_vector is not None:
+                    found[fingerprint] = np.frombuffer(best_vector, dtype=np.float32)
+        
+        return found
+    
+    def store_near(self, fingerprints: List[int], model: str, embeddings: np.ndarray) -> None:
+        """
+        Store embeddings under their SimHash fingerprints.
+        
+        Args:
+            fingerprints: SimHash fingerprint for each embedding row
+            model: Embedding model identifier
+            embeddings: Array of shape (len(fingerprints), dim)
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        dim = embeddings.shape[1]
+        
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_simhash "
+                "(simhash, model, dim, band0, band1, band2, band3, vector) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (_to_signed64(fingerprint), model, dim, *_simhash_bands(fingerprint), row.tobytes())
+                    for fingerprint, row in zip(fingerprints, embeddings)
+                ]
+            )
+            self._conn.commit()
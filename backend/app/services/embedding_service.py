@@ -5,10 +5,18 @@ using sentence-transformers with FAISS vector store.
 """
 
 import asyncio
+import hashlib
+import json
 import logging
+import math
 import os
 import pickle
-from typing import List, Dict, Any, Optional, Tuple
+import platform
+import re
+import shutil
+from collections import OrderedDict
+from functools import lru_cache, partial
+from typing import List, Dict, Any, Optional, Set, Tuple
 from uuid import UUID
 
 import numpy as np
@@ -24,24 +32,239 @@ except ImportError:
     faiss = None
     FAISS_AVAILABLE = False
 
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    from huggingface_hub import hf_hub_download
+    ONNX_RUNTIME_AVAILABLE = True
+except ImportError:
+    ORTModelForFeatureExtraction = ORTQuantizer = AutoQuantizationConfig = AutoTokenizer = hf_hub_download = None
+    ONNX_RUNTIME_AVAILABLE = False
+
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    simsimd = None
+    SIMSIMD_AVAILABLE = False
+
+try:
+    from scipy.linalg.blas import sgemv
+    SCIPY_BLAS_AVAILABLE = True
+except ImportError:
+    sgemv = None
+    SCIPY_BLAS_AVAILABLE = False
+
 from app.config.settings import settings
-from app.core.exceptions import EmbeddingError
+from app.core.exceptions import EmbeddingError, VectorIndexError
 from app.models.document import DocumentChunk
 
 logger = logging.getLogger(__name__)
 
+# Tokenizer and feature layout for the hash-based fallback embeddings
+_WORD_RE = re.compile(r'\b\w+\b')
+_TEXT_FEATURE_SLOTS = [-(i + 1) for i in range(7)]
+
+
+@lru_cache(maxsize=None)
+def _load_model(model_name: str) -> "SentenceTransformer":
+    """Load a SentenceTransformer once per process, shared by every EmbeddingService."""
+    return SentenceTransformer(model_name)
+
+
+class _OnnxEncoder:
+    """
+    Mean-pooled sentence embeddings from an ONNX Runtime feature-extraction model.
+    
+    Exposes the subset of the SentenceTransformer interface EmbeddingService
+    uses, so either can back ``self.model``.
+    """
+    
+    def __init__(
+        self,
+        model: "ORTModelForFeatureExtraction",
+        tokenizer: "AutoTokenizer",
+        max_seq_length: Optional[int] = None
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        # The sentence-transformers limit the model was trained with (256 for
+        # MiniLM), which is shorter than the tokenizer's own maximum
+        self.max_seq_length = max_seq_length or tokenizer.model_max_length
+        self.device = "cpu"  # Runs on CPUExecutionProvider
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.config.hidden_size
+    
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False
+    ) -> np.ndarray:
+        embeddings = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            embeddings[start:start + batch_size] = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+        return embeddings
+
+
+# sentence-transformers settings of a model repository, including max_seq_length
+_ST_CONFIG_FILE = "sentence_bert_config.json"
+
+
+def _read_max_seq_length(model_name: str, cache_dir: str) -> Optional[int]:
+    """
+    Get a model's sentence-transformers max_seq_length, keeping its config in cache_dir.
+    
+    Returns:
+        The configured maximum, or None if the model has no sentence-transformers config
+    """
+    config_path = os.path.join(cache_dir, _ST_CONFIG_FILE)
+    if not os.path.exists(config_path):
+        try:
+            if os.path.isdir(model_name):
+                source = os.path.join(model_name, _ST_CONFIG_FILE)
+            else:
+                source = hf_hub_download(model_name, _ST_CONFIG_FILE)
+            shutil.copyfile(source, config_path)
+        except OSError:
+            return None
+    
+    with open(config_path) as f:
+        return json.load(f).get("max_seq_length")
+
+
+@lru_cache(maxsize=None)
+def _load_onnx_int8_model(model_name: str) -> _OnnxEncoder:
+    """
+    Load an int8-quantized ONNX Runtime copy of a model, once per process.
+    
+    The first call exports the model to ONNX and applies dynamic int8
+    quantization (VNNI kernels on x86, arm64 kernels on ARM); the result is
+    kept under settings.embedding_onnx_cache_dir for later runs.
+    """
+    cache_dir = os.path.join(os.path.expanduser(settings.embedding_onnx_cache_dir), model_name.replace("/", "--"))
+    quantized_file = "model_quantized.onnx"
+    
+    if not os.path.exists(os.path.join(cache_dir, quantized_file)):
+        logger.info(f"Exporting {model_name} to int8 ONNX in {cache_dir}")
+        exported = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+        if platform.machine().lower() in ("arm64", "aarch64"):
+            qconfig = AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+        else:
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        ORTQuantizer.from_pretrained(exported).quantize(save_dir=cache_dir, quantization_config=qconfig)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(cache_dir)
+    
+    model = ORTModelForFeatureExtraction.from_pretrained(
+        cache_dir,
+        file_name=quantized_file,
+        provider="CPUExecutionProvider"
+    )
+    return _OnnxEncoder(
+        model,
+        AutoTokenizer.from_pretrained(cache_dir),
+        _read_max_seq_length(model_name, cache_dir)
+    )
+
+
+@lru_cache(maxsize=200_000)
+def _word_bucket(word: str, dim: int) -> int:
+    """Map a word to its fallback embedding dimension, leaving 10 slots free at each end."""
+    word_hash = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+    return (word_hash % (dim - 20)) + 10
+
+
+# On-disk encodings for saved embedding batches, keyed by settings.vector_quantization
+_BATCH_ENCODINGS = {
+    "none": (np.float32, ".f32"),
+    "fp16": (np.float16, ".f16"),
+    "sq8": (np.int8, ".i8"),
+}
+
+
+def _matvec(matrix: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    """
+    Multiply a row-major matrix by a vector, via BLAS sgemv when possible.
+    
+    A C-contiguous (n, d) matrix is passed as its F-contiguous transpose with
+    trans=1, so BLAS reads it in place without a layout copy.
+    """
+    if SCIPY_BLAS_AVAILABLE and matrix.dtype == np.float32 and matrix.flags.c_contiguous:
+        return sgemv(1.0, matrix.T, np.ascontiguousarray(vector, dtype=np.float32), trans=1)
+    return matrix @ vector
+
+
+def quantize_i8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scalar-quantize embedding rows to int8 using a per-row max-abs scale.
+    
+    Args:
+        embeddings: Array of shape (n, dim)
+        
+    Returns:
+        Tuple of (int8 array of shape (n, dim), float32 scale per row) such that
+        embeddings ~= quantized * scale[:, None]
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    scales = np.abs(embeddings).max(axis=1) / 127.0
+    safe_scales = np.where(scales > 0, scales, 1.0)
+    quantized = np.rint(embeddings / safe_scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def quantize_binary(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Binary-quantize embedding rows to one sign bit per dimension.
+    
+    Args:
+        embeddings: Array of shape (n, dim)
+        
+    Returns:
+        uint8 array of shape (n, ceil(dim / 8)), comparable by Hamming distance
+    """
+    return np.packbits(np.asarray(embeddings) > 0, axis=1)
+
 
 class EmbeddingService:
     """Service for generating and managing document embeddings."""
     
     def __init__(self):
-        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+        if settings.embedding_backend == "onnx-int8" and not ONNX_RUNTIME_AVAILABLE:
+            logger.warning("embedding_backend is 'onnx-int8' but optimum[onnxruntime] is not installed; see requirements/onnx.txt")
+        
+        if settings.embedding_backend == "onnx-int8" and ONNX_RUNTIME_AVAILABLE:
+            try:
+                self.model = _load_onnx_int8_model(settings.embedding_model_name)
+                self.embedding_dim = self.model.get_sentence_embedding_dimension()
+                logger.info(f"Initialized int8 ONNX embedding model: {settings.embedding_model_name}")
+            except Exception as e:
+                logger.error(f"Failed to initialize int8 ONNX embedding model: {e}")
+                self.model = None
+                self.embedding_dim = 384
+        elif not SENTENCE_TRANSFORMERS_AVAILABLE:
             logger.info("sentence-transformers is not available. Using improved hash-based embeddings for testing.")
             self.model = None
             self.embedding_dim = 384  # Default dimension for all-MiniLM-L6-v2
         else:
             try:
-                self.model = SentenceTransformer(settings.embedding_model_name)
+                self.model = _load_model(settings.embedding_model_name)
                 self.embedding_dim = self.model.get_sentence_embedding_dimension()
                 logger.info(f"Initialized embedding service with model: {settings.embedding_model_name}")
                 logger.info(f"Embedding dimension: {self.embedding_dim}")
@@ -50,92 +273,162 @@ class EmbeddingService:
                 self.model = None
                 self.embedding_dim = 384
         
+        # Single-text requests waiting to be encoded together (see generate_single_embedding)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._batch_semaphore = asyncio.Semaphore(settings.embed_concurrency)
+        
+        # Recent single-text embeddings keyed by text digest, in LRU order
+        self._single_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        
         # Ensure vector store directory exists
         os.makedirs(settings.vector_store_path, exist_ok=True)
     
-    async def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+    async def generate_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
         """
         Generate embeddings for a list of texts.
         
         Args:
             texts: List of text strings to embed
+            batch_size: Model micro-batch size (defaults to settings.embedding_model_batch_size)
             
         Returns:
             numpy array of embeddings
         """
+        return await self.generate_embeddings_into(texts, None, batch_size)
+    
+    async def generate_embeddings_into(
+        self,
+        texts: List[str],
+        out: Optional[np.ndarray],
+        batch_size: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Generate embeddings for a list of texts, writing rows into a caller-owned buffer.
+        
+        Args:
+            texts: List of text strings to embed
+            out: C-contiguous float32 array of shape (len(texts), embedding_dim),
+                or None to allocate one
+            batch_size: Model micro-batch size (defaults to settings.embedding_model_batch_size)
+            
+        Returns:
+            The filled ``out`` array
+        """
         try:
             if not texts:
                 raise EmbeddingError("No texts provided for embedding")
             
+            if out is None:
+                out = np.empty((len(texts), self.embedding_dim), dtype=np.float32)
+            elif (
+                out.shape != (len(texts), self.embedding_dim)
+                or out.dtype != np.float32
+                or not out.flags['C_CONTIGUOUS']
+            ):
+                raise EmbeddingError(
+                    f"Output buffer must be C-contiguous float32 of shape {(len(texts), self.embedding_dim)}, "
+                    f"got {out.dtype} {out.shape}"
+                )
+            
             if self.model is None:
                 # Use improved word-frequency-based embeddings for testing
                 logger.info("Using word-frequency-based embeddings for testing. This provides basic semantic similarity.")
-                import hashlib
-                import re
-                from collections import Counter
-                
-                embeddings = []
-                for text in texts:
-                    # Clean and tokenize text
-                    words = re.findall(r'\b\w+\b', text.lower())
-                    word_counts = Counter(words)
-                    
-                    # Create embedding based on word frequencies and characteristics
-                    embedding = np.zeros(self.embedding_dim, dtype=np.float32)
-                    
-                    # Use text characteristics for embedding
-                    text_features = [
-                        len(text) / 1000.0,  # Text length
-                        len(words) / 100.0,  # Word count
-                        len(set(words)) / len(words) if words else 0,  # Vocabulary diversity
-                        sum(1 for w in words if len(w) > 6) / len(words) if words else 0,  # Complex words ratio
-                        text.count('.') / len(text) if text else 0,  # Sentence density
-                        text.count('?') / len(text) if text else 0,  # Question density
-                        text.count('!') / len(text) if text else 0,  # Exclamation density
-                    ]
-                    
-                    # Hash most common words for semantic features
-                    common_words = [word for word, _ in word_counts.most_common(50)]
-                    for i, word in enumerate(common_words[:50]):
-                        word_hash = int(hashlib.md5(word.encode()).hexdigest()[:8], 16)
-                        idx = (word_hash % (self.embedding_dim - 20)) + 10
-                        embedding[idx] += word_counts[word] / len(words) if words else 0
-                    
-                    # Add text features to the end
-                    for i, feature in enumerate(text_features[:7]):
-                        embedding[-(i+1)] = min(feature, 1.0)
-                    
-                    # Normalize the embedding
-                    norm = np.linalg.norm(embedding)
-                    if norm > 0:
-                        embedding = embedding / norm
-                    
-                    embeddings.append(embedding)
-                
-                return np.array(embeddings, dtype=np.float32)
+                return self._hash_embeddings(texts, out)
+            
+            # Sort by length so each micro-batch pads to similar lengths
+            order = np.argsort([len(text) for text in texts], kind="stable")
+            sorted_texts = [texts[i] for i in order]
             
             # Run embedding generation in thread pool to avoid blocking
             loop = asyncio.get_event_loop()
-            embeddings = await loop.run_in_executor(
+            sorted_embeddings = await loop.run_in_executor(
                 None, 
-                self.model.encode, 
-                texts
+                partial(
+                    self.model.encode,
+                    sorted_texts,
+                    batch_size=batch_size or settings.embedding_model_batch_size,
+                    show_progress_bar=False,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
             )
             
-            # Ensure embeddings are float32 for FAISS
-            embeddings = embeddings.astype(np.float32)
+            # Restore input order; ensure embeddings are float32 for FAISS
+            out[order] = sorted_embeddings
             
-            logger.info(f"Generated {len(embeddings)} embeddings")
-            return embeddings
+            logger.info(f"Generated {len(out)} embeddings")
+            return out
             
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
             raise EmbeddingError(f"Failed to generate embeddings: {str(e)}")
     
+    def _hash_embeddings(self, texts: List[str], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Build word-frequency embeddings for a batch of texts.
+        
+        Every word occurrence is hashed into a bucket and all buckets for the
+        batch are accumulated with one bincount, weighted by 1 / word count;
+        seven text statistics fill the last dimensions and rows are L2-normalized.
+        Rows are written into ``out`` when given.
+        """
+        dim = self.embedding_dim
+        embeddings = out if out is not None else np.empty((len(texts), dim), dtype=np.float32)
+        features = np.zeros((len(texts), len(_TEXT_FEATURE_SLOTS)), dtype=np.float32)
+        
+        flat_idx = []
+        weights = []
+        
+        for row, text in enumerate(texts):
+            words = _WORD_RE.findall(text.lower())
+            num_words = len(words)
+            num_chars = len(text)
+            
+            if num_words:
+                offset = row * dim
+                flat_idx.append(np.fromiter((_word_bucket(word, dim) + offset for word in words), dtype=np.int64, count=num_words))
+                weights.append(np.full(num_words, 1.0 / num_words))
+            
+            # Text length, word count, vocabulary diversity, complex word ratio,
+            # and sentence/question/exclamation density
+            features[row] = (
+                num_chars / 1000.0,
+                num_words / 100.0,
+                len(set(words)) / num_words if num_words else 0,
+                sum(1 for w in words if len(w) > 6) / num_words if num_words else 0,
+                text.count('.') / num_chars if num_chars else 0,
+                text.count('?') / num_chars if num_chars else 0,
+                text.count('!') / num_chars if num_chars else 0,
+            )
+        
+        if flat_idx:
+            embeddings[...] = np.bincount(
+                np.concatenate(flat_idx),
+                weights=np.concatenate(weights),
+                minlength=len(texts) * dim
+            ).reshape(len(texts), dim)
+        else:
+            embeddings.fill(0)
+        
+        # Text features fill the last dimensions, in reverse order
+        embeddings[:, _TEXT_FEATURE_SLOTS] = np.minimum(features, 1.0)
+        
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+        
+        return embeddings
+    
     async def generate_single_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text.
         
+        Results are kept in an in-memory LRU keyed by text digest, so repeated
+        queries skip the model. Concurrent misses are coalesced: requests
+        arriving within settings.embed_coalesce_delay_ms of each other are
+        encoded as one batch of up to settings.embed_coalesce_max_batch texts.
+        
         Args:
             text: Text string to embed
             
@@ -143,14 +436,67 @@ class EmbeddingService:
             numpy array embedding
         """
         try:
-            embeddings = await self.generate_embeddings([text])
-            return embeddings[0]
+            key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+            cached = self._single_cache.get(key)
+            if cached is not None:
+                self._single_cache.move_to_end(key)
+                return cached.copy()
+            
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending.append((text, future))
+            
+            if len(self._pending) >= settings.embed_coalesce_max_batch:
+                self._flush_pending()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(
+                    settings.embed_coalesce_delay_ms / 1000.0,
+                    self._flush_pending
+                )
+            
+            # The future holds a view of one row of the coalesced batch array;
+            # cache a private copy so callers mutating their result can't alter
+            # the cache, and the cache doesn't pin the whole batch
+            embedding = (await future).copy()
+            
+            self._single_cache[key] = embedding
+            while len(self._single_cache) > settings.single_embedding_cache_size:
+                self._single_cache.popitem(last=False)
+            
+            return embedding.copy()
             
         except Exception as e:
             logger.error(f"Error generating single embedding: {e}")
             raise EmbeddingError(f"Failed to generate single embedding: {str(e)}")
     
-    async def compute_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
+    def _flush_pending(self) -> None:
+        """Start encoding all pending single-text requests as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._embed_pending(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+    
+    async def _embed_pending(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Encode a coalesced batch and resolve each request's future."""
+        async with self._batch_semaphore:
+            try:
+                embeddings = await self.generate_embeddings([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+        
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+    
+    def compute_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """
         Compute cosine similarity between two embeddings.
         
@@ -162,44 +508,94 @@ class EmbeddingService:
             Cosine similarity score
         """
         try:
-            # Normalize embeddings
-            norm1 = np.linalg.norm(embedding1)
-            norm2 = np.linalg.norm(embedding2)
+            # Squared norms via vdot avoid linalg.norm's overhead and one sqrt
+            self_dot1 = np.vdot(embedding1, embedding1)
+            self_dot2 = np.vdot(embedding2, embedding2)
             
-            if norm1 == 0 or norm2 == 0:
+            if self_dot1 == 0 or self_dot2 == 0:
                 return 0.0
             
             # Compute cosine similarity
-            similarity = np.dot(embedding1, embedding2) / (norm1 * norm2)
+            similarity = np.vdot(embedding1, embedding2) / math.sqrt(self_dot1 * self_dot2)
             return float(similarity)
             
         except Exception as e:
             logger.error(f"Error computing similarity: {e}")
             raise EmbeddingError(f"Failed to compute similarity: {str(e)}")
     
+    @staticmethod
+    def compute_similarity_prenormed(embedding1: np.ndarray, embedding2: np.ndarray) -> float:
+        """
+        Compute cosine similarity between two embeddings that are already unit length.
+        
+        Args:
+            embedding1: First unit-norm embedding vector
+            embedding2: Second unit-norm embedding vector
+            
+        Returns:
+            Cosine similarity score
+        """
+        return float(np.vdot(embedding1, embedding2))
+    
     async def batch_compute_similarities(
         self, 
         query_embedding: np.ndarray, 
-        document_embeddings: np.ndarray
+        document_embeddings: np.ndarray,
+        document_norms: Optional[np.ndarray] = None,
+        normalized: bool = False
     ) -> np.ndarray:
         """
         Compute similarities between query and multiple document embeddings.
         
         Args:
             query_embedding: Query embedding vector
-            document_embeddings: Array of document embeddings
+            document_embeddings: Array of document embeddings (float32, float16 or int8)
+            document_norms: Precomputed L2 norm of each document embedding, if available
+            normalized: Document embeddings are already unit length (the flag
+                returned by load_embeddings_batch), so only the query is normalized;
+                requires float embeddings, as raw int8 codes lack their row scales
             
         Returns:
             Array of similarity scores
+            
+        Raises:
+            EmbeddingError: If normalized is set for non-float embeddings
         """
+        if normalized and not np.issubdtype(document_embeddings.dtype, np.floating):
+            raise EmbeddingError(
+                f"Normalized similarities need float embeddings, got {document_embeddings.dtype}; "
+                "load quantized batches with dequantize=True"
+            )
+        
         try:
-            # Normalize embeddings
-            query_norm = query_embedding / np.linalg.norm(query_embedding)
-            doc_norms = document_embeddings / np.linalg.norm(document_embeddings, axis=1, keepdims=True)
+            if normalized:
+                # Dot product equals cosine for unit vectors: a single gemv
+                query_norm = np.linalg.norm(query_embedding)
+                if query_norm == 0:
+                    return np.zeros(len(document_embeddings), dtype=np.float32)
+                return _matvec(document_embeddings, (query_embedding.reshape(-1) / query_norm).astype(np.float32))
+            
+            if SIMSIMD_AVAILABLE and document_norms is None:
+                query = query_embedding.reshape(1, -1).astype(np.float32, copy=False)
+                if document_embeddings.dtype == np.int8:
+                    # Cosine is scale-invariant, so int8 rows compare directly
+                    # against an int8-quantized query
+                    query, _ = quantize_i8(query)
+                else:
+                    document_embeddings = document_embeddings.astype(np.float32, copy=False)
+                
+                # Fused SIMD cosine kernel; returns distances (1 - similarity)
+                distances = simsimd.cdist(query, document_embeddings, metric="cosine")
+                return 1.0 - np.asarray(distances, dtype=np.float32).reshape(-1)
+            
+            # One matrix-vector product, scaled by the norms afterwards, instead
+            # of materializing a normalized copy of the document matrix
+            if document_norms is None:
+                document_norms = np.linalg.norm(document_embeddings, axis=1)
+            denom = document_norms * np.linalg.norm(query_embedding)
             
-            # Compute cosine similarities
-            similarities = np.dot(doc_norms, query_norm)
-            return similarities
+            similarities = _matvec(document_embeddings, query_embedding.reshape(-1).astype(np.float32))
+            return np.divide(similarities, denom, out=np.zeros_like(similarities), where=denom > 0)
             
         except Exception as e:
             logger.error(f"Error computing batch similarities: {e}")
@@ -209,7 +605,52 @@ class EmbeddingService:
         """Get the dimension of embeddings generated by this service."""
         return self.embedding_dim
     
-    async def validate_embedding(self, embedding: np.ndarray) -> bool:
+    def get_model_identifier(self) -> str:
+        """Get an identifier for the model actually producing embeddings."""
+        if self.model is None:
+            return "hash-fallback-v3"
+        # Quantized vectors differ from fp32 ones, so they are cached separately
+        if isinstance(self.model, _OnnxEncoder):
+            return f"{settings.embedding_model_name}:onnx-int8"
+        return settings.embedding_model_name
+    
+    def is_compatible_identifier(self, identifier: Optional[str]) -> bool:
+        """
+        Check whether vectors saved under a model identifier can be compared
+        with the ones this service produces.
+        
+        Args:
+            identifier: Identifier recorded with a saved index, or None if the
+                index predates recorded identifiers
+            
+        Returns:
+            True if the index can be searched and extended with this service's embeddings
+        """
+        current = self.get_model_identifier()
+        if identifier is None:
+            # Every unlabelled hash-fallback index was built by an older fallback
+            return not current.startswith("hash-fallback")
+        return identifier == current
+    
+    def ensure_compatible(self, identifier: Optional[str], document_id: UUID) -> None:
+        """
+        Refuse a saved index whose vectors came from a different embedding model.
+        
+        Args:
+            identifier: Identifier recorded with the index, if any
+            document_id: Document the index belongs to, for the error message
+            
+        Raises:
+            VectorIndexError: If the index cannot be compared with current embeddings
+        """
+        if not self.is_compatible_identifier(identifier):
+            raise VectorIndexError(
+                f"Index for document {document_id} was built with embeddings "
+                f"'{identifier or 'unknown'}', not '{self.get_model_identifier()}'; "
+                f"reprocess the document to rebuild it"
+            )
+    
+    def validate_embedding(self, embedding: np.ndarray) -> bool:
         """
         Validate that an embedding has the correct dimensions and format.
         
@@ -251,21 +692,43 @@ class EmbeddingService:
         """
         Save embeddings and metadata to file.
         
+        Embeddings are L2-normalized and written as a raw blob so they can be
+        memory-mapped on load, encoded per settings.vector_quantization: float32
+        (file_path + '.f32'), float16 ('.f16') or int8 ('.i8' plus per-row scales
+        in '.scale').
+        Metadata goes to a JSON sidecar (file_path + '.json').
+        
         Args:
             embeddings: Array of embeddings
             metadata: List of metadata dictionaries
-            file_path: Path to save file
+            file_path: Base path to save files
         """
         try:
-            data = {
-                'embeddings': embeddings,
-                'metadata': metadata,
+            encoding = settings.vector_quantization if settings.vector_quantization in _BATCH_ENCODINGS else "none"
+            dtype, suffix = _BATCH_ENCODINGS[encoding]
+            
+            # Normalize once here so searches only need to normalize the query
+            embeddings = np.array(embeddings, dtype=np.float32)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+            
+            if encoding == "sq8":
+                quantized, scales = quantize_i8(embeddings)
+                quantized.tofile(file_path + suffix)
+                scales.tofile(file_path + '.scale')
+            else:
+                np.ascontiguousarray(embeddings, dtype=dtype).tofile(file_path + suffix)
+            
+            sidecar = {
                 'dimension': self.embedding_dim,
-                'model_name': settings.embedding_model_name
+                'count': len(embeddings),
+                'encoding': encoding,
+                'normalized': True,
+                'model_name': settings.embedding_model_name,
+                'metadata': list(metadata)
             }
-            
-            with open(file_path, 'wb') as f:
-                pickle.dump(data, f)
+            with open(file_path + '.json', 'w') as f:
+                json.dump(sidecar, f, default=str)
             
             logger.info(f"Saved {len(embeddings)} embeddings to {file_path}")
             
@@ -273,32 +736,65 @@ class EmbeddingService:
             logger.error(f"Error saving embeddings: {e}")
             raise EmbeddingError(f"Failed to save embeddings: {str(e)}")
     
-    async def load_embeddings_batch(self, file_path: str) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    async def load_embeddings_batch(
+        self,
+        file_path: str,
+        dequantize: bool = True
+    ) -> Tuple[np.ndarray, List[Dict[str, Any]], bool]:
         """
         Load embeddings and metadata from file.
         
+        Embeddings are memory-mapped read-only rather than copied into memory.
+        Batches in the raw format are L2-normalized at save time (sidecar
+        'normalized' flag). Legacy pickle files at file_path are still readable.
+        
         Args:
-            file_path: Path to load file
+            file_path: Base path to load files
+            dequantize: Convert quantized batches back to float32; when False the
+                stored float16/int8 array is returned as-is, which
+                batch_compute_similarities accepts with normalized=False
             
         Returns:
-            Tuple of (embeddings, metadata)
+            Tuple of (embeddings, metadata, normalized), where normalized tells
+            whether the rows are unit length, for batch_compute_similarities
         """
         try:
-            if not os.path.exists(file_path):
+            if os.path.exists(file_path + '.json'):
+                with open(file_path + '.json') as f:
+                    sidecar = json.load(f)
+                
+                dimension = sidecar['dimension']
+                metadata = sidecar['metadata']
+                encoding = sidecar.get('encoding', 'none')
+                normalized = bool(sidecar.get('normalized', False))
+                dtype, suffix = _BATCH_ENCODINGS[encoding]
+                
+                if sidecar['count']:
+                    embeddings = np.memmap(file_path + suffix, dtype=dtype, mode='r').reshape(-1, dimension)
+                else:
+                    embeddings = np.empty((0, dimension), dtype=dtype)
+                
+                if dequantize and encoding == "sq8":
+                    scales = np.fromfile(file_path + '.scale', dtype=np.float32)
+                    embeddings = embeddings.astype(np.float32) * scales[:, None]
+                elif dequantize and encoding == "fp16":
+                    embeddings = embeddings.astype(np.float32)
+            elif os.path.exists(file_path):
+                with open(file_path, 'rb') as f:
+                    data = pickle.load(f)
+                
+                embeddings = data['embeddings']
+                metadata = data['metadata']
+                normalized = False
+            else:
                 raise EmbeddingError(f"Embedding file not found: {file_path}")
             
-            with open(file_path, 'rb') as f:
-                data = pickle.load(f)
-            
-            embeddings = data['embeddings']
-            metadata = data['metadata']
-            
             # Validate loaded data
             if embeddings.shape[1] != self.embedding_dim:
                 raise EmbeddingError(f"Embedding dimension mismatch: expected {self.embedding_dim}, got {embeddings.shape[1]}")
             
             logger.info(f"Loaded {len(embeddings)} embeddings from {file_path}")
-            return embeddings, metadata
+            return embeddings, metadata, normalized
             
         except Exception as e:
             logger.error(f"Error loading embeddings: {e}")
@@ -317,9 +813,11 @@ class EmbeddingService:
                 f"embeddings_{document_id}.pkl"
             )
             
-            if os.path.exists(embedding_file):
-                os.remove(embedding_file)
-                logger.info(f"Cleaned up embedding file for document {document_id}")
+            suffixes = ['', '.json', '.scale'] + [suffix for _, suffix in _BATCH_ENCODINGS.values()]
+            for path in (embedding_file + suffix for suffix in suffixes):
+                if os.path.exists(path):
+                    os.remove(path)
+                    logger.info(f"Cleaned up embedding file {os.path.basename(path)} for document {document_id}")
             
         except Exception as e:
             logger.error(f"Error cleaning up embedding files: {e}")
@@ -2,17 +2,59 @@
 File service for handling file operations.
 """
 
+import asyncio
 import os
 import shutil
+import threading
 import uuid
 import boto3
-from typing import BinaryIO, Optional
+from boto3.s3.transfer import TransferConfig
+from typing import AsyncIterator, BinaryIO, Optional
 from pathlib import Path
 from botocore.exceptions import ClientError, NoCredentialsError
 
 from app.config.settings import settings
 from app.core.exceptions import FileStorageError
 
+# Multipart settings for large downloads: 8 MiB parts fetched 8 at a time
+_DOWNLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8
+)
+
+# Multipart settings for large uploads: 8 MiB parts sent 10 at a time
+_UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10
+)
+
+# Read size when streaming an object body
+_STREAM_CHUNK_SIZE = 1024 * 1024
+
+# boto3 clients are thread-safe and costly to build, so one is shared per process
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def _get_s3_client():
+    """Get or create the shared S3 client for Supabase storage."""
+    global _s3_client
+    
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                _s3_client = boto3.client(
+                    's3',
+                    aws_access_key_id=settings.s3_access_key_id,
+                    aws_secret_access_key=settings.s3_secret_access_key,
+                    endpoint_url=settings.s3_endpoint_url,
+                    region_name=settings.s3_region
+                )
+    
+    return _s3_client
+
 class FileService:
     """Service for file storage and retrieval."""
     
@@ -20,14 +62,8 @@ class FileService:
         self.upload_path = Path(settings.upload_path)
         self.upload_path.mkdir(parents=True, exist_ok=True)
         
-        # Initialize S3 client for Supabase
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.s3_access_key_id,
-            aws_secret_access_key=settings.s3_secret_access_key,
-            endpoint_url=settings.s3_endpoint_url,
-            region_name=settings.s3_region
-        )
+        # Shared S3 client for Supabase
+        self.s3_client = _get_s3_client()
     
     async def upload_file(self, file: BinaryIO, bucket: str, user_id: str, filename: Optional[str] = None) -> str:
         """
@@ -52,14 +88,16 @@ class FileService:
             else:
                 s3_key = f"{user_id}/{file_id}"
             
-            # Upload to S3
-            self.s3_client.upload_fileobj(
+            # Upload to S3; files over 8 MiB go up as parallel multipart parts
+            await asyncio.to_thread(
+                self.s3_client.upload_fileobj,
                 file,
                 settings.s3_bucket_name,
                 s3_key,
                 ExtraArgs={
                     'ContentType': self._get_content_type(filename or s3_key)
-                }
+                },
+                Config=_UPLOAD_TRANSFER_CONFIG
             )
             
             return s3_key
@@ -92,11 +130,12 @@ class FileService:
             File content as bytes
         """
         try:
-            response = self.s3_client.get_object(
+            response = await asyncio.to_thread(
+                self.s3_client.get_object,
                 Bucket=settings.s3_bucket_name,
                 Key=s3_key
             )
-            return response['Body'].read()
+            return await asyncio.to_thread(response['Body'].read)
                 
         except ClientError as e:
             if e.response['Error']['Code'] == 'NoSuchKey':
@@ -105,6 +144,70 @@ class FileService:
         except Exception as e:
             raise FileStorageError(f"Failed to download file: {str(e)}")
     
+    async def download_file_to(self, s3_key: str, path: str) -> str:
+        """
+        Download file from S3 storage straight to a local path.
+        
+        Large objects are fetched as concurrent multipart ranges and written to
+        disk without being held in memory.
+        
+        Args:
+            s3_key: S3 object key/path
+            path: Local destination path
+            
+        Returns:
+            The destination path
+        """
+        try:
+            await asyncio.to_thread(
+                self.s3_client.download_file,
+                settings.s3_bucket_name,
+                s3_key,
+                path,
+                Config=_DOWNLOAD_TRANSFER_CONFIG
+            )
+            return path
+            
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                raise FileStorageError(f"File not found: {s3_key}")
+            raise FileStorageError(f"Failed to download file: {str(e)}")
+        except Exception as e:
+            raise FileStorageError(f"Failed to download file: {str(e)}")
+    
+    async def iter_file_chunks(self, s3_key: str, chunk_size: int = _STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Stream a file from S3 storage in chunks.
+        
+        Args:
+            s3_key: S3 object key/path
+            chunk_size: Maximum bytes per chunk
+            
+        Yields:
+            Successive chunks of the file content
+        """
+        try:
+            response = await asyncio.to_thread(
+                self.s3_client.get_object,
+                Bucket=settings.s3_bucket_name,
+                Key=s3_key
+            )
+            body = response['Body']
+            
+            try:
+                while True:
+                    chunk = await asyncio.to_thread(body.read, chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                body.close()
+                
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchKey':
+                raise FileStorageError(f"File not found: {s3_key}")
+            raise FileStorageError(f"Failed to download file: {str(e)}")
+    
     async def delete_file(self, s3_key: str) -> bool:
         """
         Delete file from S3 storage.
@@ -116,7 +219,8 @@ class FileService:
             True if successful
         """
         try:
-            self.s3_client.delete_object(
+            await asyncio.to_thread(
+                self.s3_client.delete_object,
                 Bucket=settings.s3_bucket_name,
                 Key=s3_key
             )
@@ -138,7 +242,8 @@ class FileService:
             File information dictionary
         """
         try:
-            response = self.s3_client.head_object(
+            response = await asyncio.to_thread(
+                self.s3_client.head_object,
                 Bucket=settings.s3_bucket_name,
                 Key=s3_key
             )
@@ -2,11 +2,56 @@
 
 import os
 from typing import Dict, List, Optional, AsyncGenerator
-from groq import Groq
+from groq import AsyncGroq
 import asyncio
+import httpx
 import random
 from ..config.settings import settings
 
+# HTTP/2 needs the optional h2 package (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# One client per API key, shared across instances
+_groq_clients: Dict[str, AsyncGroq] = {}
+# One keep-alive connection pool shared by every key's client
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get or create the pooled HTTP client used for all Groq requests."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_keepalive_connections=settings.groq_max_keepalive_connections)
+        )
+    return _http_client
+
+
+def _get_groq_client(api_key: str) -> AsyncGroq:
+    """Get or create the persistent async Groq client for an API key."""
+    client = _groq_clients.get(api_key)
+    if client is None:
+        client = _groq_clients.setdefault(
+            api_key,
+            AsyncGroq(api_key=api_key, http_client=_get_http_client())
+        )
+    return client
+
+
+async def close_groq_clients() -> None:
+    """Close the shared HTTP pool and forget the per-key clients built on it."""
+    global _http_client
+    _groq_clients.clear()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 class GroqService:
     """Service for Groq AI API integration."""
@@ -17,7 +62,7 @@ class GroqService:
         if not self.api_key:
             raise ValueError("Groq API key is required")
         
-        self.client = Groq(api_key=self.api_key)
+        self.client = _get_groq_client(self.api_key)
         self.model = "llama3-70b-8192"  # Using LLaMA3-70B as specified
     
     def _get_fallback_key(self) -> Optional[str]:
@@ -37,9 +82,6 @@ class GroqService:
     ) -> Dict:
         """Create a chat completion using Groq API."""
         try:
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            
             if stream:
                 return await self._create_streaming_completion(
                     messages, temperature, max_tokens, top_p
@@ -47,16 +89,13 @@ class GroqService:
             else:
                 # Add timeout to prevent hanging
                 completion = await asyncio.wait_for(
-                    loop.run_in_executor(
-                        None,
-                        lambda: self.client.chat.completions.create(
-                            model=self.model,
-                            messages=messages,
-                            temperature=temperature,
-                            max_tokens=max_tokens,
-                            top_p=top_p,
-                            stream=False
-                        )
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        top_p=top_p,
+                        stream=False
                     ),
                     timeout=30.0  # 30 second timeout
                 )
@@ -102,43 +141,39 @@ class GroqService:
         """Create streaming chat completion."""
         try:
             # Create the streaming completion with timeout
-            loop = asyncio.get_event_loop()
             completion = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    lambda: self.client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        top_p=top_p,
-                        stream=True
-                    )
+                self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_p=top_p,
+                    stream=True
                 ),
                 timeout=10.0  # 10 second timeout for stream initiation
             )
             
-            # Process chunks in an async manner
-            for chunk in completion:
-                if chunk.choices and len(chunk.choices) > 0:
-                    delta = chunk.choices[0].delta
-                    if delta and delta.content:
-                        yield {
-                            "id": chunk.id,
-                            "object": chunk.object,
-                            "created": chunk.created,
-                            "model": chunk.model,
-                            "choices": [{
-                                "index": chunk.choices[0].index,
-                                "delta": {
-                                    "content": delta.content or ""
-                                },
-                                "finish_reason": chunk.choices[0].finish_reason
-                            }]
-                        }
-                        # Yield control to the event loop
-                        await asyncio.sleep(0)
-                    
+            # Chunks arrive from the async HTTP client without blocking the loop
+            # Chunks are yielded as slim dicts because the SSE endpoints
+            # json.dumps them; only the fields they read are copied
+            async for chunk in completion:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                content = choice.delta.content if choice.delta else None
+                if content:
+                    yield {
+                        "id": chunk.id,
+                        "object": chunk.object,
+                        "created": chunk.created,
+                        "model": chunk.model,
+                        "choices": [{
+                            "index": choice.index,
+                            "delta": {"content": content},
+                            "finish_reason": choice.finish_reason
+                        }]
+                    }
+            
         except Exception as e:
             raise Exception(f"Groq streaming error: {str(e)}")
     
@@ -159,7 +194,8 @@ class GroqService:
         # Try with a different key
         new_key = random.choice(available_keys)
         self.api_key = new_key
-        self.client = Groq(api_key=new_key)
+        # Reuse the key's existing client to keep its warm connections
+        self.client = _get_groq_client(new_key)
         
         # Retry the request
         return await self.create_chat_completion(
@@ -8,17 +8,277 @@ import asyncio
 import logging
 import os
 import pickle
-from typing import List, Dict, Any, Optional, Tuple
+import struct
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, IO, List, Optional, Tuple
 from uuid import UUID
 
 import numpy as np
+import orjson
+
+try:
+    import simsimd
+    SIMSIMD_AVAILABLE = True
+except ImportError:
+    simsimd = None
+    SIMSIMD_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+try:
+    import cupy as cp
+    CUPY_AVAILABLE = True
+except ImportError:
+    cp = None
+    CUPY_AVAILABLE = False
 
 from app.config.settings import settings
-from app.core.exceptions import VectorStoreError
-from app.services.embedding_service import EmbeddingService
+from app.core.exceptions import VectorIndexError, VectorStoreError
+from app.services.embedding_service import EmbeddingService, quantize_i8
 
 logger = logging.getLogger(__name__)
 
+# Index layout version. Versions 1-4 are pickles: 1 (no 'version' key) and 2
+# keep the arrays inside the pickle, 3 keeps them in .npy files and 4 in
+# append-only vector files. Version 5 keeps vector files plus a JSON header
+# and JSON Lines metadata, and older indices are migrated to it on load
+_INDEX_VERSION = 5
+
+# Vector file header: magic, dtype code, dimension, row count. Rows follow
+# contiguously, so appending is a write at the end plus a row count update
+_VECTOR_HEADER = struct.Struct('<4sIII')
+_VECTOR_MAGIC = b'SVEC'
+# Same header, rows stored as concatenated zstd frames (one per write)
+_VECTOR_MAGIC_ZSTD = b'SVEZ'
+_ZSTD_LEVEL = 3
+_VECTOR_COUNT_OFFSET = 12
+_VECTOR_DTYPES = {0: np.dtype(np.float32), 1: np.dtype(np.float16), 2: np.dtype(np.int8)}
+_VECTOR_DTYPE_CODES = {dtype: code for code, dtype in _VECTOR_DTYPES.items()}
+
+# Array fields stored for each embedding encoding
+_ARRAY_FIELDS = {
+    'f32': ('embeddings',),
+    'f16': ('embeddings',),
+    'i8': ('embeddings_i8', 'scales'),
+}
+
+# Pre-normalization L2 norm of each row, stored for every encoding; indices
+# written before it was added simply lack the file
+_NORMS_FIELD = 'norms'
+
+# Writer locks per document ID. Searches take no lock: files are replaced
+# atomically and appends commit by bumping the row count last
+_write_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+# Loaded indices shared by every SimpleVectorStore in the process, keyed by document ID
+_index_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# Stacked float32 matrices for recent batch_search document sets, keyed by
+# document IDs and valid while the same loaded indices are cached
+_stacked_cache: "OrderedDict[Tuple[str, ...], Tuple[List[Dict[str, Any]], np.ndarray, np.ndarray]]" = OrderedDict()
+_STACKED_CACHE_SIZE = 8
+
+# Rows upcast per block when scoring float16 / int8 matrices without simsimd
+_DOT_BLOCK_ROWS = 1024
+
+# Byte alignment of matrices built in memory, matching AVX-512 vector loads
+_ALIGNMENT = 64
+
+# Device copies of large embedding matrices, keyed by the id of the host array
+# they mirror (the host array is kept alongside so the id stays valid)
+_gpu_cache: "OrderedDict[int, Tuple[np.ndarray, Any]]" = OrderedDict()
+_gpu_cache_lock = threading.Lock()
+
+
+def _write_lock(document_id: UUID) -> asyncio.Lock:
+    """Get the lock serializing writes to one document's index."""
+    key = str(document_id)
+    lock = _write_locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _write_locks[key] = lock
+    return lock
+
+
+def _aligned_empty(shape: Tuple[int, int], dtype: Any = np.float32) -> np.ndarray:
+    """Allocate an uninitialized C-contiguous array whose data starts on a 64-byte boundary."""
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buffer = np.empty(nbytes + _ALIGNMENT, dtype=np.uint8)
+    offset = -buffer.ctypes.data % _ALIGNMENT
+    return buffer[offset:offset + nbytes].view(dtype).reshape(shape)
+
+
+def _normalize_rows(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return a float32 copy of embeddings with unit-length rows, and the
+    original row norms.
+    
+    The copy is C-contiguous and 64-byte aligned whatever the input's dtype
+    or layout. Squared norms come from a single einsum pass and the
+    division happens in place on the copy; zero rows are left as zeros.
+    """
+    normalized = _aligned_empty(np.shape(embeddings))
+    np.copyto(normalized, embeddings, casting='unsafe')
+    norms = np.einsum('ij,ij->i', normalized, normalized)
+    np.sqrt(norms, out=norms)
+    normalized /= np.where(norms == 0, 1, norms)[:, None]
+    return normalized, norms
+
+
+def _gpu_similarities(embeddings: np.ndarray, query_embedding: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Dot products of a query with every embedding row on the GPU with CuPy.
+    
+    The embedding matrix is uploaded once and kept on the device while it
+    stays among the most recently used matrices.
+    
+    Returns:
+        Array of similarity scores, or None if the GPU ran out of memory
+    """
+    key = id(embeddings)
+    try:
+        with _gpu_cache_lock:
+            entry = _gpu_cache.get(key)
+            if entry is not None and entry[0] is embeddings:
+                _gpu_cache.move_to_end(key)
+                device_embeddings = entry[1]
+            else:
+                device_embeddings = cp.asarray(embeddings)
+                _gpu_cache[key] = (embeddings, device_embeddings)
+                while len(_gpu_cache) > settings.gpu_index_cache_size:
+                    _gpu_cache.popitem(last=False)
+        
+        device_query = cp.asarray(query_embedding, dtype=device_embeddings.dtype)
+        return cp.asnumpy(device_embeddings @ device_query).astype(np.float32, copy=False)
+        
+    except cp.cuda.memory.OutOfMemoryError:
+        logger.warning("GPU out of memory; scoring on CPU and releasing cached device matrices")
+        with _gpu_cache_lock:
+            _gpu_cache.clear()
+        cp.get_default_memory_pool().free_all_blocks()
+        return None
+
+
+def _dot_rows(embeddings: np.ndarray, query_embedding: np.ndarray) -> np.ndarray:
+    """
+    Dot product of every embedding row with a float32 query.
+    
+    float32 matrices go straight to BLAS. Other dtypes are upcast one
+    cache-sized block at a time into a reused buffer rather than copying
+    the whole matrix to float32 first.
+    """
+    if embeddings.dtype == np.float32:
+        return np.dot(embeddings, query_embedding)
+    
+    out = np.empty(len(embeddings), dtype=np.float32)
+    block = _aligned_empty((min(_DOT_BLOCK_ROWS, len(embeddings)), embeddings.shape[1]))
+    for start in range(0, len(embeddings), _DOT_BLOCK_ROWS):
+        rows = embeddings[start:start + _DOT_BLOCK_ROWS]
+        buffer = block[:len(rows)]
+        np.copyto(buffer, rows, casting='unsafe')
+        np.dot(buffer, query_embedding, out=out[start:start + len(rows)])
+    return out
+
+
+def _dump_metadata(metadata: List[Dict[str, Any]]) -> bytes:
+    """Serialize metadata rows as JSON Lines."""
+    return b"".join(orjson.dumps(row) + b"\n" for row in metadata)
+
+
+def _compress_vectors() -> bool:
+    """Whether new vector files should be zstd-compressed."""
+    if settings.simple_index_compression != "zstd":
+        return False
+    if not ZSTD_AVAILABLE:
+        logger.warning("zstandard is not installed; writing uncompressed vector files")
+        return False
+    return True
+
+
+def _write_vectors(f: IO[bytes], array: np.ndarray) -> None:
+    """Write a 1-D or 2-D array as a vector file, compressed per settings.simple_index_compression."""
+    array = np.ascontiguousarray(array)
+    rows = array.reshape(len(array), -1)
+    compress = _compress_vectors()
+    magic = _VECTOR_MAGIC_ZSTD if compress else _VECTOR_MAGIC
+    f.write(_VECTOR_HEADER.pack(magic, _VECTOR_DTYPE_CODES[array.dtype], rows.shape[1], len(rows)))
+    if compress:
+        f.write(zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(rows.tobytes()))
+    else:
+        f.write(rows.tobytes())
+
+
+def _append_vectors(path: str, array: np.ndarray) -> None:
+    """
+    Append rows to a vector file in place.
+    
+    Rows are written after the last committed row before the row count is
+    updated, so a reader never sees a partially written row. Compressed
+    files get the new rows as one more zstd frame.
+    """
+    array = np.ascontiguousarray(array)
+    with open(path, 'r+b') as f:
+        magic, dtype_code, dim, count = _VECTOR_HEADER.unpack(f.read(_VECTOR_HEADER.size))
+        dtype = _VECTOR_DTYPES[dtype_code]
+        if magic not in (_VECTOR_MAGIC, _VECTOR_MAGIC_ZSTD) or array.dtype != dtype:
+            raise VectorStoreError(f"Cannot append {array.dtype} rows to vector file {path}")
+        
+        if magic == _VECTOR_MAGIC_ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise VectorStoreError(f"zstandard is required to append to compressed vector file {path}")
+            f.seek(0, os.SEEK_END)
+            f.write(zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(array.tobytes()))
+        else:
+            f.seek(_VECTOR_HEADER.size + count * dim * dtype.itemsize)
+            f.write(array.tobytes())
+        f.flush()
+        f.seek(_VECTOR_COUNT_OFFSET)
+        f.write(struct.pack('<I', count + len(array)))
+
+
+def _read_vectors(path: str) -> np.ndarray:
+    """
+    Load a vector file; 1-column files are returned as 1-D arrays.
+    
+    Uncompressed files are memory-mapped. Compressed files are decompressed
+    straight into an aligned buffer, once per load.
+    """
+    with open(path, 'rb') as f:
+        magic, dtype_code, dim, count = _VECTOR_HEADER.unpack(f.read(_VECTOR_HEADER.size))
+        dtype = _VECTOR_DTYPES[dtype_code]
+        
+        if magic == _VECTOR_MAGIC_ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise VectorStoreError(f"zstandard is required to read compressed vector file {path}")
+            
+            array = _aligned_empty((count, dim), dtype)
+            view = memoryview(array.reshape(-1).view(np.uint8))
+            reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+            filled = 0
+            while filled < len(view):
+                read = reader.readinto(view[filled:])
+                if not read:
+                    raise VectorStoreError(f"Truncated compressed vector file: {path}")
+                filled += read
+            return array.reshape(-1) if dim == 1 else array
+    
+    if magic != _VECTOR_MAGIC:
+        raise VectorStoreError(f"Not a vector file: {path}")
+    
+    if count == 0:
+        array = np.empty((0, dim), dtype=dtype)
+    else:
+        array = np.memmap(path, dtype=dtype, mode='r', offset=_VECTOR_HEADER.size, shape=(count, dim))
+    return array.reshape(-1) if dim == 1 else array
+
 
 class SimpleVectorStore:
     """Simple vector store using basic similarity search."""
@@ -41,6 +301,11 @@ class SimpleVectorStore:
             embeddings: Array of embeddings
             metadata: List of metadata for each embedding
         """
+        async with _write_lock(document_id):
+            await self._create_index(document_id, embeddings, metadata)
+    
+    async def _create_index(self, document_id: UUID, embeddings: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+        """Create a document's vector store; the caller holds its write lock."""
         try:
             if len(embeddings) == 0:
                 raise VectorStoreError("No embeddings provided for index creation")
@@ -52,24 +317,41 @@ class SimpleVectorStore:
             logger.info(f"Input embeddings shape: {embeddings.shape}, dtype: {embeddings.dtype}")
             
             # Normalize embeddings for cosine similarity
-            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-            norms = np.where(norms == 0, 1, norms)  # Avoid division by zero
-            normalized_embeddings = embeddings / norms
+            normalized_embeddings, norms = _normalize_rows(embeddings)
             
             logger.info(f"Normalized embeddings shape: {normalized_embeddings.shape}, dtype: {normalized_embeddings.dtype}")
             
-            # Save embeddings and metadata
-            data = {
-                'embeddings': normalized_embeddings.astype(np.float32),
-                'metadata': metadata,
+            # Save embeddings to vector files, metadata as JSON Lines and the rest as a JSON header
+            encoded = self._encode_embeddings(normalized_embeddings)
+            encoding = encoded.pop('encoding')
+            encoded[_NORMS_FIELD] = norms
+            for field, array in encoded.items():
+                self._atomic_write(
+                    self._get_array_path(document_id, field),
+                    lambda f, array=array: _write_vectors(f, array)
+                )
+            
+            self._atomic_write(self._get_metadata_path(document_id), lambda f: f.write(_dump_metadata(metadata)))
+            
+            header = {
+                'version': _INDEX_VERSION,
+                'encoding': encoding,
                 'document_id': str(document_id),
-                'embedding_dimension': self.embedding_dim
+                'embedding_dimension': self.embedding_dim,
+                'embedding_model': self.embedding_service.get_model_identifier()
             }
             
-            # Save to file
-            index_path = self._get_index_path(document_id)
-            with open(index_path, 'wb') as f:
-                pickle.dump(data, f)
+            # Write the header last: the index only exists once its arrays and metadata do
+            self._atomic_write(self._get_index_path(document_id), lambda f: f.write(orjson.dumps(header)))
+            _index_cache.pop(str(document_id), None)
+            
+            # Drop files left by a pickled index this one replaces
+            legacy_paths = [self._get_legacy_index_path(document_id)] + [
+                self._get_array_path(document_id, field, ".npy") for field in ('embeddings', 'embeddings_i8', 'scales')
+            ]
+            for legacy_path in legacy_paths:
+                if os.path.exists(legacy_path):
+                    os.remove(legacy_path)
             
             logger.info(f"Created simple vector store for document {document_id} with {len(embeddings)} vectors")
             
@@ -104,38 +386,16 @@ class SimpleVectorStore:
                 logger.warning(f"No index found for document {document_id}")
                 return []
             
-            embeddings = data['embeddings']
-            metadata = data['metadata']
-            
-            # Normalize query embedding
-            query_norm = np.linalg.norm(query_embedding)
+            # The query is not normalized: ranking is invariant to its norm, and
+            # only the k reported scores are divided by it
+            query_embedding = np.ascontiguousarray(query_embedding, dtype=np.float32).ravel()
+            query_norm = float(np.linalg.norm(query_embedding))
             if query_norm == 0:
                 logger.warning("Query embedding has zero norm")
                 return []
             
-            query_embedding = query_embedding / query_norm
-            
-            # Compute cosine similarities
-            similarities = np.dot(embeddings, query_embedding.flatten())
-            
-            # Get top k results
-            top_k_indices = np.argsort(similarities)[::-1][:k]
-            
-            # Process results
-            results = []
-            for idx in top_k_indices:
-                score = similarities[idx]
-                
-                if score >= threshold:
-                    result = {
-                        'chunk_id': metadata[idx]['chunk_id'],
-                        'content': metadata[idx]['content'],
-                        'page_number': metadata[idx].get('page_number'),
-                        'chunk_index': metadata[idx].get('chunk_index'),
-                        'relevance_score': float(score),
-                        'metadata': metadata[idx]
-                    }
-                    results.append(result)
+            # Scoring releases the GIL in NumPy/simsimd, so concurrent searches use multiple cores
+            results = await asyncio.to_thread(self._rank, data, query_embedding, query_norm, k, threshold)
             
             logger.info(f"Found {len(results)} similar chunks for document {document_id}")
             return results
@@ -144,42 +404,112 @@ class SimpleVectorStore:
             logger.error(f"Error searching simple vector store: {e}")
             raise VectorStoreError(f"Failed to search simple vector store: {str(e)}")
     
-    async def update_index(self, document_id: UUID, embeddings: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+    async def l2_search(
+        self,
+        document_id: UUID,
+        query_embedding: np.ndarray,
+        k: int = 5
+    ) -> List[Dict[str, Any]]:
         """
-        Update an existing vector store with new embeddings.
+        Search for the vectors nearest to the query by Euclidean distance.
+        
+        Distances are taken to the embeddings as they were indexed (before
+        normalization), from the stored row norms and one matrix-vector
+        product: ||a - q||^2 = ||a||^2 + ||q||^2 - 2 a.q.
         
         Args:
-            document_id: Document ID
-            embeddings: New embeddings to add
-            metadata: Metadata for new embeddings
+            document_id: Document ID to search in
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            
+        Returns:
+            List of search results with metadata and distances, nearest first
         """
         try:
-            # Load existing data
-            existing_data = await self._load_index(document_id)
+            data = await self._load_index(document_id)
             
-            if existing_data is None:
-                # Create new index if it doesn't exist
-                await self.create_index(document_id, embeddings, metadata)
-                return
+            if data is None:
+                logger.warning(f"No index found for document {document_id}")
+                return []
             
-            # Combine existing and new embeddings
-            existing_embeddings = existing_data['embeddings']
-            existing_metadata = existing_data['metadata']
+            if _NORMS_FIELD not in data:
+                raise VectorStoreError(f"Index for document {document_id} has no stored norms; rebuild it to use L2 search")
             
-            # Normalize new embeddings
-            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-            norms = np.where(norms == 0, 1, norms)
-            normalized_embeddings = embeddings / norms
+            query_embedding = np.ascontiguousarray(query_embedding, dtype=np.float32).ravel()
+            query_norm = float(np.linalg.norm(query_embedding))
             
-            # Combine data
-            combined_embeddings = np.vstack([existing_embeddings, normalized_embeddings])
-            combined_metadata = existing_metadata + metadata
+            def rank() -> List[Dict[str, Any]]:
+                norms = np.asarray(data[_NORMS_FIELD], dtype=np.float32)
+                if query_norm == 0:
+                    distances_sq = norms * norms
+                else:
+                    if data.get('encoding') == 'i8':
+                        scores, scale = self._compute_similarities_i8(
+                            data['embeddings_i8'], data['scales'], query_embedding, query_norm
+                        )
+                    else:
+                        scores, scale = self._compute_similarities(data['embeddings'], query_embedding, query_norm)
+                    
+                    # scores * scale is cos(a, q), so a.q = ||a|| * ||q|| * cos(a, q)
+                    dots = norms * (scores * (scale * query_norm))
+                    distances_sq = norms * norms + query_norm * query_norm - 2 * dots
+                
+                results = self._top_k(-distances_sq, 1.0, data['metadata'], k, -np.inf)
+                for result in results:
+                    result['distance'] = float(np.sqrt(max(-result.pop('relevance_score'), 0.0)))
+                return results
             
-            # Save updated data
-            await self.create_index(document_id, combined_embeddings, combined_metadata)
+            results = await asyncio.to_thread(rank)
             
-            logger.info(f"Updated simple vector store for document {document_id} with {len(embeddings)} new vectors")
+            logger.info(f"Found {len(results)} nearest chunks for document {document_id}")
+            return results
             
+        except Exception as e:
+            logger.error(f"Error in L2 search of simple vector store: {e}")
+            raise VectorStoreError(f"Failed to L2 search simple vector store: {str(e)}")
+    
+    async def update_index(self, document_id: UUID, embeddings: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+        """
+        Update an existing vector store with new embeddings.
+        
+        Args:
+            document_id: Document ID
+            embeddings: New embeddings to add
+            metadata: Metadata for new embeddings
+        """
+        try:
+            async with _write_lock(document_id):
+                # Load existing data
+                existing_data = await self._load_index(document_id)
+                
+                if existing_data is None:
+                    # Create new index if it doesn't exist
+                    await self._create_index(document_id, embeddings, metadata)
+                    return
+                
+                if embeddings.shape[1] != self.embedding_dim:
+                    raise VectorStoreError(f"Embedding dimension mismatch: expected {self.embedding_dim}, got {embeddings.shape[1]}")
+                
+                # Normalize only the new embeddings; existing rows are already unit length
+                normalized_embeddings, norms = _normalize_rows(embeddings)
+                
+                # Append rows and metadata in the index's own encoding
+                encoded = self._encode_embeddings(normalized_embeddings, existing_data['encoding'])
+                encoded.pop('encoding')
+                if _NORMS_FIELD in existing_data:
+                    encoded[_NORMS_FIELD] = norms
+                _index_cache.pop(str(document_id), None)
+                
+                # Metadata first: the vector row counts are the commit point, and
+                # readers ignore metadata past them
+                with open(self._get_metadata_path(document_id), 'ab') as f:
+                    f.write(_dump_metadata(metadata))
+                
+                for field, array in encoded.items():
+                    _append_vectors(self._get_array_path(document_id, field), array)
+                
+                logger.info(f"Updated simple vector store for document {document_id} with {len(embeddings)} new vectors")
+                
         except Exception as e:
             logger.error(f"Error updating simple vector store: {e}")
             raise VectorStoreError(f"Failed to update simple vector store: {str(e)}")
@@ -192,12 +522,17 @@ class SimpleVectorStore:
             document_id: Document ID to delete index for
         """
         try:
-            index_path = self._get_index_path(document_id)
-            
-            if os.path.exists(index_path):
-                os.remove(index_path)
-                logger.info(f"Deleted simple vector store for document {document_id}")
-            
+            async with _write_lock(document_id):
+                _index_cache.pop(str(document_id), None)
+                existed = await self.index_exists(document_id)
+                
+                for path in self._get_index_files(document_id):
+                    if os.path.exists(path):
+                        os.remove(path)
+                
+                if existed:
+                    logger.info(f"Deleted simple vector store for document {document_id}")
+                
         except Exception as e:
             logger.error(f"Error deleting simple vector store: {e}")
             raise VectorStoreError(f"Failed to delete simple vector store: {str(e)}")
@@ -213,8 +548,10 @@ class SimpleVectorStore:
             True if index exists, False otherwise
         """
         try:
-            index_path = self._get_index_path(document_id)
-            return os.path.exists(index_path)
+            return (
+                os.path.exists(self._get_index_path(document_id))
+                or os.path.exists(self._get_legacy_index_path(document_id))
+            )
             
         except Exception as e:
             logger.error(f"Error checking index existence: {e}")
@@ -236,7 +573,7 @@ class SimpleVectorStore:
             if data is None:
                 return {'error': 'Index not found'}
             
-            embeddings = data['embeddings']
+            embeddings = self._decode_embeddings(data)
             metadata = data['metadata']
             
             stats = {
@@ -244,8 +581,11 @@ class SimpleVectorStore:
                 'total_vectors': len(embeddings),
                 'embedding_dimension': embeddings.shape[1],
                 'index_type': 'SimpleVectorStore',
+                'encoding': data.get('encoding', 'f32'),
                 'metadata_count': len(metadata),
-                'index_size_bytes': os.path.getsize(self._get_index_path(document_id)) if os.path.exists(self._get_index_path(document_id)) else 0
+                'index_size_bytes': sum(
+                    os.path.getsize(path) for path in self._get_index_files(document_id) if os.path.exists(path)
+                )
             }
             
             return stats
@@ -296,16 +636,24 @@ class SimpleVectorStore:
             Dictionary mapping document IDs to search results
         """
         try:
+            if len(document_ids) > 1:
+                stacked_results = await self._stacked_batch_search(document_ids, query_embedding, k, threshold)
+                if stacked_results is not None:
+                    return stacked_results
+            
             results = {}
             
-            # Search each document
-            for doc_id in document_ids:
-                try:
-                    search_results = await self.search(doc_id, query_embedding, k, threshold)
-                    results[doc_id] = search_results
-                except Exception as e:
-                    logger.error(f"Error searching document {doc_id}: {e}")
-                    results[doc_id] = []
+            # Search all documents concurrently; each search scores in a worker thread
+            searches = await asyncio.gather(
+                *(self.search(doc_id, query_embedding, k, threshold) for doc_id in document_ids),
+                return_exceptions=True
+            )
+            
+            for doc_id, search_results in zip(document_ids, searches):
+                if isinstance(search_results, Exception):
+                    logger.error(f"Error searching document {doc_id}: {search_results}")
+                    search_results = []
+                results[doc_id] = search_results
             
             return results
             
@@ -313,14 +661,281 @@ class SimpleVectorStore:
             logger.error(f"Error in batch search: {e}")
             raise VectorStoreError(f"Failed to perform batch search: {str(e)}")
     
+    async def _stacked_batch_search(
+        self,
+        document_ids: List[UUID],
+        query_embedding: np.ndarray,
+        k: int,
+        threshold: float
+    ) -> Optional[Dict[UUID, List[Dict[str, Any]]]]:
+        """
+        Search several documents with one matrix-vector product over their stacked embeddings.
+        
+        Args:
+            document_ids: List of document IDs to search
+            query_embedding: Query embedding vector
+            k: Number of results per document
+            threshold: Minimum similarity threshold
+            
+        Returns:
+            Dictionary mapping document IDs to search results, or None if the
+            indices cannot be stacked (int8 encoded) and must be searched one by one
+        """
+        datas = [await self._load_index(doc_id) for doc_id in document_ids]
+        present = [(doc_id, data) for doc_id, data in zip(document_ids, datas) if data is not None]
+        if any(data.get('encoding') == 'i8' for _, data in present):
+            return None
+        
+        results = {doc_id: [] for doc_id in document_ids}
+        query = np.ascontiguousarray(query_embedding, dtype=np.float32).ravel()
+        query_norm = float(np.linalg.norm(query))
+        if not present or query_norm == 0:
+            return results
+        
+        key = tuple(str(doc_id) for doc_id, _ in present)
+        cached = _stacked_cache.get(key)
+        if cached is not None and all(a is b for a, b in zip(cached[0], (data for _, data in present))):
+            _stacked_cache.move_to_end(key)
+            _, matrix, offsets = cached
+        else:
+            offsets = np.cumsum([0] + [len(data['embeddings']) for _, data in present])
+            matrix = _aligned_empty((int(offsets[-1]), self.embedding_dim))
+            np.concatenate([data['embeddings'] for _, data in present], out=matrix)
+            _stacked_cache[key] = ([data for _, data in present], matrix, offsets)
+            while len(_stacked_cache) > _STACKED_CACHE_SIZE:
+                _stacked_cache.popitem(last=False)
+        
+        def rank_all() -> None:
+            similarities, scale = self._compute_similarities(matrix, query, query_norm)
+            for i, (doc_id, data) in enumerate(present):
+                results[doc_id] = self._top_k(
+                    similarities[offsets[i]:offsets[i + 1]], scale, data['metadata'], k, threshold
+                )
+        
+        await asyncio.to_thread(rank_all)
+        return results
+    
+    def _rank(
+        self,
+        data: Dict[str, Any],
+        query_embedding: np.ndarray,
+        query_norm: float,
+        k: int,
+        threshold: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Score a query against a loaded index and return its top-k results.
+        
+        Args:
+            data: Loaded index data
+            query_embedding: float32 query vector of shape (dim,)
+            query_norm: L2 norm of the query
+            k: Number of results to return
+            threshold: Minimum similarity threshold
+            
+        Returns:
+            List of search results with metadata and scores
+        """
+        if data.get('encoding') == 'i8':
+            similarities, scale = self._compute_similarities_i8(
+                data['embeddings_i8'], data['scales'], query_embedding, query_norm
+            )
+        else:
+            similarities, scale = self._compute_similarities(data['embeddings'], query_embedding, query_norm)
+        
+        return self._top_k(similarities, scale, data['metadata'], k, threshold)
+    
+    @staticmethod
+    def _top_k(
+        similarities: np.ndarray,
+        scale: float,
+        metadata: List[Dict[str, Any]],
+        k: int,
+        threshold: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Build search results for the k highest similarities at or above threshold.
+        
+        Args:
+            similarities: Score per indexed row, proportional to cosine similarity
+            scale: Factor turning scores into cosine similarities
+            metadata: Metadata per indexed row
+            k: Number of results to return
+            threshold: Minimum similarity threshold
+            
+        Returns:
+            List of search results ordered by descending score
+        """
+        # O(N) selection, then sort only the k winners
+        if k < len(similarities):
+            top_k_indices = np.argpartition(-similarities, k - 1)[:k]
+            top_k_indices = top_k_indices[np.argsort(-similarities[top_k_indices])]
+        else:
+            top_k_indices = np.argsort(-similarities)
+        
+        # Rescale only the k winners; threshold as a mask before leaving NumPy and
+        # scores become Python floats in one call
+        top_k_scores = similarities[top_k_indices] * scale
+        keep = top_k_scores >= threshold
+        rows = [(metadata[idx], score) for idx, score in zip(top_k_indices[keep].tolist(), top_k_scores[keep].tolist())]
+        
+        return [
+            {
+                'chunk_id': row['chunk_id'],
+                'content': row.get('content'),
+                'page_number': row.get('page_number'),
+                'chunk_index': row.get('chunk_index'),
+                'relevance_score': score,
+                'metadata': row
+            }
+            for row, score in rows
+        ]
+    
+    @staticmethod
+    def _encode_embeddings(normalized_embeddings: np.ndarray, encoding: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Encode normalized embeddings for storage.
+        
+        Args:
+            normalized_embeddings: Unit-normalized array of shape (n, dim)
+            encoding: 'f32', 'f16' or 'i8'; defaults to settings.vector_quantization
+            
+        Returns:
+            Dictionary with the encoding and the arrays to store
+        """
+        if encoding is None:
+            encoding = {"sq8": "i8", "fp16": "f16"}.get(settings.vector_quantization, "f32")
+        
+        if encoding == "i8":
+            embeddings_i8, scales = quantize_i8(normalized_embeddings)
+            return {'encoding': 'i8', 'embeddings_i8': embeddings_i8, 'scales': scales}
+        
+        if encoding == "f16":
+            return {'encoding': 'f16', 'embeddings': normalized_embeddings.astype(np.float16)}
+        
+        return {'encoding': 'f32', 'embeddings': normalized_embeddings.astype(np.float32)}
+    
+    @staticmethod
+    def _decode_embeddings(data: Dict[str, Any]) -> np.ndarray:
+        """
+        Recover float32 embeddings from a loaded index of any version.
+        
+        Args:
+            data: Loaded index data
+            
+        Returns:
+            float32 array of shape (n, dim)
+        """
+        if data.get('encoding') == 'i8':
+            return data['embeddings_i8'].astype(np.float32) * data['scales'][:, None]
+        
+        return np.asarray(data['embeddings'], dtype=np.float32)
+    
+    @staticmethod
+    def _compute_similarities_i8(
+        embeddings_i8: np.ndarray,
+        scales: np.ndarray,
+        query_embedding: np.ndarray,
+        query_norm: float
+    ) -> Tuple[np.ndarray, float]:
+        """
+        Score a query against int8-quantized normalized embeddings.
+        
+        Args:
+            embeddings_i8: int8 array of shape (n, dim)
+            scales: Per-row float32 dequantization scales
+            query_embedding: float32 query vector of shape (dim,)
+            query_norm: L2 norm of the query
+            
+        Returns:
+            Tuple of (n scores, scale) such that scores * scale are cosine similarities
+        """
+        query_i8, query_scale = quantize_i8(query_embedding.reshape(1, -1))
+        
+        if SIMSIMD_AVAILABLE:
+            # Cosine is scale-invariant, so the int8 kernel needs no rescaling
+            distances = simsimd.cdist(query_i8, embeddings_i8, metric="cosine")
+            return 1.0 - np.asarray(distances, dtype=np.float32).reshape(-1), 1.0
+        
+        dots = _dot_rows(embeddings_i8, query_i8[0].astype(np.float32))
+        return dots * scales, float(query_scale[0]) / query_norm
+    
+    @staticmethod
+    def _compute_similarities(
+        embeddings: np.ndarray,
+        query_embedding: np.ndarray,
+        query_norm: float
+    ) -> Tuple[np.ndarray, float]:
+        """
+        Score a query against normalized stored embeddings.
+        
+        Args:
+            embeddings: float32 or float16 array of shape (n, dim)
+            query_embedding: float32 query vector of shape (dim,)
+            query_norm: L2 norm of the query
+            
+        Returns:
+            Tuple of (n scores, scale) such that scores * scale are cosine similarities
+        """
+        if CUPY_AVAILABLE and settings.use_gpu and len(embeddings) >= settings.gpu_min_vectors:
+            similarities = _gpu_similarities(embeddings, query_embedding)
+            if similarities is not None:
+                return similarities, 1.0 / query_norm
+        
+        if SIMSIMD_AVAILABLE:
+            # Fused SIMD cosine kernel on the stored dtype (f32 or native f16);
+            # returns distances (1 - similarity)
+            query = query_embedding.reshape(1, -1).astype(embeddings.dtype, copy=False)
+            distances = simsimd.cdist(query, embeddings, metric="cosine")
+            return 1.0 - np.asarray(distances, dtype=np.float32).reshape(-1), 1.0
+        
+        return _dot_rows(embeddings, query_embedding), 1.0 / query_norm
+    
     def _get_index_path(self, document_id: UUID) -> str:
-        """Get file path for document index."""
+        """Get file path for document index header."""
+        return os.path.join(settings.vector_store_path, f"simple_index_{document_id}.json")
+    
+    def _get_metadata_path(self, document_id: UUID) -> str:
+        """Get file path for document index metadata."""
+        return os.path.join(settings.vector_store_path, f"simple_index_{document_id}.meta.jsonl")
+    
+    def _get_legacy_index_path(self, document_id: UUID) -> str:
+        """Get file path for a pickled (version 1-4) document index."""
         return os.path.join(settings.vector_store_path, f"simple_index_{document_id}.pkl")
     
+    def _get_array_path(self, document_id: UUID, field: str, suffix: str = ".vec") -> str:
+        """Get file path for one of a document index's embedding arrays."""
+        return os.path.join(settings.vector_store_path, f"simple_index_{document_id}.{field}{suffix}")
+    
+    def _get_index_files(self, document_id: UUID) -> List[str]:
+        """Get every file path a document index may occupy, including older layouts."""
+        fields = dict.fromkeys([field for fields in _ARRAY_FIELDS.values() for field in fields] + [_NORMS_FIELD])
+        return [
+            self._get_index_path(document_id),
+            self._get_metadata_path(document_id),
+            self._get_legacy_index_path(document_id)
+        ] + [
+            self._get_array_path(document_id, field, suffix) for field in fields for suffix in (".vec", ".npy")
+        ]
+    
+    @staticmethod
+    def _atomic_write(path: str, write: Callable[[IO[bytes]], Any]) -> None:
+        """
+        Write a file via a temporary path and rename it into place, so readers
+        holding a memory map of the previous file are never truncated under.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    
     async def _load_index(self, document_id: UUID) -> Optional[Dict[str, Any]]:
         """
         Load vector store data for a document.
         
+        Embedding arrays are memory-mapped rather than read, and loaded indices
+        are cached in the process until the index is rewritten or deleted.
+        
         Args:
             document_id: Document ID
             
@@ -328,30 +943,104 @@ class SimpleVectorStore:
             Dictionary with embeddings and metadata or None if not found
         """
         try:
+            key = str(document_id)
+            data = _index_cache.get(key)
+            if data is not None:
+                _index_cache.move_to_end(key)
+                return data
+            
             index_path = self._get_index_path(document_id)
             
             if not os.path.exists(index_path):
-                return None
+                if not os.path.exists(self._get_legacy_index_path(document_id)):
+                    return None
+                
+                # Rewrite a pickled index in the current layout once, then load that;
+                # pickles do not record their model, so stale ones are refused first
+                self.embedding_service.ensure_compatible(None, document_id)
+                legacy_data = self._load_legacy_index(document_id)
+                await self._create_index(document_id, self._decode_embeddings(legacy_data), legacy_data['metadata'])
+                logger.info(f"Migrated simple vector store for document {document_id} to version {_INDEX_VERSION}")
             
             with open(index_path, 'rb') as f:
-                data = pickle.load(f)
+                data = orjson.loads(f.read())
+            self.embedding_service.ensure_compatible(data.get('embedding_model'), document_id)
+            
+            with open(self._get_metadata_path(document_id), 'rb') as f:
+                data['metadata'] = [orjson.loads(line) for line in f]
+            
+            for field in _ARRAY_FIELDS[data['encoding']]:
+                data[field] = _read_vectors(self._get_array_path(document_id, field))
+            
+            # Drop metadata of an append whose rows are not committed yet
+            row_count = len(data[_ARRAY_FIELDS[data['encoding']][0]])
+            del data['metadata'][row_count:]
+            
+            norms_path = self._get_array_path(document_id, _NORMS_FIELD)
+            if os.path.exists(norms_path):
+                data[_NORMS_FIELD] = _read_vectors(norms_path)
+            
+            _index_cache[key] = data
+            while len(_index_cache) > settings.simple_index_cache_size:
+                _index_cache.popitem(last=False)
             
             return data
             
+        except VectorIndexError:
+            # A stale index must not be mistaken for a missing one and overwritten piecemeal
+            raise
         except Exception as e:
             logger.error(f"Error loading simple vector store: {e}")
             return None
     
+    def _load_legacy_index(self, document_id: UUID) -> Dict[str, Any]:
+        """
+        Load a pickled (version 1-4) document index with its arrays.
+        
+        Args:
+            document_id: Document ID
+            
+        Returns:
+            Dictionary with embeddings and metadata
+        """
+        with open(self._get_legacy_index_path(document_id), 'rb') as f:
+            data = pickle.load(f)
+            
+            # Version 4 pickles are followed by one metadata batch per append
+            if data.get('version', 1) >= 4:
+                while f.peek(1):
+                    data['metadata'] = data['metadata'] + pickle.load(f)
+        
+        version = data.get('version', 1)
+        if version >= 4:
+            for field in _ARRAY_FIELDS[data['encoding']]:
+                data[field] = _read_vectors(self._get_array_path(document_id, field))
+        elif version == 3:
+            for field in _ARRAY_FIELDS[data['encoding']]:
+                data[field] = np.load(self._get_array_path(document_id, field, ".npy"), mmap_mode='r')
+        
+        return data
+    
     async def cleanup_all_indices(self) -> None:
         """Clean up all vector stores in the directory."""
         try:
             vector_store_path = settings.vector_store_path
+            _index_cache.clear()
+            _stacked_cache.clear()
+            with _gpu_cache_lock:
+                _gpu_cache.clear()
+            
+            def remove_files() -> List[str]:
+                removed = []
+                with os.scandir(vector_store_path) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('simple_index_'):
+                            os.unlink(entry.path)
+                            removed.append(entry.name)
+                return removed
             
-            for filename in os.listdir(vector_store_path):
-                if filename.startswith('simple_index_'):
-                    file_path = os.path.join(vector_store_path, filename)
-                    os.remove(file_path)
-                    logger.info(f"Cleaned up file: {filename}")
+            for filename in await asyncio.to_thread(remove_files):
+                logger.info(f"Cleaned up file: {filename}")
             
         except Exception as e:
             logger.error(f"Error cleaning up indices: {e}")
@@ -362,15 +1051,19 @@ class SimpleVectorStore:
         try:
             vector_store_path = settings.vector_store_path
             
-            total_indices = 0
-            total_size = 0
+            def scan() -> Tuple[int, int]:
+                # DirEntry.stat() reuses the directory read; an index is counted
+                # by its header (or legacy pickle) and sized by all of its files
+                indices, size = 0, 0
+                with os.scandir(vector_store_path) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('simple_index_'):
+                            size += entry.stat().st_size
+                            if entry.name.endswith(('.json', '.pkl')):
+                                indices += 1
+                return indices, size
             
-            for filename in os.listdir(vector_store_path):
-                if filename.startswith('simple_index_'):
-                    file_path = os.path.join(vector_store_path, filename)
-                    file_size = os.path.getsize(file_path)
-                    total_size += file_size
-                    total_indices += 1
+            total_indices, total_size = await asyncio.to_thread(scan)
             
             return {
                 'total_indices': total_indices,
@@ -4,13 +4,23 @@ FAISS vector store service for semantic search and retrieval.
 """
 
 import asyncio
+import copy
+import hashlib
 import logging
+import math
 import os
 import pickle
-from typing import List, Dict, Any, Optional, Tuple
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from uuid import UUID
 
 import numpy as np
+import orjson
 try:
     import faiss
     FAISS_AVAILABLE = True
@@ -18,12 +28,248 @@ except ImportError:
     faiss = None
     FAISS_AVAILABLE = False
 
+# Advisory file locks (POSIX); without them only threads of one process are serialized
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 from app.config.settings import settings
-from app.core.exceptions import VectorStoreError
+from app.core.exceptions import VectorIndexError, VectorStoreError
+from app.services.chunk_metadata import ChunkMetadata
 from app.services.embedding_service import EmbeddingService
+from app.services.simple_vector_store import SimpleVectorStore
 
 logger = logging.getLogger(__name__)
 
+# Set once the loaded Faiss library has been configured for this process
+_faiss_configured = False
+
+# Read-only (memory-mapped) indices shared by every FAISSVectorStore in the
+# process, keyed by document ID, with their metadata; dropped on any write
+_open_indexes: "OrderedDict[str, Tuple[Any, List[Dict[str, Any]]]]" = OrderedDict()
+# Binary shortlist index per document ID, or None if the document has none
+_open_binary_indexes: Dict[str, Any] = {}
+# Dense float32 matrices of small flat indices, keyed by document ID, searched
+# with NumPy instead of Faiss
+_small_matrices: Dict[str, np.ndarray] = {}
+_SMALL_INDEX_ROWS = 256
+# GPU copies of large flat indices, keyed by document ID (faiss-gpu builds only)
+_gpu_indexes: "OrderedDict[str, Any]" = OrderedDict()
+_gpu_resources = None
+# StandardGpuResources' scratch memory and stream are not thread-safe, so
+# everything using them (copies to and searches on the GPU) holds this lock
+_gpu_lock = threading.Lock()
+# The shared corpus index of the process, with its metadata, path and the
+# signature of the index file it was read from (see _get_corpus_index); every
+# FAISSVectorStore uses it under _corpus_lock
+_corpus: Dict[str, Any] = {}
+_corpus_lock = threading.Lock()
+# Writer locks per document ID, so concurrent updates don't each append to
+# their own copy of an index and overwrite one another's rows
+_write_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+# Per-document locks so concurrent cache misses read an index from disk once
+_load_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+# File name prefixes of per-document index files
+_INDEX_FILE_PREFIXES = ('faiss_index_', 'faiss_metadata_', 'faiss_binary_')
+
+# Directory-wide stats are reused for this many seconds unless an index changes
+_ALL_STATS_TTL = 30.0
+_all_stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+
+
+def _load_lock(key: str) -> asyncio.Lock:
+    """Get the lock serializing cache-miss loads of one document's index."""
+    lock = _load_locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _load_locks[key] = lock
+    return lock
+
+
+def _write_lock(document_id: UUID) -> asyncio.Lock:
+    """Get the lock serializing writes to one document's index."""
+    key = str(document_id)
+    lock = _write_locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _write_locks[key] = lock
+    return lock
+
+
+def _evict_open_index(document_id: UUID) -> None:
+    """Drop a document's cached open indices and the directory-wide stats."""
+    global _all_stats_cache
+    _open_indexes.pop(str(document_id), None)
+    _open_binary_indexes.pop(str(document_id), None)
+    _gpu_indexes.pop(str(document_id), None)
+    _small_matrices.pop(str(document_id), None)
+    _all_stats_cache = None
+
+
+def _faiss_gpu_available() -> bool:
+    """Whether the loaded Faiss library has GPU support and a GPU is visible."""
+    return hasattr(faiss, 'StandardGpuResources') and faiss.get_num_gpus() > 0
+
+
+def _get_gpu_resources() -> Any:
+    """Create the process-wide Faiss GPU resources (scratch memory, streams) once."""
+    global _gpu_resources
+    if _gpu_resources is None:
+        _gpu_resources = faiss.StandardGpuResources()
+    return _gpu_resources
+
+
+def _copy_index_to_gpu(index: Any) -> Any:
+    """Copy a CPU index to GPU 0 on the shared GPU resources."""
+    with _gpu_lock:
+        return faiss.index_cpu_to_gpu(_get_gpu_resources(), 0, index)
+
+
+def _search_faiss(index: Any, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Search an index, serializing searches on GPU copies under _gpu_lock."""
+    gpu_index_type = getattr(faiss, 'GpuIndex', None)
+    if gpu_index_type is not None and isinstance(index, gpu_index_type):
+        with _gpu_lock:
+            return index.search(queries, k)
+    return index.search(queries, k)
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """Identify a file's current version by inode, mtime and size, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _fsync(path: str, flags: int = os.O_RDONLY) -> None:
+    """Flush a file or directory to stable storage."""
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace_file(path: str, write: Callable[[str], None]) -> None:
+    """
+    Write a file under a temporary name and rename it into place, so cached
+    memory-mapped readers of the previous file are never truncated under and
+    a crash mid-write never leaves a partial file at the final path.
+    """
+    # A unique name per call, so concurrent writers of one path never share a temp file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        # mkstemp creates the file owner-only; match a normally created file
+        os.chmod(tmp_path, 0o644)
+        write(tmp_path)
+        _fsync(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    
+    # Persist the rename itself
+    _fsync(os.path.dirname(path) or '.', os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+
+
+def _write_bytes(data: bytes, path: str) -> None:
+    """Write bytes to a file."""
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _write_metadata(metadata: List[Dict[str, Any]], path: str, embedding_model: str) -> None:
+    """Write chunk metadata as columnar arrays, labelled with the embedding model of its index."""
+    columns = copy.copy(ChunkMetadata.from_rows(metadata))
+    columns.embedding_model = embedding_model
+    with open(path, 'wb') as f:
+        columns.save(f)
+
+
+def _append_metadata_delta(path: str, document_id: UUID, start: int, metadata: List[Dict[str, Any]]) -> None:
+    """
+    Append metadata rows, tagged with their index row numbers, to a JSON Lines delta log.
+    
+    Rows are normalized through ChunkMetadata first, so they read back exactly
+    as they will from the columnar base file once the log is compacted into it.
+    """
+    lines = b"".join(
+        orjson.dumps({'row': row, 'metadata': meta}) + b"\n"
+        for row, meta in enumerate(ChunkMetadata.from_rows(metadata, document_id=str(document_id)), start)
+    )
+    with open(path, 'ab') as f:
+        f.write(lines)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _apply_metadata_delta(metadata: List[Dict[str, Any]], path: str, ntotal: int) -> List[Dict[str, Any]]:
+    """
+    Extend base metadata with the rows of a delta log that follow it.
+    
+    Rows already covered by the base file or beyond the index's ``ntotal``
+    (left by an update interrupted before its index write) are ignored, and a
+    later entry for the same row replaces an earlier one.
+    """
+    rows = {}
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                entry = orjson.loads(line)
+                if len(metadata) <= entry['row'] < ntotal:
+                    rows[entry['row']] = entry['metadata']
+    
+    delta = []
+    for row in range(len(metadata), ntotal):
+        if row not in rows:
+            break
+        delta.append(rows[row])
+    
+    return metadata + delta if delta else metadata
+
+
+def _read_metadata(path: str) -> List[Dict[str, Any]]:
+    """Read chunk metadata, falling back to the legacy pickled list of dicts."""
+    with open(path, 'rb') as f:
+        if path.endswith('.pkl'):
+            return pickle.load(f)
+        return ChunkMetadata.load(f)
+
+
+def _configure_faiss() -> None:
+    """
+    Once per process: cap Faiss's OpenMP threads and log which SIMD kernels
+    the loaded Faiss library was compiled with.
+    """
+    global _faiss_configured
+    if _faiss_configured:
+        return
+    _faiss_configured = True
+    
+    # Concurrent searches each run Faiss in their own thread; leave headroom
+    # so their OpenMP pools do not oversubscribe the cores
+    omp_threads = settings.faiss_omp_threads or max(1, (os.cpu_count() or 2) // 2)
+    faiss.omp_set_num_threads(omp_threads)
+    
+    try:
+        compile_options = faiss.get_compile_options()
+    except AttributeError:
+        logger.warning("Unable to determine Faiss compile options")
+        return
+    
+    logger.info(f"Faiss {getattr(faiss, '__version__', 'unknown')} compile options: {compile_options.strip()}")
+    if "AVX2" not in compile_options and "AVX512" not in compile_options and "NEON" not in compile_options:
+        logger.warning(
+            "Faiss was loaded without AVX2/AVX-512 kernels; inner-product search will be several times slower. "
+            "Install a faiss-cpu wheel that ships the AVX2 build (e.g. faiss-cpu>=1.7.3 on x86-64)."
+        )
+
 
 class FAISSVectorStore:
     """FAISS-based vector store for document chunks."""
@@ -32,6 +278,8 @@ class FAISSVectorStore:
         if not FAISS_AVAILABLE:
             raise VectorStoreError("faiss is not installed. Please install faiss-cpu or faiss-gpu to use vector search.")
         
+        _configure_faiss()
+        
         self.embedding_service = embedding_service
         self.embedding_dim = embedding_service.get_embedding_dimension()
         
@@ -49,6 +297,11 @@ class FAISSVectorStore:
             embeddings: Array of embeddings
             metadata: List of metadata for each embedding
         """
+        async with _write_lock(document_id):
+            await self._create_index(document_id, embeddings, metadata)
+    
+    async def _create_index(self, document_id: UUID, embeddings: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+        """Create a document's FAISS index; the caller holds its write lock."""
         try:
             if len(embeddings) == 0:
                 raise VectorStoreError("No embeddings provided for index creation")
@@ -56,35 +309,31 @@ class FAISSVectorStore:
             if embeddings.shape[1] != self.embedding_dim:
                 raise VectorStoreError(f"Embedding dimension mismatch: expected {self.embedding_dim}, got {embeddings.shape[1]}")
             
-            # Create FAISS index
-            index = faiss.IndexFlatIP(self.embedding_dim)  # Inner product for cosine similarity
-            
             # Validate embeddings before processing
             logger.info(f"Input embeddings shape: {embeddings.shape}, dtype: {embeddings.dtype}")
             
-            # Normalize embeddings for cosine similarity
-            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-            # Avoid division by zero
-            norms = np.where(norms == 0, 1, norms)
-            normalized_embeddings = embeddings / norms
-            
-            logger.info(f"Normalized embeddings shape: {normalized_embeddings.shape}, dtype: {normalized_embeddings.dtype}")
-            
-            # Ensure float32 and contiguous
-            normalized_embeddings = np.ascontiguousarray(normalized_embeddings.astype(np.float32))
-            
-            # Add embeddings to index
-            index.add(normalized_embeddings)
-            # Save index and metadata
-            index_path = self._get_index_path(document_id)
-            metadata_path = self._get_metadata_path(document_id)
-            
-            # Save FAISS index
-            faiss.write_index(index, index_path)
+            def build_and_save() -> None:
+                # Normalize embeddings for cosine similarity in a single float32 copy
+                normalized_embeddings = self._normalize(embeddings)
+                
+                # Create FAISS index
+                index = self._build_index(len(normalized_embeddings))
+                if not index.is_trained:
+                    index.train(normalized_embeddings)
+                
+                # Add embeddings to index
+                index.add(normalized_embeddings)
+                
+                # Save index and metadata
+                self._save_index_files(document_id, index, metadata)
+                
+                # Build 1-bit shortlist index for very large collections
+                if self._use_binary_index(index):
+                    self._write_binary_index(document_id, normalized_embeddings)
             
-            # Save metadata
-            with open(metadata_path, 'wb') as f:
-                pickle.dump(metadata, f)
+            # Training, adding and file IO all block; keep them off the event loop
+            await asyncio.to_thread(build_and_save)
+            _evict_open_index(document_id)
             
             logger.info(f"Created FAISS index for document {document_id} with {len(embeddings)} vectors")
             
@@ -116,32 +365,13 @@ class FAISSVectorStore:
             index, metadata = await self._load_index(document_id)
             
             if index is None:
+                if settings.shared_corpus_index:
+                    return await self.search_corpus(query_embedding, k, threshold, document_id=document_id)
                 logger.warning(f"No index found for document {document_id}")
                 return []
             
-            # Normalize query embedding
-            query_norm = query_embedding / np.linalg.norm(query_embedding)
-            query_norm = query_norm.astype(np.float32).reshape(1, -1)
-            
-            # Search
-            scores, indices = index.search(query_norm, min(k, index.ntotal))
-            
-            # Process results
-            results = []
-            for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if idx == -1:  # FAISS returns -1 for invalid indices
-                    break
-                
-                if score >= threshold:
-                    result = {
-                        'chunk_id': metadata[idx]['chunk_id'],
-                        'content': metadata[idx]['content'],
-                        'page_number': metadata[idx].get('page_number'),
-                        'chunk_index': metadata[idx].get('chunk_index'),
-                        'relevance_score': float(score),
-                        'metadata': metadata[idx]
-                    }
-                    results.append(result)
+            scores, indices = await self._search_index(document_id, index, query_embedding, k)
+            results = self._collect_results(scores, indices, metadata, threshold)
             
             logger.info(f"Found {len(results)} similar chunks for document {document_id}")
             return results
@@ -150,43 +380,207 @@ class FAISSVectorStore:
             logger.error(f"Error searching FAISS index: {e}")
             raise VectorStoreError(f"Failed to search FAISS index: {str(e)}")
     
-    async def update_index(self, document_id: UUID, embeddings: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+    async def search_arrays(
+        self,
+        document_id: UUID,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        threshold: float = 0.0
+    ) -> Tuple[List[str], np.ndarray]:
         """
-        Update an existing FAISS index with new embeddings.
+        Search a document index without building a result dict per hit.
         
         Args:
-            document_id: Document ID
-            embeddings: New embeddings to add
-            metadata: Metadata for new embeddings
+            document_id: Document ID to search in
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            threshold: Minimum similarity threshold
+            
+        Returns:
+            Tuple of (chunk IDs, float32 similarity scores), best match first
         """
         try:
-            # Load existing index and metadata
-            index, existing_metadata = await self._load_index(document_id)
+            index, metadata = await self._load_index(document_id)
             
             if index is None:
-                # Create new index if it doesn't exist
-                await self.create_index(document_id, embeddings, metadata)
-                return
-            
-            # Normalize new embeddings
-            normalized_embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
-            
-            # Add new embeddings to index
-            index.add(normalized_embeddings.astype(np.float32))
+                logger.warning(f"No index found for document {document_id}")
+                return [], np.empty(0, dtype=np.float32)
             
-            # Update metadata
-            updated_metadata = existing_metadata + metadata
+            scores, indices = await self._search_index(document_id, index, query_embedding, k)
+            mask = (indices != -1) & (scores >= threshold)
+            positions = indices[mask].tolist()
             
-            # Save updated index and metadata
-            index_path = self._get_index_path(document_id)
-            metadata_path = self._get_metadata_path(document_id)
+            if isinstance(metadata, ChunkMetadata):
+                chunk_ids = [metadata.chunk_ids[idx] for idx in positions]
+            else:
+                chunk_ids = [metadata[idx]['chunk_id'] for idx in positions]
             
-            faiss.write_index(index, index_path)
+            return chunk_ids, scores[mask]
             
-            with open(metadata_path, 'wb') as f:
-                pickle.dump(updated_metadata, f)
+        except Exception as e:
+            logger.error(f"Error searching FAISS index: {e}")
+            raise VectorStoreError(f"Failed to search FAISS index: {str(e)}")
+    
+    async def _search_index(
+        self,
+        document_id: UUID,
+        index: "faiss.Index",
+        query_embedding: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run a single query against a loaded document index.
+        
+        Returns:
+            Tuple of (scores, row indices) for the query, padded with -1 indices
+        """
+        # Normalize query embedding
+        query_norm = self._normalize(query_embedding.reshape(1, -1))
+        
+        # Small flat indices: one matrix-vector product and a partial sort cost
+        # less than Faiss's per-search dispatch
+        matrix = self._get_small_matrix(document_id, index)
+        if matrix is not None:
+            return self._small_index_search(matrix, query_norm[0], k)
+        
+        # Search, using the binary shortlist + fp32 rerank when available; Faiss
+        # releases the GIL, so concurrent searches run in parallel threads
+        binary_index = await self._get_binary_index(document_id)
+        if binary_index is not None:
+            scores, indices = await asyncio.to_thread(
+                self._binary_rerank_search, index, binary_index, query_norm, k
+            )
+        else:
+            search_index = await self._get_search_index(document_id, index)
+            scores, indices = await asyncio.to_thread(_search_faiss, search_index, query_norm, min(k, index.ntotal))
+        
+        return scores[0], indices[0]
+    
+    def _get_small_matrix(self, document_id: UUID, index: "faiss.Index") -> Optional[np.ndarray]:
+        """Get the cached vectors of a small inner-product flat index, or None for any other index."""
+        key = str(document_id)
+        if key in _small_matrices:
+            return _small_matrices[key]
+        
+        if (
+            index.ntotal >= _SMALL_INDEX_ROWS
+            or not isinstance(index, faiss.IndexFlat)
+            or index.metric_type != faiss.METRIC_INNER_PRODUCT
+        ):
+            return None
+        
+        matrix = index.reconstruct_n(0, index.ntotal)
+        _small_matrices[key] = matrix
+        return matrix
+    
+    @staticmethod
+    def _small_index_search(matrix: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact inner-product top-k over a small in-memory matrix.
+        
+        Returns:
+            Tuple of (scores, row indices), best match first
+        """
+        scores = matrix @ query
+        if k < len(scores):
+            top = np.argpartition(-scores, k)[:k]
+            top = top[np.argsort(-scores[top])]
+        else:
+            top = np.argsort(-scores)
+        
+        return scores[top], top.astype(np.int64)
+    
+    async def _get_search_index(self, document_id: UUID, index: "faiss.Index") -> "faiss.Index":
+        """
+        Get the index to run a search on.
+        
+        With settings.use_gpu, large flat indices are copied to GPU 0 once and
+        the copy is cached; everything else is searched on the CPU.
+        
+        Args:
+            document_id: Document ID
+            index: The loaded CPU index
             
-            logger.info(f"Updated FAISS index for document {document_id} with {len(embeddings)} new vectors")
+        Returns:
+            A cached GPU copy of the index, or the index itself
+        """
+        if (
+            not settings.use_gpu
+            or index.ntotal < settings.gpu_min_vectors
+            or not isinstance(index, faiss.IndexFlat)
+            or not _faiss_gpu_available()
+        ):
+            return index
+        
+        key = str(document_id)
+        if key in _gpu_indexes:
+            _gpu_indexes.move_to_end(key)
+            return _gpu_indexes[key]
+        
+        gpu_index = await asyncio.to_thread(_copy_index_to_gpu, index)
+        _gpu_indexes[key] = gpu_index
+        while len(_gpu_indexes) > settings.gpu_index_cache_size:
+            _gpu_indexes.popitem(last=False)
+        
+        return gpu_index
+    
+    async def update_index(self, document_id: UUID, embeddings: np.ndarray, metadata: List[Dict[str, Any]]) -> None:
+        """
+        Update an existing FAISS index with new embeddings.
+        
+        Args:
+            document_id: Document ID
+            embeddings: New embeddings to add
+            metadata: Metadata for new embeddings
+        """
+        try:
+            async with _write_lock(document_id):
+                # Load a writable copy of the existing index and metadata
+                index, existing_metadata = await self._load_index(document_id, writable=True)
+                
+                if index is None:
+                    # Create new index if it doesn't exist
+                    await self._create_index(document_id, embeddings, metadata)
+                    return
+                
+                def add_and_save() -> None:
+                    # Normalize new embeddings (zero vectors stay zero instead of turning into NaN)
+                    normalized_embeddings = self._normalize(embeddings)
+                    
+                    # Add new embeddings to index
+                    start = index.ntotal
+                    index.add(normalized_embeddings)
+                    
+                    # Save updated index and metadata; new metadata rows are appended to
+                    # the delta log instead of rewriting the base file, until the log
+                    # outgrows the base and is compacted into it
+                    delta_path = self._get_metadata_delta_path(document_id)
+                    base_path = self._get_metadata_path(document_id)
+                    delta_size = os.path.getsize(delta_path) if os.path.exists(delta_path) else 0
+                    if os.path.exists(base_path) and delta_size <= os.path.getsize(base_path):
+                        # Rows are written before the index, so rows past index.ntotal
+                        # left by an interrupted update are ignored on load
+                        _append_metadata_delta(delta_path, document_id, start, metadata)
+                        _replace_file(self._get_index_path(document_id), lambda path: faiss.write_index(index, path))
+                    else:
+                        self._save_index_files(document_id, index, existing_metadata + metadata)
+                    
+                    # Keep the binary shortlist index in sync
+                    if self._use_binary_index(index):
+                        binary_index = self._load_binary_index(document_id)
+                        if binary_index is not None:
+                            binary_index.add(self._binarize(normalized_embeddings))
+                            _replace_file(
+                                self._get_binary_index_path(document_id),
+                                lambda path: faiss.write_index_binary(binary_index, path)
+                            )
+                        else:
+                            self._write_binary_index(document_id, index.reconstruct_n(0, index.ntotal))
+                
+                await asyncio.to_thread(add_and_save)
+                _evict_open_index(document_id)
+                
+                logger.info(f"Updated FAISS index for document {document_id} with {len(embeddings)} new vectors")
             
         except Exception as e:
             logger.error(f"Error updating FAISS index: {e}")
@@ -200,18 +594,34 @@ class FAISSVectorStore:
             document_id: Document ID to delete index for
         """
         try:
-            index_path = self._get_index_path(document_id)
-            metadata_path = self._get_metadata_path(document_id)
-            
-            # Delete index file
-            if os.path.exists(index_path):
-                os.remove(index_path)
-                logger.info(f"Deleted FAISS index file for document {document_id}")
-            
-            # Delete metadata file
-            if os.path.exists(metadata_path):
-                os.remove(metadata_path)
-                logger.info(f"Deleted metadata file for document {document_id}")
+            async with _write_lock(document_id):
+                _evict_open_index(document_id)
+                index_path = self._get_index_path(document_id)
+                
+                # Delete index file
+                if os.path.exists(index_path):
+                    os.remove(index_path)
+                    logger.info(f"Deleted FAISS index file for document {document_id}")
+                
+                # Delete metadata files, in either format
+                for metadata_path in (
+                    self._get_metadata_path(document_id),
+                    self._get_metadata_delta_path(document_id),
+                    self._get_legacy_metadata_path(document_id)
+                ):
+                    if os.path.exists(metadata_path):
+                        os.remove(metadata_path)
+                        logger.info(f"Deleted metadata file for document {document_id}")
+                
+                # Delete binary shortlist index
+                binary_index_path = self._get_binary_index_path(document_id)
+                if os.path.exists(binary_index_path):
+                    os.remove(binary_index_path)
+                    logger.info(f"Deleted binary index file for document {document_id}")
+                
+                # Delete vectors from the shared corpus index
+                if settings.shared_corpus_index:
+                    await self.remove_document(document_id)
             
         except Exception as e:
             logger.error(f"Error deleting FAISS index: {e}")
@@ -229,9 +639,22 @@ class FAISSVectorStore:
         """
         try:
             index_path = self._get_index_path(document_id)
-            metadata_path = self._get_metadata_path(document_id)
+            metadata_path = self._find_metadata_path(document_id)
+            if os.path.exists(index_path) and metadata_path is not None:
+                return True
             
-            return os.path.exists(index_path) and os.path.exists(metadata_path)
+            # Documents indexed only into the shared corpus own a range of its IDs
+            if settings.shared_corpus_index:
+                lo, hi = self._corpus_id_range(document_id)
+                
+                def in_corpus() -> bool:
+                    with self._corpus_transaction():
+                        self._get_corpus_index()
+                        return any(lo <= vector_id < hi for vector_id in _corpus['metadata'])
+                
+                return await asyncio.to_thread(in_corpus)
+            
+            return False
             
         except Exception as e:
             logger.error(f"Error checking index existence: {e}")
@@ -253,14 +676,16 @@ class FAISSVectorStore:
             if index is None:
                 return {'error': 'Index not found'}
             
+            metadata_path = self._find_metadata_path(document_id)
             stats = {
                 'document_id': str(document_id),
                 'total_vectors': index.ntotal,
                 'embedding_dimension': index.d,
                 'index_type': type(index).__name__,
+                'code_size_bytes': self._code_size(index),
                 'metadata_count': len(metadata),
                 'index_size_bytes': os.path.getsize(self._get_index_path(document_id)) if os.path.exists(self._get_index_path(document_id)) else 0,
-                'metadata_size_bytes': os.path.getsize(self._get_metadata_path(document_id)) if os.path.exists(self._get_metadata_path(document_id)) else 0
+                'metadata_size_bytes': os.path.getsize(metadata_path) if metadata_path else 0
             }
             
             return stats
@@ -314,19 +739,16 @@ class FAISSVectorStore:
             results = {}
             
             # Search each document concurrently
-            tasks = []
-            for doc_id in document_ids:
-                task = self.search(doc_id, query_embedding, k, threshold)
-                tasks.append((doc_id, task))
-            
-            # Wait for all searches to complete
-            for doc_id, task in tasks:
-                try:
-                    search_results = await task
-                    results[doc_id] = search_results
-                except Exception as e:
-                    logger.error(f"Error searching document {doc_id}: {e}")
-                    results[doc_id] = []
+            searches = await asyncio.gather(
+                *(self.search(doc_id, query_embedding, k, threshold) for doc_id in document_ids),
+                return_exceptions=True
+            )
+            
+            for doc_id, search_results in zip(document_ids, searches):
+                if isinstance(search_results, Exception):
+                    logger.error(f"Error searching document {doc_id}: {search_results}")
+                    search_results = []
+                results[doc_id] = search_results
             
             return results
             
@@ -334,54 +756,636 @@ class FAISSVectorStore:
             logger.error(f"Error in batch search: {e}")
             raise VectorStoreError(f"Failed to perform batch search: {str(e)}")
     
+    async def multi_query_search(
+        self,
+        document_id: UUID,
+        query_embeddings: np.ndarray,
+        k: int = 5,
+        threshold: float = 0.0
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search one document index with several queries in a single Faiss call.
+        
+        Faiss batches the stacked queries into one matrix multiply instead of
+        one matrix-vector product per query.
+        
+        Args:
+            document_id: Document ID to search in
+            query_embeddings: Query embeddings of shape (nq, d)
+            k: Number of results per query
+            threshold: Minimum similarity threshold
+            
+        Returns:
+            One list of search results per query, in query order
+        """
+        try:
+            index, metadata = await self._load_index(document_id)
+            queries = self._normalize(np.atleast_2d(query_embeddings))
+            
+            if index is None:
+                logger.warning(f"No index found for document {document_id}")
+                return [[] for _ in range(len(queries))]
+            
+            # All queries go to the index in one call: one GEMM instead of many GEMVs
+            search_index = await self._get_search_index(document_id, index)
+            scores, indices = await asyncio.to_thread(_search_faiss, search_index, queries, min(k, index.ntotal))
+            
+            return [
+                self._collect_results(query_scores, query_indices, metadata, threshold)
+                for query_scores, query_indices in zip(scores, indices)
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error in multi-query search: {e}")
+            raise VectorStoreError(f"Failed to perform multi-query search: {str(e)}")
+    
+    @staticmethod
+    def _collect_results(
+        scores: np.ndarray,
+        indices: np.ndarray,
+        metadata: List[Dict[str, Any]],
+        threshold: float
+    ) -> List[Dict[str, Any]]:
+        """
+        Build search results from one row of ``index.search`` output.
+        
+        Args:
+            scores: Similarity scores for one query
+            indices: Row indices for one query
+            metadata: Metadata per indexed row
+            threshold: Minimum similarity threshold
+            
+        Returns:
+            List of search results with metadata and scores
+        """
+        # FAISS returns -1 for invalid indices; filter those and the threshold in one mask
+        mask = (indices != -1) & (scores >= threshold)
+        rows = [(metadata[idx], score) for idx, score in zip(indices[mask].tolist(), scores[mask].tolist())]
+        
+        return [
+            {
+                'chunk_id': row['chunk_id'],
+                'content': row.get('content'),
+                'page_number': row.get('page_number'),
+                'chunk_index': row.get('chunk_index'),
+                'relevance_score': score,
+                'metadata': row
+            }
+            for row, score in rows
+        ]
+    
+    def _build_index(self, num_vectors: int) -> "faiss.Index":
+        """
+        Create an empty inner-product index for a collection of the given size.
+        
+        With settings.vector_index == "hnsw", collections of at least
+        settings.hnsw_min_vectors get an HNSW graph (O(log N) search); smaller
+        ones stay flat, and those of at least settings.ivfpq_min_vectors use
+        OPQ + IVF + PQ (4*sqrt(N) lists, settings.pq_m-byte codes), which also
+        cuts memory 8-32x. Scalar quantization stores each component as fp16
+        (2x smaller than fp32) or int8 (4x smaller); flat collections can also
+        use 4-bit PQ fast-scan ("pq4fs", 16x smaller, scanned with SIMD table
+        lookups). Inputs are L2-normalized so IP stays cosine.
+        
+        Args:
+            num_vectors: Number of vectors the index will initially hold
+        """
+        quantizer_types = {
+            "fp16": faiss.ScalarQuantizer.QT_fp16,
+            "sq8": faiss.ScalarQuantizer.QT_8bit,
+        }
+        qtype = quantizer_types.get(settings.vector_quantization)
+        
+        if (
+            settings.vector_index == "hnsw"
+            and num_vectors >= settings.ivfpq_min_vectors
+            and self.embedding_dim % settings.pq_m == 0
+        ):
+            nlist = int(4 * math.sqrt(num_vectors))
+            return faiss.index_factory(
+                self.embedding_dim,
+                f"OPQ{settings.pq_m},IVF{nlist},PQ{settings.pq_m}",
+                faiss.METRIC_INNER_PRODUCT
+            )
+        
+        if settings.vector_index == "hnsw" and num_vectors >= settings.hnsw_min_vectors:
+            if qtype is not None:
+                index = faiss.IndexHNSWSQ(self.embedding_dim, qtype, settings.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            else:
+                index = faiss.IndexHNSWFlat(self.embedding_dim, settings.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = settings.hnsw_ef_construction
+            return index
+        
+        if qtype is not None:
+            return faiss.IndexScalarQuantizer(self.embedding_dim, qtype, faiss.METRIC_INNER_PRODUCT)
+        if settings.vector_quantization == "pq4fs" and self.embedding_dim % 2 == 0:
+            # Two dimensions per 4-bit sub-quantizer
+            return faiss.index_factory(
+                self.embedding_dim, f"PQ{self.embedding_dim // 2}x4fs", faiss.METRIC_INNER_PRODUCT
+            )
+        return faiss.IndexFlatIP(self.embedding_dim)  # Inner product for cosine similarity
+    
+    @staticmethod
+    def corpus_vector_id(document_id: UUID, chunk_index: int) -> int:
+        """
+        Build the shared-corpus vector ID for a chunk.
+        
+        The high 32 bits hold a 31-bit hash of the document ID and the low
+        32 bits the chunk index, so one document occupies a contiguous ID range.
+        """
+        return (FAISSVectorStore._corpus_document_key(document_id) << 32) | chunk_index
+    
+    @staticmethod
+    def _corpus_document_key(document_id: UUID) -> int:
+        """Get the 31-bit hash of a document ID used in corpus vector IDs."""
+        digest = hashlib.blake2b(str(document_id).encode(), digest_size=4).digest()
+        return int.from_bytes(digest, 'big') & 0x7FFFFFFF
+    
+    def _corpus_id_range(self, document_id: UUID) -> Tuple[int, int]:
+        """Get the [lo, hi) corpus ID range owned by a document."""
+        key = self._corpus_document_key(document_id)
+        return key << 32, (key + 1) << 32
+    
+    @contextmanager
+    def _corpus_transaction(self) -> Iterator[None]:
+        """
+        Hold the shared corpus index for one read-modify-write (blocking).
+        
+        The process-wide lock serializes threads of every store instance, and
+        an exclusive lock on a file beside the index serializes processes, so
+        each transaction starts from the latest saved corpus.
+        """
+        with _corpus_lock:
+            if fcntl is None:
+                yield
+                return
+            
+            fd = os.open(self._get_corpus_lock_path(), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)
+    
+    def _get_corpus_index(self) -> "faiss.IndexIDMap2":
+        """
+        Get the shared corpus index, re-reading it if the file on disk changed
+        since this process last read or wrote it; the caller holds a corpus transaction.
+        """
+        index_path = self._get_corpus_index_path()
+        signature = _file_signature(index_path)
+        if _corpus.get('path') == index_path and _corpus.get('signature') == signature:
+            return _corpus['index']
+        
+        metadata_path = self._get_corpus_metadata_path()
+        legacy_metadata_path = self._get_legacy_corpus_metadata_path()
+        
+        index = None
+        corpus_metadata: Dict[int, Dict[str, Any]] = {}
+        embedding_model = None
+        if signature is not None and os.path.exists(metadata_path):
+            index = faiss.read_index(index_path)
+            with open(metadata_path, 'rb') as f:
+                stored = orjson.loads(f.read())
+            # Files written before the model was recorded hold only the vectors
+            if 'vectors' in stored and 'embedding_model' in stored:
+                embedding_model, stored = stored['embedding_model'], stored['vectors']
+            # JSON object keys are strings; vector IDs are int64
+            corpus_metadata = {int(vector_id): meta for vector_id, meta in stored.items()}
+        elif signature is not None and os.path.exists(legacy_metadata_path):
+            index = faiss.read_index(index_path)
+            with open(legacy_metadata_path, 'rb') as f:
+                corpus_metadata = pickle.load(f)
+        
+        if index is not None and not self.embedding_service.is_compatible_identifier(embedding_model):
+            # Vectors from another embedding model cannot be searched with this
+            # one's queries; documents are re-added as they are reprocessed
+            logger.warning(
+                f"Discarding shared corpus index built with embeddings '{embedding_model or 'unknown'}', "
+                f"not '{self.embedding_service.get_model_identifier()}'"
+            )
+            index = None
+        
+        if index is None:
+            # Flat storage: IDMap2 removal is not supported over HNSW
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.embedding_dim))
+            corpus_metadata = {}
+        
+        _corpus.update(path=index_path, signature=signature, index=index, metadata=corpus_metadata)
+        return index
+    
+    def _save_corpus_index(self) -> None:
+        """Persist the shared corpus index and its metadata; the caller holds a corpus transaction."""
+        # Metadata first: other processes reload when the index file changes
+        _replace_file(
+            self._get_corpus_metadata_path(),
+            lambda path: _write_bytes(
+                orjson.dumps(
+                    {'embedding_model': self.embedding_service.get_model_identifier(), 'vectors': _corpus['metadata']},
+                    option=orjson.OPT_NON_STR_KEYS
+                ),
+                path
+            )
+        )
+        index_path = self._get_corpus_index_path()
+        _replace_file(index_path, lambda path: faiss.write_index(_corpus['index'], path))
+        _corpus['signature'] = _file_signature(index_path)
+        
+        legacy_path = self._get_legacy_corpus_metadata_path()
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+    
+    async def add_vectors(self, ids: np.ndarray, vectors: np.ndarray, metadatas: List[Dict[str, Any]]) -> None:
+        """
+        Add vectors to the shared corpus index.
+        
+        Args:
+            ids: int64 vector IDs, see corpus_vector_id
+            vectors: Array of embeddings
+            metadatas: Metadata for each vector
+        """
+        try:
+            if vectors.shape[1] != self.embedding_dim:
+                raise VectorStoreError(f"Embedding dimension mismatch: expected {self.embedding_dim}, got {vectors.shape[1]}")
+            
+            ids = np.ascontiguousarray(ids, dtype=np.int64)
+            normalized_vectors = self._normalize(vectors)
+            
+            def add_and_save() -> int:
+                with self._corpus_transaction():
+                    index = self._get_corpus_index()
+                    index.add_with_ids(normalized_vectors, ids)
+                    _corpus['metadata'].update(zip(ids.tolist(), metadatas))
+                    self._save_corpus_index()
+                    return index.ntotal
+            
+            # Reading, writing and replacing the index files block; keep them off the event loop
+            total = await asyncio.to_thread(add_and_save)
+            
+            logger.info(f"Added {len(ids)} vectors to shared corpus index ({total} total)")
+            
+        except Exception as e:
+            logger.error(f"Error adding vectors to corpus index: {e}")
+            raise VectorStoreError(f"Failed to add vectors to corpus index: {str(e)}")
+    
+    async def remove_document(self, document_id: UUID) -> None:
+        """
+        Remove all of a document's vectors from the shared corpus index.
+        
+        Args:
+            document_id: Document ID whose vectors should be removed
+        """
+        try:
+            lo, hi = self._corpus_id_range(document_id)
+            
+            def remove_and_save() -> int:
+                with self._corpus_transaction():
+                    removed = self._get_corpus_index().remove_ids(faiss.IDSelectorRange(lo, hi))
+                    if removed:
+                        _corpus['metadata'] = {
+                            vector_id: meta for vector_id, meta in _corpus['metadata'].items()
+                            if not lo <= vector_id < hi
+                        }
+                        self._save_corpus_index()
+                    return removed
+            
+            removed = await asyncio.to_thread(remove_and_save)
+            
+            if removed:
+                logger.info(f"Removed {removed} vectors for document {document_id} from corpus index")
+            
+        except Exception as e:
+            logger.error(f"Error removing document from corpus index: {e}")
+            raise VectorStoreError(f"Failed to remove document from corpus index: {str(e)}")
+    
+    async def search_corpus(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        threshold: float = 0.0,
+        document_id: Optional[UUID] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the shared corpus index, optionally restricted to one document.
+        
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            threshold: Minimum similarity threshold
+            document_id: Only return chunks of this document when given
+            
+        Returns:
+            List of search results with metadata and scores
+        """
+        try:
+            query_norm = self._normalize(query_embedding.reshape(1, -1))
+            
+            params = None
+            if document_id is not None:
+                params = faiss.SearchParameters(sel=faiss.IDSelectorRange(*self._corpus_id_range(document_id)))
+            
+            def search() -> Tuple[np.ndarray, np.ndarray, Dict[int, Dict[str, Any]]]:
+                # The transaction keeps the index from changing under the search
+                with self._corpus_transaction():
+                    index = self._get_corpus_index()
+                    if index.ntotal == 0:
+                        return np.empty((1, 0), dtype=np.float32), np.empty((1, 0), dtype=np.int64), _corpus['metadata']
+                    scores, ids = index.search(query_norm, min(k, index.ntotal), params=params)
+                    return scores, ids, _corpus['metadata']
+            
+            scores, ids, corpus_metadata = await asyncio.to_thread(search)
+            
+            results = []
+            for score, vector_id in zip(scores[0], ids[0]):
+                if vector_id == -1:
+                    break
+                
+                meta = corpus_metadata[int(vector_id)]
+                if document_id is not None and meta.get('document_id') != str(document_id):
+                    continue  # Hash collision with another document
+                
+                if score >= threshold:
+                    results.append({
+                        'chunk_id': meta['chunk_id'],
+                        'content': meta.get('content'),
+                        'page_number': meta.get('page_number'),
+                        'chunk_index': meta.get('chunk_index'),
+                        'relevance_score': float(score),
+                        'metadata': meta
+                    })
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error searching corpus index: {e}")
+            raise VectorStoreError(f"Failed to search corpus index: {str(e)}")
+    
+    def _get_corpus_index_path(self) -> str:
+        """Get file path for the shared corpus index."""
+        return os.path.join(settings.vector_store_path, "faiss_corpus.index")
+    
+    def _get_corpus_metadata_path(self) -> str:
+        """Get file path for the shared corpus metadata."""
+        return os.path.join(settings.vector_store_path, "faiss_corpus_metadata.json")
+    
+    def _get_corpus_lock_path(self) -> str:
+        """Get file path for the lock serializing corpus writers across processes."""
+        return os.path.join(settings.vector_store_path, "faiss_corpus.lock")
+    
+    def _get_legacy_corpus_metadata_path(self) -> str:
+        """Get file path for pickled shared corpus metadata written by older versions."""
+        return os.path.join(settings.vector_store_path, "faiss_corpus_metadata.pkl")
+    
     def _get_index_path(self, document_id: UUID) -> str:
         """Get file path for document index."""
         return os.path.join(settings.vector_store_path, f"faiss_index_{document_id}.index")
     
     def _get_metadata_path(self, document_id: UUID) -> str:
         """Get file path for document metadata."""
+        return os.path.join(settings.vector_store_path, f"faiss_metadata_{document_id}.npz")
+    
+    def _get_metadata_delta_path(self, document_id: UUID) -> str:
+        """Get file path for metadata rows appended to the document since its metadata was last written in full."""
+        return os.path.join(settings.vector_store_path, f"faiss_metadata_{document_id}.delta.jsonl")
+    
+    def _get_legacy_metadata_path(self, document_id: UUID) -> str:
+        """Get file path for pickled document metadata written by older versions."""
         return os.path.join(settings.vector_store_path, f"faiss_metadata_{document_id}.pkl")
     
-    async def _load_index(self, document_id: UUID) -> Tuple[Optional[faiss.Index], List[Dict[str, Any]]]:
+    def _find_metadata_path(self, document_id: UUID) -> Optional[str]:
+        """Get the path of the document's metadata file in whichever format exists, or None."""
+        for path in (self._get_metadata_path(document_id), self._get_legacy_metadata_path(document_id)):
+            if os.path.exists(path):
+                return path
+        return None
+    
+    def _get_binary_index_path(self, document_id: UUID) -> str:
+        """Get file path for document binary shortlist index."""
+        return os.path.join(settings.vector_store_path, f"faiss_binary_{document_id}.index")
+    
+    def _use_binary_index(self, index: "faiss.Index") -> bool:
+        """
+        Check whether a collection is large enough for a binary shortlist stage.
+        
+        IVF-PQ and PQ fast-scan indexes only hold lossy codes to rerank from
+        (and IVF is already sublinear), so they never get one.
+        """
+        return (
+            index.ntotal > settings.binary_rerank_threshold
+            and self.embedding_dim % 8 == 0
+            and self._get_ivf(index) is None
+            and not isinstance(index, faiss.IndexPQFastScan)
+        )
+    
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        """
+        Return a contiguous float32 copy of embeddings with unit-length rows.
+        
+        Uses Faiss's in-place SIMD normalization on the copy; zero rows are
+        left as zeros.
+        """
+        normalized = np.array(embeddings, dtype=np.float32, order='C')
+        faiss.normalize_L2(normalized)
+        return normalized
+    
+    @staticmethod
+    def _code_size(index: "faiss.Index") -> Optional[int]:
+        """Bytes stored per vector, or None for index types that do not report it (e.g. HNSW)."""
+        try:
+            return int(index.sa_code_size())
+        except RuntimeError:
+            return None
+    
+    @staticmethod
+    def _get_ivf(index: "faiss.Index") -> Optional["faiss.IndexIVF"]:
+        """Get the IVF layer of an index (possibly wrapped in OPQ), or None."""
+        try:
+            return faiss.extract_index_ivf(index)
+        except RuntimeError:
+            return None
+    
+    @staticmethod
+    def _binarize(embeddings: np.ndarray) -> np.ndarray:
+        """Pack embeddings into 1-bit sign codes (d / 8 bytes per vector)."""
+        return np.packbits(embeddings > 0, axis=1)
+    
+    def _write_binary_index(self, document_id: UUID, normalized_embeddings: np.ndarray) -> None:
+        """Build and save the binary shortlist index for a document."""
+        binary_index = faiss.IndexBinaryFlat(self.embedding_dim)
+        binary_index.add(self._binarize(normalized_embeddings))
+        _replace_file(self._get_binary_index_path(document_id), lambda path: faiss.write_index_binary(binary_index, path))
+        logger.info(f"Created binary shortlist index for document {document_id} with {binary_index.ntotal} vectors")
+    
+    async def _get_binary_index(self, document_id: UUID) -> Optional["faiss.IndexBinary"]:
+        """Get a document's binary shortlist index, loading it off the event loop once."""
+        key = str(document_id)
+        if key not in _open_binary_indexes:
+            _open_binary_indexes[key] = await asyncio.to_thread(self._load_binary_index, document_id)
+        return _open_binary_indexes[key]
+    
+    def _load_binary_index(self, document_id: UUID) -> Optional["faiss.IndexBinary"]:
+        """Load the binary shortlist index for a document, if one was built."""
+        try:
+            binary_index_path = self._get_binary_index_path(document_id)
+            
+            if not os.path.exists(binary_index_path):
+                return None
+            
+            return faiss.read_index_binary(binary_index_path)
+            
+        except Exception as e:
+            logger.error(f"Error loading binary index: {e}")
+            return None
+    
+    def _binary_rerank_search(
+        self,
+        index: "faiss.Index",
+        binary_index: "faiss.IndexBinary",
+        query: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Shortlist candidates by hamming distance, then rerank them with fp32 inner product.
+        
+        Args:
+            index: Full-precision FAISS index
+            binary_index: Binary index holding sign codes of the same vectors
+            query: Normalized query of shape (1, d)
+            k: Number of results to return
+            
+        Returns:
+            Tuple of (scores, indices) shaped like ``index.search`` output
+        """
+        shortlist_size = min(max(settings.binary_shortlist_size, k), binary_index.ntotal)
+        _, shortlist = binary_index.search(self._binarize(query), shortlist_size)
+        shortlist = shortlist[0][shortlist[0] != -1]
+        
+        candidates = index.reconstruct_batch(shortlist)
+        candidate_scores = candidates @ query[0]
+        order = np.argsort(-candidate_scores)[:k]
+        
+        return candidate_scores[order].reshape(1, -1), shortlist[order].reshape(1, -1)
+    
+    async def _load_index(
+        self,
+        document_id: UUID,
+        writable: bool = False
+    ) -> Tuple[Optional[faiss.Index], List[Dict[str, Any]]]:
         """
         Load FAISS index and metadata for a document.
         
+        By default the index is opened read-only and memory-mapped, and kept
+        in a process-wide cache of open indices until it is rewritten.
+        
         Args:
             document_id: Document ID
+            writable: Load a private in-memory copy that can be modified
             
         Returns:
             Tuple of (index, metadata) or (None, []) if not found
         """
         try:
-            index_path = self._get_index_path(document_id)
-            metadata_path = self._get_metadata_path(document_id)
-            
-            if not os.path.exists(index_path) or not os.path.exists(metadata_path):
-                return None, []
+            key = str(document_id)
+            if writable:
+                return await asyncio.to_thread(self._read_index_files, document_id, True)
             
-            # Load index
-            index = faiss.read_index(index_path)
+            if key in _open_indexes:
+                _open_indexes.move_to_end(key)
+                return _open_indexes[key]
             
-            # Load metadata
-            with open(metadata_path, 'rb') as f:
-                metadata = pickle.load(f)
+            async with _load_lock(key):
+                # Another search may have loaded the index while this one waited
+                if key in _open_indexes:
+                    _open_indexes.move_to_end(key)
+                    return _open_indexes[key]
+                
+                index, metadata = await asyncio.to_thread(self._read_index_files, document_id, False)
+                if index is None:
+                    return None, []
+                
+                _open_indexes[key] = (index, metadata)
+                while len(_open_indexes) > settings.faiss_index_cache_size:
+                    evicted, _ = _open_indexes.popitem(last=False)
+                    _open_binary_indexes.pop(evicted, None)
+                    _gpu_indexes.pop(evicted, None)
+                    _small_matrices.pop(evicted, None)
             
             return index, metadata
             
+        except VectorIndexError:
+            # A stale index must not be mistaken for a missing one and overwritten piecemeal
+            raise
         except Exception as e:
             logger.error(f"Error loading FAISS index: {e}")
             return None, []
     
+    def _read_index_files(
+        self,
+        document_id: UUID,
+        writable: bool
+    ) -> Tuple[Optional["faiss.Index"], List[Dict[str, Any]]]:
+        """
+        Read a document's index, metadata and any appended metadata rows from
+        disk (blocking), or return (None, []) if the index does not exist.
+        """
+        index_path = self._get_index_path(document_id)
+        metadata_path = self._find_metadata_path(document_id)
+        
+        if not os.path.exists(index_path) or metadata_path is None:
+            return None, []
+        
+        # Memory-mapped, read-only indices share pages through the OS page cache
+        io_flags = 0 if writable else faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        index = faiss.read_index(index_path, io_flags)
+        if hasattr(index, 'hnsw'):
+            index.hnsw.efSearch = settings.hnsw_ef_search
+        ivf = self._get_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = settings.ivf_nprobe
+        
+        metadata = _read_metadata(metadata_path)
+        # Legacy pickled metadata does not record its model
+        self.embedding_service.ensure_compatible(getattr(metadata, 'embedding_model', None), document_id)
+        
+        delta_path = self._get_metadata_delta_path(document_id)
+        if os.path.exists(delta_path):
+            metadata = _apply_metadata_delta(metadata, delta_path, index.ntotal)
+        
+        return index, metadata
+    
+    def _save_index_files(self, document_id: UUID, index: "faiss.Index", metadata: List[Dict[str, Any]]) -> None:
+        """Write an index and its metadata to disk (blocking), replacing any previous files atomically."""
+        _replace_file(self._get_index_path(document_id), lambda path: faiss.write_index(index, path))
+        embedding_model = self.embedding_service.get_model_identifier()
+        _replace_file(
+            self._get_metadata_path(document_id),
+            lambda path: _write_metadata(metadata, path, embedding_model)
+        )
+        
+        # The full metadata now lives in the base file
+        for stale_path in (self._get_metadata_delta_path(document_id), self._get_legacy_metadata_path(document_id)):
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+    
     async def cleanup_all_indices(self) -> None:
         """Clean up all FAISS indices in the vector store directory."""
+        global _all_stats_cache
         try:
             vector_store_path = settings.vector_store_path
+            _open_indexes.clear()
+            _open_binary_indexes.clear()
+            _gpu_indexes.clear()
+            _small_matrices.clear()
+            _all_stats_cache = None
             
-            for filename in os.listdir(vector_store_path):
-                if filename.startswith('faiss_index_') or filename.startswith('faiss_metadata_'):
-                    file_path = os.path.join(vector_store_path, filename)
-                    os.remove(file_path)
-                    logger.info(f"Cleaned up file: {filename}")
+            with os.scandir(vector_store_path) as entries:
+                paths = [entry.path for entry in entries if entry.name.startswith(_INDEX_FILE_PREFIXES)]
+            
+            await asyncio.gather(*(asyncio.to_thread(os.unlink, path) for path in paths))
+            
+            for path in paths:
+                logger.info(f"Cleaned up file: {os.path.basename(path)}")
             
         except Exception as e:
             logger.error(f"Error cleaning up indices: {e}")
@@ -389,28 +1393,50 @@ class FAISSVectorStore:
     
     async def get_all_index_stats(self) -> Dict[str, Any]:
         """Get statistics for all indices."""
+        global _all_stats_cache
         try:
             vector_store_path = settings.vector_store_path
+            if _all_stats_cache is not None and time.monotonic() - _all_stats_cache[0] < _ALL_STATS_TTL:
+                return dict(_all_stats_cache[1])
             
-            total_indices = 0
-            total_size = 0
+            def scan() -> Tuple[int, int]:
+                # DirEntry.stat() reuses the directory read where the OS allows
+                indices, size = 0, 0
+                with os.scandir(vector_store_path) as entries:
+                    for entry in entries:
+                        if entry.name.startswith(_INDEX_FILE_PREFIXES):
+                            size += entry.stat().st_size
+                            if entry.name.startswith('faiss_index_'):
+                                indices += 1
+                return indices, size
             
-            for filename in os.listdir(vector_store_path):
-                if filename.startswith('faiss_index_') or filename.startswith('faiss_metadata_'):
-                    file_path = os.path.join(vector_store_path, filename)
-                    file_size = os.path.getsize(file_path)
-                    total_size += file_size
-                    
-                    if filename.startswith('faiss_index_'):
-                        total_indices += 1
+            total_indices, total_size = await asyncio.to_thread(scan)
             
-            return {
+            stats = {
                 'total_indices': total_indices,
                 'total_size_bytes': total_size,
                 'total_size_mb': round(total_size / (1024 * 1024), 2),
                 'vector_store_path': vector_store_path
             }
+            _all_stats_cache = (time.monotonic(), stats)
+            
+            return dict(stats)
             
         except Exception as e:
             logger.error(f"Error getting all index stats: {e}")
-            return {'error': str(e)}
\ No newline at end of file
+            return {'error': str(e)}
+
+
+def create_vector_store(embedding_service: EmbeddingService):
+    """
+    Create the vector store selected by settings.vector_index.
+    
+    "flat" and "hnsw" use FAISS when it is installed; anything else, or a
+    missing FAISS install, falls back to the NumPy-based SimpleVectorStore.
+    """
+    if settings.vector_index in ("flat", "hnsw") and FAISS_AVAILABLE:
+        logger.info(f"Using FAISS vector store ({settings.vector_index})")
+        return FAISSVectorStore(embedding_service)
+    
+    logger.info("Using simple vector store")
+    return SimpleVectorStore(embedding_service)
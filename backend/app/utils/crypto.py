@@ -2,13 +2,64 @@
 
 import os
 import base64
-from cryptography.fernet import Fernet
+import hashlib
+import hmac
+from typing import Optional
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from ..config.settings import get_settings
 
-# Global encryption key
+_KDF_SALT = b'engunity-ai-salt'  # In production, use a random salt
+_KDF_ITERATIONS = 100000
+
+# Global encryption key and cipher
 _encryption_key = None
+_fernet = None
+
+def _key_cache_path() -> str:
+    """Get the on-disk cache path for the derived key."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'engunity', 'enc.key')
+
+def _secret_fingerprint(secret_key: str) -> bytes:
+    """Identify the secret and KDF parameters a cached key was derived from.
+    
+    A fast hash of the secret would let anyone who sees it test guesses without
+    paying for PBKDF2, so it is only ever stored inside the private cache file,
+    next to the key itself.
+    """
+    return hashlib.sha256(secret_key.encode() + _KDF_SALT + str(_KDF_ITERATIONS).encode()).hexdigest().encode()
+
+def _read_cached_key(path: str, fingerprint: bytes) -> Optional[bytes]:
+    """Read a previously derived key, or None if it is missing, malformed or for another secret."""
+    try:
+        with open(path, 'rb') as f:
+            cached_fingerprint, _, key = f.read().partition(b'\n')
+        if not hmac.compare_digest(cached_fingerprint, fingerprint):
+            return None
+        return key if len(base64.urlsafe_b64decode(key)) == 32 else None
+    except (OSError, ValueError):
+        return None
+
+def _write_cached_key(path: str, fingerprint: bytes, key: bytes) -> None:
+    """Cache a derived key and its secret's fingerprint on disk, readable only by the current user."""
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(fingerprint + b'\n' + key)
+        os.replace(tmp_path, path)
+
+        # Drop keys cached by older versions under names hashed from the secret
+        cache_dir = os.path.dirname(path)
+        for name in os.listdir(cache_dir):
+            if name.startswith('enc-') and name.endswith('.key'):
+                os.remove(os.path.join(cache_dir, name))
+    except OSError:
+        # The cache is only an optimization; derive again next time
+        pass
 
 def get_encryption_key() -> bytes:
     """Get or generate the encryption key."""
@@ -20,29 +71,44 @@ def get_encryption_key() -> bytes:
         # Use SECRET_KEY from settings or generate one
         secret_key = getattr(settings, 'SECRET_KEY', 'default-secret-key-change-in-production')
         
-        # Derive a key from the secret
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=b'engunity-ai-salt',  # In production, use a random salt
-            iterations=100000,
-        )
+        # Reuse the key derived by an earlier worker for the same secret
+        cache_path = _key_cache_path()
+        fingerprint = _secret_fingerprint(secret_key)
+        key = _read_cached_key(cache_path, fingerprint)
+        
+        if key is None:
+            # Derive a key from the secret
+            kdf = PBKDF2HMAC(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=_KDF_SALT,
+                iterations=_KDF_ITERATIONS,
+            )
+            
+            key = base64.urlsafe_b64encode(kdf.derive(secret_key.encode()))
+            _write_cached_key(cache_path, fingerprint, key)
         
-        key = base64.urlsafe_b64encode(kdf.derive(secret_key.encode()))
         _encryption_key = key
     
     return _encryption_key
 
+def get_fernet() -> Fernet:
+    """Get the shared Fernet cipher for the encryption key."""
+    global _fernet
+    
+    if _fernet is None:
+        _fernet = Fernet(get_encryption_key())
+    
+    return _fernet
+
 def encrypt_text(text: str) -> str:
     """Encrypt a text string."""
     if not text:
         return text
     
     try:
-        key = get_encryption_key()
-        f = Fernet(key)
-        encrypted = f.encrypt(text.encode())
-        return base64.urlsafe_b64encode(encrypted).decode()
+        # Fernet tokens are already URL-safe base64
+        return get_fernet().encrypt(text.encode()).decode('ascii')
     except Exception as e:
         # If encryption fails, return original text (not recommended for production)
         return text
@@ -53,10 +119,12 @@ def decrypt_text(encrypted_text: str) -> str:
         return encrypted_text
     
     try:
-        key = get_encryption_key()
-        f = Fernet(key)
-        encrypted_bytes = base64.urlsafe_b64decode(encrypted_text.encode())
-        decrypted = f.decrypt(encrypted_bytes)
+        token = encrypted_text.encode('ascii')
+        try:
+            decrypted = get_fernet().decrypt(token)
+        except InvalidToken:
+            # Values written by older versions wrap the token in a second base64 layer
+            decrypted = get_fernet().decrypt(base64.urlsafe_b64decode(token))
         return decrypted.decode()
     except Exception as e:
         # If decryption fails, return original text (assume it's not encrypted)
@@ -64,7 +132,6 @@ def decrypt_text(encrypted_text: str) -> str:
 
 def hash_text(text: str) -> str:
     """Hash a text string using SHA256."""
-    import hashlib
     return hashlib.sha256(text.encode()).hexdigest()
 
 def verify_hash(text: str, hash_value: str) -> bool:
@@ -4,26 +4,82 @@ Test script for Document Q&A system
 """
 
 import asyncio
+import hashlib
 import os
 import sys
 import tempfile
 from pathlib import Path
 
+import numpy as np
+
 # Add the backend directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from app.services.chunk_metadata import ChunkMetadata
+from app.services.embedding_cache import EmbeddingCache
 from app.services.embedding_service import EmbeddingService
 from app.services.vector_store import FAISSVectorStore
 from app.services.groq_service import get_groq_service
 from app.config.settings import settings
 
-async def test_embedding_service():
+SYSTEM_PROMPT_TEMPLATE = """You are an expert document analyst. Your task is to answer questions based strictly on the provided context.
+
+IMPORTANT GUIDELINES:
+1. ONLY use information from the provided context
+2. If the context doesn't contain relevant information, say so clearly
+3. Be precise and concise in your answers
+4. Include specific references when possible (e.g., "According to Context 1...")
+5. If you're uncertain, express that uncertainty
+6. Do not make up information not found in the context
+
+CONTEXT FROM DOCUMENT:
+{context}
+
+Please answer the following question based ONLY on the context provided above."""
+
+# Embeddings persisted across runs; set QA_TEST_NO_EMBED_CACHE=1 to always run the model
+_embedding_cache = None
+
+async def embed_texts(embedding_service, texts, out=None):
+    """
+    Embed texts, reusing embeddings cached by earlier runs of this script.
+    Rows are written into ``out`` (float32, one row per text) when given.
+    """
+    global _embedding_cache
+    if os.environ.get("QA_TEST_NO_EMBED_CACHE"):
+        return await embedding_service.generate_embeddings_into(texts, out)
+    
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(os.path.join(tempfile.gettempdir(), "engunity_test_embeddings.db"))
+    
+    model = embedding_service.get_model_identifier()
+    dim = embedding_service.get_embedding_dimension()
+    hashes = [hashlib.sha256(text.encode()).digest() for text in texts]
+    cached = _embedding_cache.lookup(hashes, model, dim)
+    
+    missing = [i for i, content_hash in enumerate(hashes) if content_hash not in cached]
+    if missing:
+        fresh = await embedding_service.generate_embeddings([texts[i] for i in missing])
+        _embedding_cache.store([hashes[i] for i in missing], model, fresh)
+        cached.update(zip((hashes[i] for i in missing), fresh))
+    
+    if out is None:
+        out = np.empty((len(texts), dim), dtype=np.float32)
+    for row, content_hash in enumerate(hashes):
+        out[row] = cached[content_hash]
+    
+    return out
+
+def compute_chunk_offsets(n_words, chunk_size):
+    """(start, end) word offsets of consecutive fixed-size chunks, as an (n_chunks, 2) array"""
+    starts = np.arange(0, n_words, chunk_size, dtype=np.int64)
+    return np.stack([starts, np.minimum(starts + chunk_size, n_words)], axis=1)
+
+async def test_embedding_service(embedding_service, vector_store):
     """Test the embedding service"""
     print("🧪 Testing Embedding Service...")
     
     try:
-        embedding_service = EmbeddingService()
-        
         # Test single embedding
         text = "This is a test document about artificial intelligence and machine learning."
         embedding = await embedding_service.generate_single_embedding(text)
@@ -50,14 +106,11 @@ async def test_embedding_service():
         print(f"❌ Embedding service test failed: {e}")
         return False
 
-async def test_vector_store():
+async def test_vector_store(embedding_service, vector_store):
     """Test the FAISS vector store"""
     print("\n🧪 Testing FAISS Vector Store...")
     
     try:
-        embedding_service = EmbeddingService()
-        vector_store = FAISSVectorStore(embedding_service)
-        
         # Test data
         texts = [
             "Machine learning algorithms learn patterns from data.",
@@ -67,7 +120,7 @@ async def test_vector_store():
         ]
         
         # Generate embeddings
-        embeddings = await embedding_service.generate_embeddings(texts)
+        embeddings = await embed_texts(embedding_service, texts)
         
         # Create metadata
         metadata = [
@@ -81,39 +134,108 @@ async def test_vector_store():
             for i, text in enumerate(texts)
         ]
         
-        # Create test document ID
+        # SIMD kernels the loaded Faiss build was compiled with (SQ8 scans need AVX2 or NEON)
+        import faiss
+        print(f"✅ Faiss compile options: {faiss.get_compile_options()}")
+        
         from uuid import uuid4
-        doc_id = uuid4()
+        query = "What is machine learning?"
+        query_embedding = (await embed_texts(embedding_service, [query]))[0]
         
-        # Create index
-        await vector_store.create_index(doc_id, embeddings, metadata)
-        print(f"✅ FAISS index created for document {doc_id}")
+        # Full-precision flat index, then int8 scalar quantization (4x smaller codes)
+        previous_quantization = settings.vector_quantization
+        try:
+            for quantization in ("none", "sq8"):
+                settings.vector_quantization = quantization
+                doc_id = uuid4()
+                
+                # Create index
+                await vector_store.create_index(doc_id, embeddings, metadata)
+                print(f"✅ FAISS index ({quantization}) created for document {doc_id}")
+                
+                # Test search
+                results = await vector_store.search(doc_id, query_embedding, k=2)
+                print(f"✅ Search results: {len(results)} results found")
+                
+                for i, result in enumerate(results):
+                    print(f"   Result {i+1}: score={result['relevance_score']:.3f}, content='{result['content'][:50]}...'")
+                
+                # Batched (nq, d) search; runs on the GPU copy of the index when enabled in main()
+                batched = await vector_store.multi_query_search(doc_id, embeddings, k=1)
+                print(f"✅ Batched search: {len(batched)} queries answered")
+                
+                # Test index stats
+                stats = await vector_store.get_index_stats(doc_id)
+                print(f"✅ Index stats: {stats}")
+                
+                # Clean up
+                await vector_store.delete_index(doc_id)
+                print(f"✅ Index deleted")
+        finally:
+            settings.vector_quantization = previous_quantization
         
-        # Test search
-        query = "What is machine learning?"
-        query_embedding = await embedding_service.generate_single_embedding(query)
+        return True
         
-        results = await vector_store.search(doc_id, query_embedding, k=2)
-        print(f"✅ Search results: {len(results)} results found")
+    except Exception as e:
+        print(f"❌ Vector store test failed: {e}")
+        return False
+
+async def test_vector_store_at_scale(embedding_service, vector_store):
+    """Test the FAISS vector store on a collection large enough for OPQ + IVF + PQ"""
+    print("\n🧪 Testing FAISS Vector Store at scale (OPQ + IVF + PQ)...")
+    
+    from uuid import uuid4
+    
+    # Route a 10k-vector collection to the compressed index path
+    overrides = {"vector_index": "hnsw", "ivfpq_min_vectors": 10_000, "pq_m": 32, "ivf_nprobe": 16}
+    previous = {name: getattr(settings, name) for name in overrides}
+    
+    try:
+        for name, value in overrides.items():
+            setattr(settings, name, value)
+        
+        dim = vector_store.embedding_dim
+        if dim % settings.pq_m != 0:
+            print(f"⚠️  Skipping: embedding dimension {dim} is not divisible by pq_m={settings.pq_m}")
+            return True
+        
+        # Synthetic clustered embeddings, so PQ training sees realistic structure
+        rng = np.random.default_rng(0)
+        centroids = rng.standard_normal((64, dim)).astype(np.float32)
+        embeddings = centroids[rng.integers(0, 64, 10_000)] + 0.1 * rng.standard_normal((10_000, dim)).astype(np.float32)
+        metadata = [
+            {"chunk_id": f"chunk_{i}", "content": f"synthetic chunk {i}", "page_number": 1, "chunk_index": i}
+            for i in range(len(embeddings))
+        ]
         
-        for i, result in enumerate(results):
-            print(f"   Result {i+1}: score={result['relevance_score']:.3f}, content='{result['content'][:50]}...'")
+        doc_id = uuid4()
+        await vector_store.create_index(doc_id, embeddings, metadata)
         
-        # Test index stats
         stats = await vector_store.get_index_stats(doc_id)
-        print(f"✅ Index stats: {stats}")
+        print(f"✅ Index built: type={stats['index_type']}, code_size_bytes={stats['code_size_bytes']}")
+        
+        # Each sampled vector should find itself among its nearest neighbours
+        sample = rng.choice(len(embeddings), 20, replace=False)
+        hits = 0
+        for row in sample:
+            results = await vector_store.search(doc_id, embeddings[row], k=10)
+            hits += any(result['chunk_index'] == row for result in results)
+        print(f"✅ Self-recall@10 over {len(sample)} queries: {hits / len(sample):.2f}")
         
-        # Clean up
         await vector_store.delete_index(doc_id)
         print(f"✅ Index deleted")
         
-        return True
+        return hits > 0
         
     except Exception as e:
-        print(f"❌ Vector store test failed: {e}")
+        print(f"❌ Vector store scale test failed: {e}")
         return False
+    
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
 
-async def test_groq_service():
+async def test_groq_service(embedding_service, vector_store):
     """Test the Groq service"""
     print("\n🧪 Testing Groq Service...")
     
@@ -145,14 +267,11 @@ async def test_groq_service():
         print(f"❌ Groq service test failed: {e}")
         return False
 
-async def test_document_qa_flow():
+async def test_document_qa_flow(embedding_service, vector_store):
     """Test the complete document Q&A flow"""
     print("\n🧪 Testing Complete Document Q&A Flow...")
     
     try:
-        # Initialize services
-        embedding_service = EmbeddingService()
-        vector_store = FAISSVectorStore(embedding_service)
         groq_service = get_groq_service()
         
         # Sample document content
@@ -179,39 +298,50 @@ async def test_document_qa_flow():
         
         # Split into chunks (simple splitting)
         chunk_size = 200
-        chunks = []
         words = document_content.split()
+        offsets = compute_chunk_offsets(len(words), chunk_size)
         
-        for i in range(0, len(words), chunk_size):
-            chunk_text = ' '.join(words[i:i + chunk_size])
-            chunks.append({
-                "content": chunk_text,
-                "chunk_index": len(chunks),
-                "page_number": 1
-            })
+        texts = [' '.join(words[start:end]) for start, end in offsets.tolist()]
         
-        print(f"✅ Document split into {len(chunks)} chunks")
+        print(f"✅ Document split into {len(texts)} chunks")
         
-        # Generate embeddings
-        texts = [chunk["content"] for chunk in chunks]
-        embeddings = await embedding_service.generate_embeddings(texts)
+        # Generate embeddings straight into one contiguous float32 buffer
+        embeddings = np.empty((len(texts), embedding_service.get_embedding_dimension()), dtype=np.float32)
         
-        # Create metadata
-        metadata = [
-            {
-                "chunk_id": f"chunk_{i}",
-                "content": chunk["content"],
-                "page_number": chunk["page_number"],
-                "chunk_index": chunk["chunk_index"],
-                "document_id": "test_ml_doc"
-            }
-            for i, chunk in enumerate(chunks)
-        ]
+        # Create metadata as parallel columns rather than one dict per chunk
+        metadata = ChunkMetadata(
+            document_id="test_ml_doc",
+            chunk_ids=[f"chunk_{i}" for i in range(len(texts))],
+            chunk_indices=np.arange(len(texts)),
+            page_numbers=np.ones(len(texts)),
+            token_counts=offsets[:, 1] - offsets[:, 0],
+            contents=texts
+        )
         
-        # Create vector index
+        # Pipeline embedding and indexing: batch k+1 is embedded while batch k
+        # is added to the index (None marks the end of the stream)
         from uuid import uuid4
         doc_id = uuid4()
-        await vector_store.create_index(doc_id, embeddings, metadata)
+        batch_size = 64
+        queue = asyncio.Queue(maxsize=2)
+        
+        async def produce():
+            for start in range(0, len(texts), batch_size):
+                end = min(start + batch_size, len(texts))
+                await embed_texts(embedding_service, texts[start:end], out=embeddings[start:end])
+                await queue.put((start, end))
+            await queue.put(None)
+        
+        async def consume():
+            while (batch := await queue.get()) is not None:
+                start, end = batch
+                rows = ChunkMetadata.from_rows([metadata[i] for i in range(start, end)])
+                if start == 0:
+                    await vector_store.create_index(doc_id, embeddings[start:end], rows)
+                else:
+                    await vector_store.update_index(doc_id, embeddings[start:end], rows)
+        
+        await asyncio.gather(produce(), consume())
         print(f"✅ Vector index created")
         
         # Test Q&A
@@ -222,53 +352,56 @@ async def test_document_qa_flow():
             "What is deep learning?"
         ]
         
-        for question in questions:
-            print(f"\n❓ Question: {question}")
+        # Embed all questions in one batch and search them in one index call
+        query_matrix = await embed_texts(embedding_service, questions)
+        results_per_question = await vector_store.multi_query_search(doc_id, query_matrix, k=3)
+        
+        # Build one prompt per question that has context
+        payloads = []
+        for question, search_results in zip(questions, results_per_question):
+            if not search_results:
+                payloads.append(None)
+                continue
             
-            # Get query embedding
-            query_embedding = await embedding_service.generate_single_embedding(question)
+            # Build context
+            context_chunks = [result['content'] for result in search_results]
+            context_text = "\n\n".join([
+                f"[Context {i+1}]\n{chunk}" 
+                for i, chunk in enumerate(context_chunks)
+            ])
             
-            # Search for relevant chunks
-            search_results = await vector_store.search(doc_id, query_embedding, k=3)
+            # Create prompt
+            system_prompt = SYSTEM_PROMPT_TEMPLATE.format(context=context_text)
             
-            if search_results:
-                # Build context
-                context_chunks = [result['content'] for result in search_results]
-                context_text = "\n\n".join([
-                    f"[Context {i+1}]\n{chunk}" 
-                    for i, chunk in enumerate(context_chunks)
-                ])
-                
-                # Create prompt
-                system_prompt = f"""You are an expert document analyst. Your task is to answer questions based strictly on the provided context.
-
-IMPORTANT GUIDELINES:
-1. ONLY use information from the provided context
-2. If the context doesn't contain relevant information, say so clearly
-3. Be precise and concise in your answers
-4. Include specific references when possible (e.g., "According to Context 1...")
-5. If you're uncertain, express that uncertainty
-6. Do not make up information not found in the context
-
-CONTEXT FROM DOCUMENT:
-{context_text}
-
-Please answer the following question based ONLY on the context provided above."""
-                
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"QUESTION: {question}"}
-                ]
-                
-                # Generate answer
-                response = await groq_service.create_chat_completion(
+            payloads.append([
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"QUESTION: {question}"}
+            ])
+        
+        # Generate all answers concurrently; the semaphore keeps within Groq rate limits
+        semaphore = asyncio.Semaphore(5)
+        
+        async def answer(messages):
+            if messages is None:
+                return None
+            async with semaphore:
+                return await groq_service.create_chat_completion(
                     messages=messages,
                     temperature=0.1,
                     max_tokens=200
                 )
-                
-                answer = response['choices'][0]['message']['content']
-                print(f"✅ Answer: {answer}")
+        
+        responses = await asyncio.gather(*(answer(messages) for messages in payloads), return_exceptions=True)
+        
+        for question, search_results, response in zip(questions, results_per_question, responses):
+            print(f"\n❓ Question: {question}")
+            
+            if isinstance(response, Exception):
+                raise response
+            
+            if search_results:
+                answer_text = response['choices'][0]['message']['content']
+                print(f"✅ Answer: {answer_text}")
                 
                 # Show source information
                 print(f"📊 Sources: {len(search_results)} chunks used")
@@ -293,10 +426,23 @@ async def main():
     """Run all tests"""
     print("🚀 Starting Document Q&A System Tests\n")
     
+    # Shared by every test, so the embedding model is loaded once per run
+    # (get_groq_service already returns a process-wide client)
+    embedding_service = EmbeddingService()
+    vector_store = FAISSVectorStore(embedding_service)
+    
+    # Search flat indices of any size on the GPU when one is available
+    import faiss
+    if hasattr(faiss, "get_num_gpus") and faiss.get_num_gpus() > 0:
+        settings.use_gpu = True
+        settings.gpu_min_vectors = 0
+        print(f"✅ FAISS GPU search enabled ({faiss.get_num_gpus()} device(s))")
+    
     # Test individual components
     tests = [
         ("Embedding Service", test_embedding_service),
         ("Vector Store", test_vector_store),
+        ("Vector Store at Scale", test_vector_store_at_scale),
         ("Groq Service", test_groq_service),
         ("Complete Q&A Flow", test_document_qa_flow)
     ]
@@ -304,7 +450,7 @@ async def main():
     results = {}
     for test_name, test_func in tests:
         try:
-            result = await test_func()
+            result = await test_func(embedding_service, vector_store)
             results[test_name] = result
         except Exception as e:
             print(f"❌ {test_name} test crashed: {e}")
@@ -316,9 +462,10 @@ async def main():
     print("="*50)
     
     total_tests = len(results)
-    passed_tests = sum(1 for result in results.values() if result)
+    passed_tests = 0
     
     for test_name, result in results.items():
+        passed_tests += bool(result)
         status = "✅ PASSED" if result else "❌ FAILED"
         print(f"{test_name}: {status}")
     
@@ -335,6 +482,13 @@ if __name__ == "__main__":
     # Set up environment
     os.environ.setdefault("GROQ_API_KEY", "")  # Will use fallback keys
     
+    # uvloop's libuv event loop when installed, the default loop otherwise
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     # Run tests
     success = asyncio.run(main())
     sys.exit(0 if success else 1)
\ No newline at end of file
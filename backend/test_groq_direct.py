@@ -4,13 +4,14 @@
 import asyncio
 import sys
 import os
+import time
 from pathlib import Path
 
 # Add the backend directory to the path
 backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
-from app.services.groq_service import create_groq_completion
+from app.services.groq_service import HTTP2_AVAILABLE, create_groq_completion, create_groq_stream
 
 async def test_groq():
     """Test Groq service directly."""
@@ -34,10 +35,31 @@ async def test_groq():
             content = response["choices"][0]["message"]["content"]
             print(f"\nAI Response: {content}")
         
+        # Streamed over the same pooled connection, so no new TLS handshake
+        print(f"\nStreaming (HTTP/2: {HTTP2_AVAILABLE})...")
+        start = time.perf_counter()
+        first_token = None
+        parts = []
+        async for chunk in create_groq_stream(messages=messages, temperature=0.7, max_tokens=100):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            parts.append(chunk["choices"][0]["delta"]["content"])
+        
+        if first_token is not None:
+            print(f"First token after {first_token * 1000:.0f}ms")
+        print(f"Streamed Response: {''.join(parts)}")
+        
     except Exception as e:
         print(f"Error: {e}")
         import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
+    # uvloop's libuv event loop when installed, the default loop otherwise
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     asyncio.run(test_groq())
\ No newline at end of file
@@ -4,8 +4,10 @@ Test script to verify S3/Supabase bucket connectivity.
 """
 
 import asyncio
+import hashlib
 import io
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 
 # Test configuration (using your provided credentials)
@@ -18,38 +20,49 @@ S3_ENDPOINT_URL = "https://ckrtquhwlvpmpgrfemmb.supabase.co/storage/v1/s3"
 async def test_s3_connection():
     """Test S3 connection and basic operations."""
     try:
-        # Initialize S3 client
-        s3_client = boto3.client(
+        # Initialize S3 client; one pooled, keep-alive connection serves every check
+        session = boto3.session.Session()
+        s3_client = session.client(
             's3',
             aws_access_key_id=S3_ACCESS_KEY_ID,
             aws_secret_access_key=S3_SECRET_ACCESS_KEY,
             endpoint_url=S3_ENDPOINT_URL,
-            region_name=S3_REGION
+            region_name=S3_REGION,
+            config=Config(
+                max_pool_connections=32,
+                tcp_keepalive=True,
+                retries={'max_attempts': 3, 'mode': 'adaptive'}
+            )
         )
         
         print("🔍 Testing S3 connection...")
         
+        # Tests 1 and 2 are independent: list buckets and check the documents
+        # bucket concurrently (boto3 clients are thread-safe)
+        list_result, head_result = await asyncio.gather(
+            asyncio.to_thread(s3_client.list_buckets),
+            asyncio.to_thread(s3_client.head_bucket, Bucket=S3_BUCKET_NAME),
+            return_exceptions=True
+        )
+        
         # Test 1: List buckets
-        try:
-            response = s3_client.list_buckets()
-            print(f"✅ Successfully connected to S3")
-            print(f"📦 Available buckets: {[bucket['Name'] for bucket in response['Buckets']]}")
-        except Exception as e:
-            print(f"❌ Failed to list buckets: {e}")
+        if isinstance(list_result, Exception):
+            print(f"❌ Failed to list buckets: {list_result}")
             return False
+        print(f"✅ Successfully connected to S3")
+        print(f"📦 Available buckets: {[bucket['Name'] for bucket in list_result['Buckets']]}")
         
         # Test 2: Check if documents bucket exists
-        try:
-            s3_client.head_bucket(Bucket=S3_BUCKET_NAME)
-            print(f"✅ Documents bucket '{S3_BUCKET_NAME}' exists")
-        except ClientError as e:
-            error_code = e.response['Error']['Code']
+        if isinstance(head_result, ClientError):
+            error_code = head_result.response['Error']['Code']
             if error_code == '404':
                 print(f"❌ Bucket '{S3_BUCKET_NAME}' does not exist")
-                return False
             else:
-                print(f"❌ Error checking bucket: {e}")
-                return False
+                print(f"❌ Error checking bucket: {head_result}")
+            return False
+        if isinstance(head_result, Exception):
+            raise head_result
+        print(f"✅ Documents bucket '{S3_BUCKET_NAME}' exists")
         
         # Test 3: Upload a test file
         test_content = b"This is a test file for S3 connectivity"
@@ -70,8 +83,13 @@ async def test_s3_connection():
         # Test 4: Download the test file
         try:
             response = s3_client.get_object(Bucket=S3_BUCKET_NAME, Key=test_key)
-            downloaded_content = response['Body'].read()
-            if downloaded_content == test_content:
+            
+            # Hash the body as it streams instead of buffering the whole object
+            digest = hashlib.sha256()
+            for chunk in response['Body'].iter_chunks(chunk_size=1 << 20):
+                digest.update(chunk)
+            
+            if digest.digest() == hashlib.sha256(test_content).digest():
                 print(f"✅ Successfully downloaded and verified test file")
             else:
                 print(f"❌ Downloaded content doesn't match uploaded content")
@@ -98,4 +116,11 @@ async def test_s3_connection():
         return False
 
 if __name__ == "__main__":
+    # uvloop's libuv event loop when installed, the default loop otherwise
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     asyncio.run(test_s3_connection())
\ No newline at end of file
@@ -188,6 +188,13 @@ if __name__ == "__main__":
     # Set up environment
     os.environ.setdefault("GROQ_API_KEY", "")  # Will use fallback keys
     
+    # uvloop's libuv event loop when installed, the default loop otherwise
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     # Run tests
     success = asyncio.run(main())
     sys.exit(0 if success else 1)
\ No newline at end of file
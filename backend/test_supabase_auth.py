@@ -74,6 +74,13 @@ async def test_auth():
         return None
 
 if __name__ == "__main__":
+    # uvloop's libuv event loop when installed, the default loop otherwise
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     token = asyncio.run(test_auth())
     if token:
         print(f"\n🎉 Authentication test successful!")
@@ -4,7 +4,9 @@ Test direct document upload to verify S3 integration without authentication.
 """
 
 import asyncio
+import hashlib
 import io
+import os
 import uuid
 from fastapi import UploadFile
 from app.services.document_service import DocumentService
@@ -53,10 +55,12 @@ The document should be uploaded to the documents bucket under the user's folder.
         
         print(f"✅ File uploaded to S3: {s3_key}")
         
-        # Test file download
-        downloaded_content = await document_service.file_service.download_file(s3_key)
+        # Test file download, hashing the streamed body instead of buffering it
+        digest = hashlib.sha256()
+        async for chunk in document_service.file_service.iter_file_chunks(s3_key):
+            digest.update(chunk)
         
-        if downloaded_content == test_content:
+        if digest.digest() == hashlib.sha256(test_content).digest():
             print("✅ File download and verification successful")
         else:
             print("❌ Downloaded content doesn't match uploaded content")
@@ -74,6 +78,26 @@ The document should be uploaded to the documents bucket under the user's folder.
         await document_service.file_service.delete_file(s3_key)
         print("✅ Test file cleaned up")
         
+        # Synthetic 64 MiB body, large enough to go up as parallel multipart parts
+        large_content = os.urandom(1024 * 1024) * 64
+        large_key = await document_service.file_service.upload_file(
+            file=io.BytesIO(large_content),
+            bucket="documents",
+            user_id="test-user-123",
+            filename="test_large.pdf"
+        )
+        
+        digest = hashlib.sha256()
+        async for chunk in document_service.file_service.iter_file_chunks(large_key):
+            digest.update(chunk)
+        await document_service.file_service.delete_file(large_key)
+        
+        if digest.digest() == hashlib.sha256(large_content).digest():
+            print("✅ 64 MiB multipart upload verified and cleaned up")
+        else:
+            print("❌ Multipart upload content doesn't match")
+            return False
+        
         print("\n🎉 All S3 upload tests passed!")
         print("Your Supabase S3 bucket is properly configured for document storage.")
         print("File uploads will work when users are properly authenticated.")
@@ -87,6 +111,13 @@ The document should be uploaded to the documents bucket under the user's folder.
         return False
 
 if __name__ == "__main__":
+    # uvloop's libuv event loop when installed, the default loop otherwise
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     result = asyncio.run(test_direct_upload())
     if result:
         print("\n✅ SUMMARY: S3 file upload system is working correctly!")
@@ -0,0 +1,105 @@
+"""Tests for document Q&A over the vector store."""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.config.settings import settings
+from app.services import document_qa_service, simple_vector_store
+from app.services.document_qa_service import DocumentQAService
+from app.services.embedding_service import EmbeddingService
+from app.services.simple_vector_store import SimpleVectorStore
+
+QUESTION = "What does the report say about renewable energy costs?"
+
+
+class FakeRepository:
+    """In-memory stand-in for DocumentRepository holding chunk content by ID."""
+
+    contents = {}
+    interactions = []
+
+    def __init__(self, db):
+        pass
+
+    async def get_document(self, document_id):
+        return SimpleNamespace(id=document_id, title="Report", is_processed=True)
+
+    async def get_chunks_by_ids(self, chunk_ids):
+        return [
+            SimpleNamespace(id=chunk_id, content=self.contents[str(chunk_id)])
+            for chunk_id in chunk_ids if str(chunk_id) in self.contents
+        ]
+
+    async def save_qa_interaction(self, interaction):
+        self.interactions.append(interaction)
+
+
+@pytest.fixture
+def qa_service(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_store_path", str(tmp_path))
+    monkeypatch.setattr(document_qa_service, "DocumentRepository", FakeRepository)
+    simple_vector_store._index_cache.clear()
+    FakeRepository.contents = {}
+    FakeRepository.interactions = []
+
+    # Skip __init__: no Groq client is needed when answers are stubbed
+    service = DocumentQAService.__new__(DocumentQAService)
+    service.embedding_service = EmbeddingService()
+    service.vector_store = SimpleVectorStore(service.embedding_service)
+
+    async def allow_access(document, user_id, db):
+        return True
+
+    monkeypatch.setattr(service, "_check_document_access", allow_access)
+    return service
+
+
+def _index_document(service, document_id, texts, stored):
+    """Index texts as chunks of a document; only chunks in ``stored`` exist in the database."""
+    chunk_ids = [str(uuid.uuid4()) for _ in texts]
+    for chunk_id, text, keep in zip(chunk_ids, texts, stored):
+        if keep:
+            FakeRepository.contents[chunk_id] = text
+
+    # Vector store metadata carries no content, as DocumentService writes it
+    metadata = [
+        {"document_id": str(document_id), "chunk_id": chunk_id, "chunk_index": i, "page_number": 1, "token_count": 10}
+        for i, chunk_id in enumerate(chunk_ids)
+    ]
+    embeddings = asyncio.run(service.embedding_service.generate_embeddings(texts))
+    asyncio.run(service.vector_store.create_index(document_id, embeddings, metadata))
+    return chunk_ids
+
+
+def test_ask_question_uses_chunk_content_from_database(qa_service, monkeypatch):
+    document_id = uuid.uuid4()
+    texts = [QUESTION, "An unrelated paragraph about office furniture.", QUESTION]
+    # The last chunk was deleted from the database after indexing
+    chunk_ids = _index_document(qa_service, document_id, texts, stored=[True, True, False])
+    seen_context = []
+
+    async def fake_answer(question, context_chunks, document_title, context_window):
+        seen_context.extend(context_chunks)
+        return "Costs are falling.", 0.9
+
+    monkeypatch.setattr(qa_service, "_generate_answer", fake_answer)
+
+    response = asyncio.run(qa_service.ask_question(document_id, QUESTION, uuid.uuid4(), db=None))
+
+    assert seen_context and all(isinstance(chunk, str) for chunk in seen_context)
+    assert QUESTION in seen_context
+    assert {str(source.chunk_id) for source in response.sources} <= set(chunk_ids[:2])
+    assert response.chunks_used == len(seen_context)
+
+
+def test_search_document_returns_passage_content(qa_service):
+    document_id = uuid.uuid4()
+    _index_document(qa_service, document_id, [QUESTION, QUESTION], stored=[True, False])
+
+    results = asyncio.run(qa_service.search_document(document_id, QUESTION, uuid.uuid4(), db=None))
+
+    assert results["total_found"] == 1
+    assert results["passages"][0]["content"] == QUESTION
@@ -0,0 +1,140 @@
+"""Tests for columnar chunk metadata and the simple vector store file format."""
+
+import asyncio
+import io
+import os
+import pickle
+import uuid
+
+import numpy as np
+import orjson
+import pytest
+
+from app.config.settings import settings
+from app.core.exceptions import EmbeddingError, VectorStoreError
+from app.services import simple_vector_store
+from app.services.chunk_metadata import ChunkMetadata
+from app.services.embedding_service import EmbeddingService
+from app.services.simple_vector_store import SimpleVectorStore
+
+
+def _rows(count, start=0):
+    return [
+        {"chunk_id": f"c{i}", "chunk_index": i, "page_number": i // 2 or None, "token_count": 10 + i}
+        for i in range(start, start + count)
+    ]
+
+
+def _unit_vectors(count, dim, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_store_path", str(tmp_path))
+    monkeypatch.setattr(settings, "vector_quantization", "none")
+    simple_vector_store._index_cache.clear()
+    yield SimpleVectorStore(EmbeddingService())
+    simple_vector_store._index_cache.clear()
+
+
+def test_chunk_metadata_save_load_round_trip():
+    rows = [
+        {"document_id": "doc", "chunk_id": "a", "chunk_index": 0, "page_number": None, "token_count": 3,
+         "content": "héllo", "section": "intro"},
+        {"document_id": "doc", "chunk_id": "b", "chunk_index": 1, "page_number": 7, "token_count": 4,
+         "content": None, "tags": ["x", 1]},
+        {"document_id": "other", "chunk_id": "c", "chunk_index": 2, "page_number": 7, "token_count": 5,
+         "content": ""},
+    ]
+    buffer = io.BytesIO()
+    ChunkMetadata.from_rows(rows).save(buffer)
+    buffer.seek(0)
+
+    assert list(ChunkMetadata.load(buffer)) == rows
+
+
+def test_chunk_metadata_concatenation_keeps_extra_keys():
+    base = ChunkMetadata.from_rows([{"document_id": "doc", "chunk_id": "a", "chunk_index": 0}])
+    combined = base + [{"chunk_id": "b", "chunk_index": 1, "section": "s", "score": np.float32(0.5)}]
+
+    assert len(combined) == 2
+    assert combined[1]["document_id"] == "doc"
+    assert combined[1]["section"] == "s"
+    assert combined[1]["score"] == 0.5
+
+
+def test_chunk_metadata_rejects_rows_without_chunk_id():
+    with pytest.raises(ValueError, match="no chunk_id"):
+        ChunkMetadata.from_rows([{"chunk_index": 0}])
+
+
+def test_simple_store_create_update_search(store):
+    document_id = uuid.uuid4()
+    dim = store.embedding_dim
+    embeddings = _unit_vectors(5, dim)
+
+    async def scenario():
+        await store.create_index(document_id, embeddings[:3], _rows(3))
+        await store.update_index(document_id, embeddings[3:], _rows(2, start=3))
+
+        # Read the files back rather than the in-process cache
+        simple_vector_store._index_cache.clear()
+        return await store.search(document_id, embeddings[4], k=2)
+
+    results = asyncio.run(scenario())
+
+    assert results[0]["chunk_id"] == "c4"
+    assert results[0]["relevance_score"] == pytest.approx(1.0, abs=1e-5)
+
+    with open(store._get_index_path(document_id), "rb") as f:
+        header = orjson.loads(f.read())
+    assert header["version"] == 5
+    assert header["embedding_model"] == store.embedding_service.get_model_identifier()
+
+
+def test_simple_store_migrates_legacy_pickle(store, monkeypatch):
+    # Unlabelled pickles are only trusted when a real model produces embeddings
+    monkeypatch.setattr(store.embedding_service, "get_model_identifier", lambda: "test-model")
+    document_id = uuid.uuid4()
+    embeddings = _unit_vectors(4, store.embedding_dim, seed=1)
+    with open(store._get_legacy_index_path(document_id), "wb") as f:
+        pickle.dump({"embeddings": embeddings, "metadata": _rows(4)}, f)
+
+    results = asyncio.run(store.search(document_id, embeddings[2], k=1))
+
+    assert results[0]["chunk_id"] == "c2"
+    assert not os.path.exists(store._get_legacy_index_path(document_id))
+    assert os.path.exists(store._get_index_path(document_id))
+
+
+def test_simple_store_refuses_index_from_another_embedding_model(store, monkeypatch):
+    document_id = uuid.uuid4()
+    embeddings = _unit_vectors(2, store.embedding_dim)
+    asyncio.run(store.create_index(document_id, embeddings, _rows(2)))
+
+    simple_vector_store._index_cache.clear()
+    monkeypatch.setattr(store.embedding_service, "get_model_identifier", lambda: "other-model")
+
+    with pytest.raises(VectorStoreError, match="reprocess the document"):
+        asyncio.run(store.search(document_id, embeddings[0], k=1))
+
+
+def test_embedding_batch_similarities_with_quantized_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "vector_quantization", "sq8")
+    service = EmbeddingService()
+    vectors = _unit_vectors(6, service.embedding_dim, seed=2) * 3.0
+    path = str(tmp_path / "embeddings_doc.pkl")
+    asyncio.run(service.save_embeddings_batch(vectors, _rows(6), path))
+
+    codes, _, normalized = asyncio.run(service.load_embeddings_batch(path, dequantize=False))
+    assert normalized and codes.dtype == np.int8
+    with pytest.raises(EmbeddingError, match="dequantize=True"):
+        asyncio.run(service.batch_compute_similarities(vectors[1], codes, normalized=True))
+
+    embeddings, metadata, normalized = asyncio.run(service.load_embeddings_batch(path))
+    scores = asyncio.run(service.batch_compute_similarities(vectors[1], embeddings, normalized=normalized))
+    assert metadata[1]["chunk_id"] == "c1"
+    assert int(np.argmax(scores)) == 1
+    assert scores[1] == pytest.approx(1.0, abs=1e-2)
@@ -3,23 +3,68 @@
 Development server with proper cache headers for GitHub integration testing
 """
 import http.server
-import socketserver
 import os
-from datetime import datetime
+import shutil
+import socket
+import time
+
+# Socket send buffer and fallback copy size: 1 MiB
+BUFFER_SIZE = 1 << 20
+
+# Headers that are the same on every response, encoded once
+STATIC_HEADERS = (
+    b"Cache-Control: no-cache, no-store, must-revalidate\r\n"
+    b"Pragma: no-cache\r\n"
+    b"Expires: 0\r\n"
+    b"X-Content-Type-Options: nosniff\r\n"
+    b"X-Frame-Options: DENY\r\n"
+)
+
+# (second, formatted local time) of the last log line; replaced as one tuple
+# so request threads never see a second paired with another second's string
+_log_time = (0, "")
+
+def log_timestamp():
+    """Local time for log lines, formatted at most once per second."""
+    global _log_time
+    now = int(time.time())
+    second, formatted = _log_time
+    if second != now:
+        formatted = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))
+        _log_time = (now, formatted)
+    return formatted
+
+class DevServer(http.server.ThreadingHTTPServer):
+    # One thread per connection, so a slow client doesn't stall the others;
+    # daemon threads let Ctrl+C exit without waiting on open connections
+    daemon_threads = True
+    # Room for a browser's burst of parallel asset requests
+    request_queue_size = 128
 
 class NoCacheHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    def setup(self):
+        self.request.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, BUFFER_SIZE)
+        super().setup()
+
+    def copyfile(self, source, outputfile):
+        # Regular files go from the page cache straight to the socket with
+        # sendfile(2); in-memory bodies such as directory listings are copied
+        try:
+            source.fileno()
+        except (AttributeError, OSError):
+            shutil.copyfileobj(source, outputfile, BUFFER_SIZE)
+            return
+        self.request.sendfile(source)
+
     def end_headers(self):
-        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
-        self.send_header('X-Content-Type-Options', 'nosniff')
-        self.send_header('X-Frame-Options', 'DENY')
-        self.send_header('X-Timestamp', str(datetime.now().timestamp()))
+        # Queued behind the status line like send_header does (HTTP/0.9 has no headers)
+        if self.request_version != 'HTTP/0.9':
+            self._headers_buffer.append(STATIC_HEADERS)
+        self.send_header('X-Timestamp', str(time.time()))
         super().end_headers()
 
     def log_message(self, format, *args):
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"[{timestamp}] {format % args}")
+        print(f"[{log_timestamp()}] {format % args}")
 
 if __name__ == "__main__":
     PORT = 8005
@@ -28,7 +73,7 @@ if __name__ == "__main__":
     web_dir = "/home/ghost/engunity/frontend/public"
     os.chdir(web_dir)
     
-    with socketserver.TCPServer(("", PORT), NoCacheHTTPRequestHandler) as httpd:
+    with DevServer(("", PORT), NoCacheHTTPRequestHandler) as httpd:
         print(f"🚀 Development server starting at http://localhost:{PORT}")
         print(f"📁 Serving files from: {web_dir}")
         print(f"🔄 Cache-Control: no-cache (fresh files every request)")
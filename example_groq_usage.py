@@ -3,8 +3,17 @@
 
 import asyncio
 import json
+import os
+import sys
 from groq import Groq
 
+# Backend services are importable by the async examples
+sys.path.insert(0, '/home/ghost/engunity/backend')
+
+# Read once; the direct example only runs with a real key
+_API_KEY = os.environ.get("GROQ_API_KEY", "")
+_KEY_OK = bool(_API_KEY) and _API_KEY != "your-groq-api-key-here"
+
 def example_direct_groq_usage():
     """Example using Groq directly as specified."""
     
@@ -34,9 +43,6 @@ def example_direct_groq_usage():
 
 async def example_backend_integration():
     """Example using the backend service."""
-    import sys
-    sys.path.insert(0, '/home/ghost/engunity/backend')
-    
     from app.services.groq_service import create_groq_completion, create_groq_stream
     
     messages = [
@@ -68,9 +74,6 @@ async def example_backend_integration():
 
 async def example_streaming_backend():
     """Example using backend streaming."""
-    import sys
-    sys.path.insert(0, '/home/ghost/engunity/backend')
-    
     from app.services.groq_service import create_groq_stream
     
     messages = [
@@ -99,6 +102,16 @@ async def example_streaming_backend():
         print(f"Error: {e}")
         print("Note: This requires a valid GROQ_API_KEY in environment")
 
+async def run_backend_examples():
+    """Run both backend examples on one event loop, sharing its Groq connection pool."""
+    from app.services.groq_service import close_groq_clients
+    
+    try:
+        await example_backend_integration()
+        await example_streaming_backend()
+    finally:
+        await close_groq_clients()
+
 def example_api_request():
     """Example of making API request to backend."""
     print("\n📡 API Request Example:")
@@ -144,8 +157,7 @@ def main():
     
     # Only run if API key is available
     try:
-        import os
-        if os.getenv("GROQ_API_KEY") and os.getenv("GROQ_API_KEY") != "your-groq-api-key-here":
+        if _KEY_OK:
             example_direct_groq_usage()
         else:
             print("⚠️  GROQ_API_KEY not set. Skipping direct API example.")
@@ -158,8 +170,7 @@ def main():
     print("="*60)
     
     # Run backend examples
-    asyncio.run(example_backend_integration())
-    asyncio.run(example_streaming_backend())
+    asyncio.run(run_backend_examples())
     
     print("\n" + "="*60)
     print("3. API REQUEST EXAMPLE")
@@ -1,27 +1,71 @@
-import glob
 import csv
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+# Possible title column names, in order of preference
+TITLE_COLUMNS = ["title", "Title", "Question", "question"]
+TITLE_COLUMN_SET = frozenset(TITLE_COLUMNS)
+
+# Below this many files, process pool startup costs more than it saves
+MIN_FILES_FOR_POOL = 4
 
-questions = set()
 
-# Loop through all CSV files
-for fname in glob.glob('LeetCode-Questions-CompanyWise-master/*.csv'):
+def parse_titles(fname):
+    """Return the stripped question titles of one CSV file as a chunked Arrow array."""
+    # Resolve the title columns once per file from the header
     with open(fname, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            # Support different possible column name variations
-            title = row.get("title") or row.get("Title") or row.get("Question") or row.get("question")
-            if title:
-                questions.add(title.strip())
+        header = frozenset(next(csv.reader(csvfile), ())) & TITLE_COLUMN_SET
+    columns = [c for c in TITLE_COLUMNS if c in header]
+    if not columns:
+        return pa.chunked_array([], type=pa.string())
+
+    # Arrow's multithreaded C++ reader scans the memory-mapped file in place
+    # and converts only those columns, without the GIL; empty fields are
+    # null so they fall through to the next column
+    with pa.memory_map(fname) as source:
+        table = pacsv.read_csv(source, convert_options=pacsv.ConvertOptions(
+            column_types={c: pa.string() for c in columns},
+            include_columns=columns,
+            strings_can_be_null=True
+        ))
+
+    # Per row, the first non-empty column wins
+    title = table[columns[0]] if len(columns) == 1 else pc.coalesce(*(table[c] for c in columns))
+    return pc.utf8_trim_whitespace(title.drop_null())
+
+
+if __name__ == "__main__":
+    files = glob.glob('LeetCode-Questions-CompanyWise-master/*.csv')
+
+    # Files are independent, so parse them in parallel across cores
+    if len(files) < MIN_FILES_FOR_POOL:
+        titles = [parse_titles(fname) for fname in files]
+    else:
+        with ProcessPoolExecutor() as executor:
+            chunksize = max(1, len(files) // (4 * (os.cpu_count() or 1)))
+            titles = list(executor.map(parse_titles, files, chunksize=chunksize))
 
-# Convert to sorted list
-unique_questions = sorted(questions)
+    # Deduplicate in Arrow's native hash table over the packed string buffers,
+    # then sort natively (UTF-8 byte order is code point order, as in Python)
+    chunks = [chunk for title in titles for chunk in title.chunks]
+    unique_questions = pc.unique(pa.chunked_array(chunks, type=pa.string()))
+    unique_questions = unique_questions.take(pc.sort_indices(unique_questions))
 
-# Output summary
-print(f"✅ Total unique questions: {len(unique_questions)}\n")
+    # Output summary
+    print(f"✅ Total unique questions: {len(unique_questions)}\n")
 
-# Save to file
-with open("unique_questions.txt", "w", encoding="utf-8") as f:
-    for i, q in enumerate(unique_questions, 1):
-        f.write(f"{i}. {q}\n")
+    # Format "N. title\n" lines natively; the string array's values buffer is
+    # then the whole file, written in one call
+    numbers = pc.cast(pa.array(np.arange(1, len(unique_questions) + 1)), pa.string())
+    lines = pc.binary_join_element_wise(numbers, pc.binary_join_element_wise(unique_questions, "", "\n"), ". ")
+    with open("unique_questions.txt", "wb") as f:
+        if len(lines):
+            f.write(lines.buffers()[2].slice(0, lines.offsets[-1].as_py()))
 
-print("📄 All question names saved to 'unique_questions.txt'")
+    print("📄 All question names saved to 'unique_questions.txt'")
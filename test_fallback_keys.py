@@ -8,7 +8,7 @@ import os
 # Add the backend directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
-from app.services.groq_service import GroqService, create_groq_completion
+from app.services.groq_service import GroqService, close_groq_clients, create_groq_completion
 
 
 async def test_fallback_keys():
@@ -76,6 +76,14 @@ async def test_fallback_keys():
     return True
 
 
+async def main():
+    """Run the fallback key tests over one pooled Groq HTTP client."""
+    try:
+        return await test_fallback_keys()
+    finally:
+        await close_groq_clients()
+
+
 if __name__ == "__main__":
-    success = asyncio.run(test_fallback_keys())
+    success = asyncio.run(main())
     sys.exit(0 if success else 1)
\ No newline at end of file
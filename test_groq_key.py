@@ -2,7 +2,20 @@
 """Test the Groq API keys to ensure they work."""
 
 import asyncio
-from groq import Groq
+import math
+import random
+import sys
+import time
+from typing import List, Tuple
+import httpx
+from groq import APIStatusError, AsyncGroq, AuthenticationError
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 # Test API keys
 test_keys = [
@@ -13,44 +26,111 @@ test_keys = [
     "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"
 ]
 
-async def test_groq_key(api_key: str) -> bool:
-    """Test a single Groq API key."""
+# Upper bound per request attempt, so one hung request cannot stretch the
+# whole gathered run
+REQUEST_TIMEOUT = 10.0
+
+# Retries for rate limits (429) and upstream errors (5xx)
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+
+# One pre-redacted JSON record per key, formatted from a fixed template. Key
+# tails are alphanumeric, so no JSON escaping is needed and the full key
+# never reaches the output
+_LOG_TMPL = '{{"key_tail":"{0}","ok":{1},"ms":{2:.1f}}}\n'
+
+async def _with_retry(call, attempts: int = RETRY_ATTEMPTS, base: float = RETRY_BASE_DELAY):
+    """Await call(), retrying 429/5xx responses with Retry-After or jittered exponential backoff."""
+    for attempt in range(attempts):
+        try:
+            return await call()
+        except APIStatusError as e:
+            if not (e.status_code == 429 or e.status_code >= 500) or attempt == attempts - 1:
+                raise
+            try:
+                delay = float(e.response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                delay = random.uniform(0, base * 2 ** attempt)
+            await asyncio.sleep(delay)
+
+async def test_groq_key(api_key: str, http_client: httpx.AsyncClient) -> Tuple[bool, float]:
+    """Test a single Groq API key over the shared connection pool; returns (working, seconds taken)."""
+    key_tail = api_key[-8:]
+    start = time.perf_counter()
     try:
-        client = Groq(api_key=api_key)
-        
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": "Hello! Please respond with 'Working' if you can read this."}],
-            max_tokens=10
+        # Async client, so the gathered key checks overlap on the network; it
+        # is not closed here because that would close the shared pool too.
+        # SDK retries are off so _with_retry is the only retry policy
+        client = AsyncGroq(api_key=api_key, http_client=http_client, max_retries=0)
+        # Listing models needs the same bearer auth as a completion but runs
+        # no inference and uses no tokens
+        models = await _with_retry(
+            lambda: asyncio.wait_for(client.models.list(), timeout=REQUEST_TIMEOUT)
         )
         
-        result = response.choices[0].message.content.strip()
-        print(f"Key {api_key[-8:]}: ✅ Working - Response: {result}")
-        return True
+        print(f"Key {key_tail}: ✅ Working - {len(models.data)} models available")
+        working = True
         
+    except AuthenticationError as e:
+        print(f"Key {key_tail}: ❌ Rejected - Authentication failed: {str(e)}")
+        working = False
+    except asyncio.TimeoutError:
+        print(f"Key {key_tail}: ⏱️  Timeout - No response within {REQUEST_TIMEOUT:.0f}s")
+        working = False
     except Exception as e:
-        print(f"Key {api_key[-8:]}: ❌ Failed - Error: {str(e)}")
-        return False
+        print(f"Key {key_tail}: ❌ Failed - Error: {str(e)}")
+        working = False
+    
+    elapsed = time.perf_counter() - start
+    sys.stdout.write(_LOG_TMPL.format(key_tail, "true" if working else "false", elapsed * 1000))
+    return working, elapsed
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
 
 async def test_all_keys():
     """Test all provided API keys."""
     print("Testing Groq API keys...\n")
     
-    working_keys = []
+    async def run(i: int, key: str, http_client: httpx.AsyncClient) -> Tuple[bool, float]:
+        print(f"Testing key {i}/{len(test_keys)}...")
+        return await test_groq_key(key, http_client)
     
-    for i, key in enumerate(test_keys, 1):
-        print(f"Testing key {i}/5...")
-        is_working = await test_groq_key(key)
-        if is_working:
-            working_keys.append(key)
-        print()
+    # Keys are independent, so all requests are in flight at once, sharing
+    # warm connections to api.groq.com. Over HTTP/2 they are concurrent
+    # streams on a single connection, so the sweep pays for one TLS handshake
+    async with httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=30.0,
+        limits=httpx.Limits(
+            max_connections=32,
+            max_keepalive_connections=1 if HTTP2_AVAILABLE else 16
+        )
+    ) as http_client:
+        results = await asyncio.gather(
+            *(run(i, key, http_client) for i, key in enumerate(test_keys, 1)),
+            return_exceptions=True
+        )
+    timings = [(key, result) for key, result in zip(test_keys, results) if not isinstance(result, BaseException)]
+    working_keys = [key for key, (working, _) in timings if working]
+    print()
     
     print(f"Summary: {len(working_keys)}/{len(test_keys)} keys are working")
     
+    # Latency spread shows slow keys (rate-limit backoff, bad routing)
+    if timings:
+        timings.sort(key=lambda item: item[1][1])
+        latencies = [elapsed for _, (_, elapsed) in timings]
+        print(
+            f"Latency: p50={percentile(latencies, 50) * 1000:.0f}ms "
+            f"p95={percentile(latencies, 95) * 1000:.0f}ms "
+            f"max={latencies[-1] * 1000:.0f}ms (slowest: {timings[-1][0][-8:]})"
+        )
+    
     if working_keys:
-        print(f"\nWorking keys:")
-        for key in working_keys:
-            print(f"  - {key}")
+        sys.stdout.write("\nWorking keys:\n" + "".join(f"  - {key}\n" for key in working_keys))
     else:
         print("\n❌ No working keys found!")
 